@@ -1,70 +1,50 @@
-import random
+import sys
 import asyncio
-import nest_asyncio
-import concurrent.futures
-import time
-import pandas as pd
-from selenium import webdriver
 from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-
-# ============================
-# 🟡 Helper Function: Setup WebDriver
-# ============================
-def setup_driver():
-    """
-    This function initializes and configures the Selenium WebDriver with custom settings to enhance performance 
-    and avoid bot detection mechanisms.
-    """
-    user_agents = [
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
-        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)",
-        "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:94.0)",
-    ]
-    chrome_options = Options()
-
-    # 🟢 Performance and Anti-bot settings
-    chrome_options.add_argument('--disable-blink-features=AutomationControlled')  # Hides Selenium automation flag
-    chrome_options.add_argument('--user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64)')  # Sets a custom User-Agent
-    chrome_options.add_argument('--start-maximized')  # Maximizes browser window
-    chrome_options.add_argument('--disable-gpu')  # Disables GPU rendering for performance
-    chrome_options.add_argument('--log-level=3')  # Suppresses unnecessary logs
-    chrome_options.add_argument('--ignore-certificate-errors')  # Ignores SSL certificate errors
-    # chrome_options.add_argument('--proxy-auto-detect')  # Uses system proxy settings
-    chrome_options.add_argument(f'--user-agent={random.choice(user_agents)}')  # Randomizes user-agent to reduce detection
-    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])  # Further hides automation usage
-
-    # 🟡 Sets experimental capabilities to speed up page loading
-    caps = webdriver.DesiredCapabilities.CHROME.copy()
-    caps['pageLoadStrategy'] = 'eager'  # Loads pages faster by skipping unnecessary resources
-
-    # 🛠 Sets the ChromeDriver executable path
-    chrome_service = Service(executable_path="C:/Users/parni/OneDrive/Desktop/automate/chromedriver-win64/chromedriver-win64/chromedriver.exe")
-
-    # 🏎️ Launches the WebDriver with defined options
-    driver = webdriver.Chrome(service=chrome_service, options=chrome_options)
-    return driver
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))  # Makes the shared `common` package importable
+from common.canonical import canonical_key, canonical_url
+from common.changes import mark_complete, open_output
+from common.checkpoint import open_checkpoint
+from common.cli import build_parser
+from common.async_browser import AsyncBrowser
+from common.async_http import AsyncHttpClient
+from common.concurrency import ConcurrencyLimits
+from common.cookies import read_cookies, restore_session, save_cookies
+from common.dedup import DedupIndex
+from common.driver_factory import browser_data_dir, create_driver
+from common.frontier import frontier_from_args, node_path
+from common.identities import load_identities
+from common.jobs import job_path, jobs_from_args
+from common.metrics import METRICS, configure_metrics, profile_run
+from common.page_cache import PageCache
+from common.search_urls import build_search_url, with_query_param
+from common.html_parser import parse_html
+from common.rate_limit import RATE_LIMITER
+from common.selector_registry import SELECTORS
+from common.waits import WAIT_STATS
+
+CHROMEDRIVER_PATH = "C:/Users/parni/OneDrive/Desktop/automate/chromedriver-win64/chromedriver-win64/chromedriver.exe"  # Local ChromeDriver executable
 
 
 # ============================
-# 🟡 Function: Scroll Down Page
+# 🟡 Helper Function: Setup WebDriver
 # ============================
-def scroll_down(driver, scroll_times=3, delay=2):
+def setup_driver(headless=False, profile="full", warm=False, snapshot=True, identity=None):
     """
-    Scrolls down the webpage to load more products dynamically.
-    Args:
-        driver: Selenium WebDriver instance
-        scroll_times (int): Number of times to scroll
-        delay (int): Delay between scrolls (seconds)
+    Initializes Selenium WebDriver through the shared driver factory.
+    Pass `headless=True` for unattended batch runs, or `profile="lean"` for a small headless
+    browser that uses eager page loads and skips images, fonts, media, ads and analytics.
+    With `warm=True` the session starts from the persistent "amazon" browser profile (a private
+    copy of it unless `snapshot=False`) and attaches to the long-lived chromedriver service.
+    An `identity` (common/identities.py) sets the session's user agent, proxy, window and language.
     """
-    for i in range(scroll_times):
-        driver.execute_script("window.scrollBy(0, 500);")  # Scrolls down by 500 pixels
-        time.sleep(delay)  # Waits for content to load
-
+    user_data_dir = browser_data_dir("amazon", snapshot=snapshot) if warm else None
+    return create_driver(profile=profile, headless=headless, driver_path=CHROMEDRIVER_PATH,
+                         user_data_dir=user_data_dir, reuse_service=warm, identity=identity)
 
 
 # ============================ 
@@ -93,98 +73,143 @@ def search_amazon(driver):
 
 
 
+PRODUCT_LINKS = SELECTORS["amazon", "search"]  # Product links on the search results page (common/selectors.json)
+PRODUCT_PAGE = SELECTORS["amazon", "product"]  # Product page fields
+LISTING_CARDS = SELECTORS["amazon", "listing"]  # Price and rating of each result card (incremental runs)
+PRODUCT_FIELDS = ["Title", "Price", "Reviews", "URL"]  # Columns of the product records
+
+
 # ============================
-# 🟡 Function: Extract Product URLs
+# 🟡 Function: Canonical Product URLs
 # ============================
-async def extract_product_urls(driver):
+def unique_product_urls(hrefs):
     """
-    Extracts product URLs from the search results page.
+    Reduces product links to `https://www.amazon.com/dp/<ASIN>` and keeps one URL per ASIN,
+    so sponsored, ref= and tracking-parameter variants of a product are visited once.
     """
-    try:
-        scroll_down(driver)  # Scrolls down to load more products
+    product_urls = (canonical_url(href) for href in hrefs if href and canonical_key(href).startswith("amazon:"))
+    return list(dict.fromkeys(product_urls))
 
-        # Waits until product links are loaded
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_all_elements_located((By.CSS_SELECTOR, 'div.s-main-slot a.a-link-normal.s-no-outline'))
-        )
 
-        product_links = driver.find_elements(By.CSS_SELECTOR, 'div.s-main-slot a.a-link-normal.s-no-outline')
-        product_urls = [
-            link.get_attribute('href') for link in product_links
-            if link.get_attribute('href') and '/dp/' in link.get_attribute('href')
-        ]
+# ============================
+# 🟡 Function: Product URLs From Results HTML
+# ============================
+def product_urls_from_html(text, url):
+    """
+    Reads the product links of a results page's HTML; returns {} when there are none.
+
+    Returns:
+        dict: Product URL -> its listing ({"Price": ..., "Rating": ...} from the result card,
+        or None when the card has no price), in page order.
+    """
+    root = parse_html(text, base_url=url)
+    product_urls = unique_product_urls(link["URL"] for link in PRODUCT_LINKS.extract(root, base_url=url))
+    listings = dict.fromkeys(product_urls)
+    for card in LISTING_CARDS.extract(root, base_url=url, default=None):
+        product_url = canonical_url(card.pop("URL"))
+        if product_url in listings and card["Price"]:
+            listings[product_url] = card
+    return listings
+
 
-        print(f"✅ Found {len(product_urls)} product URLs.")
+# ============================
+# 🟡 Function: Fetch One Search Results Page
+# ============================
+async def fetch_listing_page(http, browser, url, page=1):
+    """
+    Collects the product URLs (and their listings, see `product_urls_from_html`) of one results
+    page (`&page=N`): over plain HTTP when the static HTML has the product links, otherwise in a
+    browser tab that is scrolled until lazy results load. Returns {} past the last results page;
+    raises PageBlocked on a robot check (or an unexplained empty first `page`), so a blocked page
+    is not mistaken for the end.
+    """
+    text = await http.get_text(url)
+    product_urls = product_urls_from_html(text, url) if text else {}
+    if product_urls:
+        print(f"⚡ Found {len(product_urls)} product URLs on {url} without the browser.")
         return product_urls
-    except Exception as e:
-        print(f"❌ Error extracting product URLs: {e}")
-        return []
+    async with browser.page() as tab:
+        await tab.goto(url)
+        if not await tab.wait_for(PRODUCT_LINKS.xpath, timeout=10):
+            # Back off on a robot check (spotted within a poll or two, see AsyncPage.wait_for)
+            RATE_LIMITER.check_page(await tab.current_url(), text=await tab.content(), title=await tab.title(),
+                                    empty=page == 1)  # Past page 1, an empty page is the end of the results
+            return {}
+        RATE_LIMITER.report_success(url)
+        await tab.scroll()  # Scrolls down to load more products
+        html = await tab.content()
+    product_urls = product_urls_from_html(html, url)
+    print(f"✅ Found {len(product_urls)} product URLs.")
+    return product_urls
 
 
 
 # ============================
 # 🟡 Function: Extract Product Data and Save to CSV 
 # ============================ 
-def extract_product_data(driver, url, data_list): 
+async def extract_product_data(http, browser, url, sink, checkpoint=None, cache=None, seen=None): 
     """
     Extracts product details like title, price, and reviews from an Amazon product page.
+    The static HTML is tried first; a browser tab is only opened when it has no product title
+    (a CAPTCHA answer or a script-rendered page). The product is written to `sink` as soon as
+    it is extracted. With a `checkpoint`, the URL is marked done once written so a resumed
+    crawl skips it.
+    Every request waits for the shared per-domain rate limiter, which backs off when
+    Amazon answers with a CAPTCHA ("Robot Check") page.
+    With a `cache`, a product scraped within the last few hours is written from the cache
+    without loading the page; freshly scraped pages and their records are cached.
+    A `seen` DedupIndex records the product once it is written.
+    Returns True once the product is written (None when it could not be scraped).
     """
     try:
-        driver.get(url)  # Wait for page load asynchronously
-        time.sleep(2)  # You may want to use async sleep or waits for better efficiency
-        
-        # Wait until a specific element is present, using WebDriverWait (asynchronous handling if needed)
-        WebDriverWait(driver, 10).until(
-            EC.presence_of_element_located((By.ID, 'productTitle'))  # You can replace with any other element that's always on the page
-        )
-
-
-        # Please provide the required selectors for each field
-        title_selector = "productTitle"  # Title element
-        price_selector = "//span[@class='a-price aok-align-center reinventPricePriceToPayMargin priceToPay']//span[@class='a-price-whole']"  # Price element
-        description_selector = "feature-bullets"  # Description element
-        reviews_selector = "averageCustomerReviews"  # Reviews element
-        
-        # Helper function to convert ID to XPath
-        def id_to_xpath(id_value):
-            return f"//*[@id='{id_value}']"  # Converts ID to XPath format
-
-        # Convert IDs to XPath if necessary
-        if " " not in title_selector and not title_selector.startswith("/"):  # Assuming ID if no space and no XPath
-            title_selector = id_to_xpath(title_selector)
-        if " " not in price_selector and not price_selector.startswith("/"):  # Assuming ID if no space and no XPath
-            price_selector = id_to_xpath(price_selector)
-        if " " not in description_selector and not description_selector.startswith("/"):
-            description_selector = id_to_xpath(description_selector)
-        if " " not in reviews_selector and not reviews_selector.startswith("/"):
-            reviews_selector = id_to_xpath(reviews_selector)
-
-        # Extracts product title
-        title_elements = driver.find_elements(By.XPATH, title_selector)
-        title = title_elements[0].text.strip() if title_elements else "N/A"
-        
-        # Extracts product price
-        price = "No featured offers available"  # Default value if price not found
-        price_elements = driver.find_elements(By.XPATH, price_selector)
-        if price_elements:
-            price = price_elements[0].text.strip()
-
-
-        # Extracts product description (if available)
-        description = "N/A"
-        description_elements = driver.find_elements(By.XPATH, description_selector)
-        if description_elements:
-            description = description_elements[0].text.strip()
-        
-        # Extracts reviews (if available)
-        reviews = "N/A"
-        reviews_elements = driver.find_elements(By.XPATH, reviews_selector)
-        if reviews_elements:
-            reviews = reviews_elements[0].text.strip()
-
-        # Appends product details to list
-        data_list.append({"Title": title, "Price": price, "Reviews": reviews, "URL": url})
+        cached = cache.get(url) if cache is not None else None
+        if cached is not None and cached.fresh and cached.records:
+            product = cached.records[0]
+            sink.write(product)
+            if checkpoint is not None:
+                checkpoint.mark_done(url)
+            if seen is not None:
+                seen.add(url)
+            print(f"💾 Cached: {product['Title']} | Price: {product['Price']} | Reviews: {product['Reviews']}")
+            return True
+
+        # Title, price, description and reviews are read with the selectors and fallbacks
+        # of common/selectors.json, from the static HTML or the rendered page alike
+        html = await http.get_text(url)
+        product = PRODUCT_PAGE.extract(parse_html(html, base_url=url), default=None)[0] if html else None
+        from_browser = not (product and product["Title"])
+        if from_browser:
+            async with browser.page() as page:
+                await page.goto(url)
+
+                # Returns as soon as the title is present (upper bound of 10 seconds)
+                if not await page.wait_for(PRODUCT_PAGE.xpath, timeout=10):
+                    # A robot check ends the wait within a poll or two, and backs the domain off here
+                    RATE_LIMITER.report_response(await page.current_url(), text=await page.content(), title=await page.title())
+                    print(f"❌ Product page did not load: {url}")
+                    return
+                RATE_LIMITER.report_success(url)
+                html = await page.content()
+            product = PRODUCT_PAGE.extract(parse_html(html, base_url=url), default=None)[0]
+
+        title = product["Title"] or "N/A"
+        price = product["Price"] or "No featured offers available"  # Default value if price not found
+        reviews = product["Reviews"] or "N/A"
+
+        # Writes product details to the output
+        record = {"Title": title, "Price": price, "Reviews": reviews, "URL": url}
+        sink.write(record)
+        if cache is not None:  # Re-runs and offline replays skip the network
+            if from_browser:
+                cache.put(url, html=html, records=[record])
+            else:
+                cache.put_records(url, [record])  # The HTTP client already cached the page
+        if checkpoint is not None:
+            checkpoint.mark_done(url)
+        if seen is not None:
+            seen.add(url)
         print(f"📦 Extracted: {title} | Price: {price} | Reviews: {reviews}")
+        return True
     except Exception as e:
         print(f"❌ Error extracting data from {url}: {e}")
 
@@ -193,27 +218,206 @@ def extract_product_data(driver, url, data_list):
 # ============================
 # 🟢 MAIN FUNCTION
 # ============================
-async def main():
+async def main(resume=False, job=None, headless=False, cookies=None, profile="full", warm=False, use_cache=True,
+               seen_index=None, max_pages=None, incremental=False, skip_unchanged=False, frontier=None, node=None,
+               identities=None):
     """
     Orchestrates the web scraping process and saves data to a CSV file.
+
+    Results pages (`&page=N`) are fetched by a few concurrent listing workers that stream new
+    product URLs into a bounded queue; detail workers consume the queue as URLs arrive, so product
+    pages are scraped while later results pages are still loading. A full queue pauses the
+    listing workers until the detail workers catch up. Every worker is a coroutine on one event
+    loop: HTTP requests share one connection pool, browser tabs share one browser (Playwright
+    when installed, otherwise a pool of Selenium sessions), and both are bounded by the same
+    per-site concurrency limits.
+
+    With `resume`, the search is skipped and only product URLs not yet scraped are fetched.
+    With a batch-mode `job` ({"query": ..., "max_pages": ...}), the search results URL is opened
+    directly instead of asking the user to search. `cookies` is a cookie jar restored in every session.
+    `profile` is the browser profile of every session ("full" or "lean"); with `warm`, sessions
+    start from copies of the persistent Amazon browser profile. `use_cache` serves products
+    scraped within Amazon's cache TTL from the on-disk page cache. With a `seen_index` file,
+    products scraped by earlier runs never reach the frontier. `max_pages` caps the results
+    pages walked (default 20; pagination also stops at the first page without products).
+    With `incremental`, only new, changed and removed products are written (to
+    `amazon_products.changes.csv`); with `skip_unchanged` as well, the product page of a result
+    whose card price and rating match the last crawl is not loaded at all.
+
+    With a shared `frontier` (common/frontier.py) the job is one crawl split across nodes:
+    results pages and product URLs are leased from the frontier instead of the local queue and
+    checkpoint, so each is scraped by one node, and a node that dies leaves its leases to the
+    others. Every node writes its own output (named after `node`).
+
+    With `identities` (an IdentityPool, see common/identities.py), browser tabs are spread over
+    healthy identities, each with its own user agent, proxy, window, language and cookie jar;
+    an identity Amazon keeps blocking is cooled down and its sessions replaced.
     """
-    driver = setup_driver()
-    search_amazon(driver)
-    product_urls = await extract_product_urls(driver)
-    data_list = []
-    
-    loop = asyncio.get_event_loop()
-    with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-        tasks = [
-            loop.run_in_executor(executor, extract_product_data, driver, url, data_list)
-            for url in product_urls
-        ]
-        await asyncio.gather(*tasks)
-    
-    df = pd.DataFrame(data_list)
-    df.to_csv("amazon_products.csv", index=False)
-    print("✅ Data saved to amazon_products.csv")
-    driver.quit()
+    max_workers = 16  # Detail coroutines; most product pages never need the browser
+    listing_workers = 2  # Results pages fetched at the same time
+    browser_tabs = 5  # Browser pages open at once (HTTP fallbacks)
+    max_pages = max_pages or (job or {}).get("max_pages") or 20
+    output = node_path(job_path(job, "amazon_products.csv"), node)
+
+    def start_session(identity=None):
+        driver = setup_driver(headless=headless, profile=profile, warm=warm, identity=identity)  # Pool sessions run concurrently, so each gets a snapshot
+        jar = identity.cookies if identity is not None and identity.cookies else cookies  # An identity's own logins win
+        if jar:
+            restore_session(driver, "https://www.amazon.com/", jar)  # Reuses a saved session / consent
+        return driver
+
+    checkpoint = open_checkpoint(job_path(job, "amazon_checkpoint.db"), resume=resume)  # Disk-backed product URL frontier
+    cache = PageCache("amazon_page_cache.db") if use_cache else None  # Shared by every job and run
+    if incremental and seen_index:
+        print("⚠️ --seen-index is ignored with --incremental (skipped products would look removed).")
+        seen_index = None
+    seen = DedupIndex(seen_index) if seen_index else None  # ASINs scraped by earlier runs
+    queued = DedupIndex()  # ASINs already queued in this run (the same product shows up on several pages)
+    limits = ConcurrencyLimits()  # Shared by the HTTP client and the browser
+    session_cookies = read_cookies(cookies)  # Saved session / consent, shared by HTTP requests and browser tabs
+    http = AsyncHttpClient(limits=limits, cache=cache)
+    http.add_cookies(session_cookies)
+    queue = asyncio.Queue(maxsize=2 * max_workers)  # Bounded: listing workers wait while detail workers catch up
+
+    pending, done = checkpoint.frontier_size()
+    search_url = None
+    if frontier is not None:
+        search_url = build_search_url("amazon", query=job["query"])
+        frontier.put([{"page": page} for page in range(1, max_pages + 1)], priority=1)  # Every node seeds the same pages; one of each is kept
+    elif pending or done:
+        print(f"🔁 Resuming: {done} products already scraped, {pending} left.")
+    elif job is not None:
+        search_url = build_search_url("amazon", query=job["query"])  # Opens the results directly
+    else:
+        # The manual search needs a visible browser; its blocking calls run in a thread
+        driver = await asyncio.to_thread(setup_driver, profile=profile, warm=warm, snapshot=False)
+        try:
+            if cookies:
+                await asyncio.to_thread(restore_session, driver, "https://www.amazon.com/", cookies)
+            await asyncio.to_thread(search_amazon, driver)
+            search_url = driver.current_url
+            if cookies:
+                save_cookies(driver, cookies)
+            http.load_driver_cookies(driver)  # Share the browser's session with the HTTP fast path
+            session_cookies = driver.get_cookies()
+        finally:
+            driver.quit()
+
+    pages = iter(range(1, max_pages + 1))  # Shared by the listing workers, so each page is fetched once
+    last_page = [max_pages + 1]  # Lowered to the first empty results page
+    failed_pages = []  # Results pages that raised (blocked or broken), so the crawl missed their products
+
+    def accept(product_urls, listings=None):
+        """ Drops product URLs already queued, scraped by earlier runs, or (skip_unchanged) with an unchanged card. """
+        listings = listings or {}
+        product_urls = [url for url in product_urls if queued.add(url)]
+        if seen is not None:
+            product_urls = seen.filter_new(product_urls)  # Skip products earlier runs already scraped
+        if incremental:
+            unchanged = {url for url in product_urls if listings.get(url) and sink.store.check_listing(url, listings[url])}
+            if skip_unchanged and unchanged:
+                product_urls = [url for url in product_urls if url not in unchanged]  # Same card as last crawl
+                sink.store.skip(len(unchanged))
+        return product_urls
+
+    async def enqueue(product_urls, listings=None):
+        product_urls = accept(product_urls, listings)
+        checkpoint.add_to_frontier(product_urls)
+        for url in product_urls:
+            await queue.put(url)  # Waits while the queue is full
+
+    async def listing_worker():
+        for page in pages:
+            if page > last_page[0]:
+                break
+            page_url = with_query_param(search_url, "page", page)
+            try:
+                product_urls = await fetch_listing_page(http, browser, page_url, page)
+            except Exception as e:
+                print(f"❌ Error loading results page {page}: {e}")
+                failed_pages.append(page)
+                continue
+            if not product_urls:
+                last_page[0] = min(last_page[0], page)  # Past the last results page
+                print(f"⏹️ No products on results page {page}; pagination stops here.")
+                continue
+            print(f"📄 Results page {page}: {len(product_urls)} products")
+            await enqueue(list(product_urls), product_urls)
+
+    async def detail_worker():
+        while True:
+            url = await queue.get()
+            try:
+                if url is None:
+                    return
+                await extract_product_data(http, browser, url, sink, checkpoint, cache, seen)
+            except Exception as e:
+                print(f"❌ Error scraping {url}: {e}")  # Left pending in the checkpoint; the worker keeps going
+            finally:
+                queue.task_done()
+
+    async def frontier_worker():
+        """ Leases results pages and product URLs from the shared frontier until no node has any left. """
+        while True:
+            leases = frontier.lease(1)
+            if not leases:
+                if frontier.drained():
+                    return
+                await asyncio.sleep(1)  # What is left is leased by other workers or nodes
+                continue
+            lease = leases[0]
+            try:
+                if isinstance(lease.item, dict):  # A results page
+                    page = lease.item["page"]
+                    product_urls = {}
+                    if page <= last_page[0]:
+                        product_urls = await fetch_listing_page(http, browser, with_query_param(search_url, "page", page), page)
+                    if product_urls:
+                        print(f"📄 Results page {page}: {len(product_urls)} products")
+                        frontier.put(accept(list(product_urls), product_urls))  # Products before further pages
+                    else:
+                        last_page[0] = min(last_page[0], page)  # Past the last results page
+                    done = True
+                else:
+                    done = await extract_product_data(http, browser, lease.item, sink, cache=cache, seen=seen)
+            except Exception as e:
+                print(f"❌ Error on {lease.item}: {e}")
+                done = False
+            if done:
+                frontier.ack(lease)
+            elif frontier.nack(lease, delay=30):
+                print(f"🔁 {lease.item} returned to the frontier for another attempt.")
+
+    # Playwright when installed (warm profiles need Chrome's own user-data-dir, so Selenium then)
+    browser = AsyncBrowser(factory=start_session, size=browser_tabs, limits=limits, engine="selenium" if warm else "auto",
+                           headless=headless or profile == "lean", block_resources=profile == "lean", identities=identities)
+    # batch_size=1 so a product is on disk before its URL is marked done in the checkpoint
+    async with http, browser:
+        await browser.add_cookies(session_cookies)
+        with open_output(output, resume or frontier is not None, incremental, fields=PRODUCT_FIELDS, batch_size=1) as sink:
+            if frontier is not None:
+                await asyncio.gather(*(frontier_worker() for _ in range(max_workers)))
+            else:
+                consumers = [asyncio.create_task(detail_worker()) for _ in range(max_workers)]
+                await enqueue(checkpoint.pending())  # Resumed frontier first
+                if search_url is not None:
+                    await asyncio.gather(*(listing_worker() for _ in range(listing_workers)))
+                    if last_page[0] <= max_pages and not any(page < last_page[0] for page in failed_pages):
+                        mark_complete(sink)  # Every results page up to the last one was read: unseen products are gone
+                for _ in consumers:
+                    await queue.put(None)  # One stop signal per detail worker
+                await asyncio.gather(*consumers)
+    print(f"✅ {sink.count} products saved to {output}")
+    checkpoint.close()
+    if cache is not None:
+        print(f"💾 Page cache: {cache.summary()}")
+        cache.close()
+    if seen is not None:
+        seen.close()  # Saves the index for the next run
+    print(f"⏱️ Wait timings: {WAIT_STATS.summary()}")
+    print(f"🧩 Selector hits: {SELECTORS.summary()}")
+    if identities is not None:
+        print(f"🪪 Identities: {identities.summary()}")
     print("✅ Scraping completed.")
 
 
@@ -222,7 +426,26 @@ async def main():
 # 🚀 Execute Main Function
 # ============================
 
-nest_asyncio.apply()
-asyncio.run(main())
-
-
+if __name__ == "__main__":
+    parser = build_parser("Scrape Amazon product details from a search.")
+    parser.add_argument("--skip-unchanged", action="store_true",
+                        help="with --incremental, skip product pages whose result card (price, rating) did not change")
+    args = parser.parse_args()
+    jobs = jobs_from_args(args, "amazon")  # Jobs from --jobs / --query (empty means interactive)
+    configure_metrics(args)  # --metrics-log / --metrics-file / --metrics-port
+    identities = load_identities(args.identities)  # Shared by every job, so a blocked identity stays benched
+    if jobs:
+        for index, job in enumerate(jobs):  # Runs every job unattended, one after another
+            frontier = frontier_from_args(args, "amazon", job)  # Shared with the other nodes of the crawl, if any
+            with profile_run(args.cprofile if index == 0 else None), METRICS.span("job", site="amazon"):
+                asyncio.run(main(resume=args.resume, job=job, headless=True, cookies=args.cookies, profile=args.profile, warm=args.warm,
+                                 use_cache=not args.no_cache, seen_index=args.seen_index, max_pages=args.max_pages,
+                                 incremental=args.incremental, skip_unchanged=args.skip_unchanged, frontier=frontier, node=args.node,
+                                 identities=identities))
+            if frontier is not None:
+                frontier.close()
+    else:
+        with profile_run(args.cprofile), METRICS.span("job", site="amazon"):
+            asyncio.run(main(resume=args.resume, headless=args.headless, cookies=args.cookies, warm=args.warm, use_cache=not args.no_cache,
+                             seen_index=args.seen_index, max_pages=args.max_pages, incremental=args.incremental,
+                             skip_unchanged=args.skip_unchanged, identities=identities))
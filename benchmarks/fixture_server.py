@@ -0,0 +1,192 @@
+import os  # Import os to locate the fixture pages
+import re  # Import re to find the infinite-scroll item template
+import time  # Import time to simulate network latency
+import threading  # Import threading to serve in the background and guard the counters
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer  # Import the standard-library HTTP server
+from urllib.parse import parse_qs, urlparse  # Import URL helpers to read asset options
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")  # Saved pages served at /
+
+CONTENT_TYPES = {  # Content types of the synthesized assets, by extension
+    ".png": "image/png", ".jpg": "image/jpeg", ".webp": "image/webp", ".gif": "image/gif",
+    ".woff2": "font/woff2", ".woff": "font/woff", ".ttf": "font/ttf",
+    ".mp4": "video/mp4", ".mp3": "audio/mpeg",
+    ".css": "text/css", ".js": "application/javascript",
+}
+
+# Stand-in for an analytics tag: burns `ms` milliseconds of main-thread CPU, like a real tracker bundle
+TRACKER_SCRIPT = "(function(){var end=Date.now()+%d;var x=0;while(Date.now()<end){x+=Math.random();}window.__tracked=x;})();"
+
+PAGE_PARAMS = ("page", "_pgn")  # Amazon / LinkedIn, eBay results page numbers
+SCROLL_ITEM = re.compile(r"<!-- scroll-item -->(.*?)<!-- /scroll-item -->", re.S)  # Infinite-scroll item template
+EMPTY_RESULTS = b"<!DOCTYPE html><html><head><title>No results</title></head><body><p>No results found.</p></body></html>"
+ROBOT_CHECK = b"<!DOCTYPE html><html><head><title>Robot Check</title></head><body><p>Enter the characters you see below</p></body></html>"
+
+
+def page_number(options):
+    """ Returns the results page a request asks for (`page=`, `_pgn=` or Yelp's `start=` offset), 1 by default. """
+    for name in PAGE_PARAMS:
+        if name in options:
+            return max(1, int(options[name][0]))
+    if "start" in options:
+        return (max(1, int(options["start"][0])) - 1) // 10 + 1
+    return 1
+
+
+# ============================
+# 🟡 Class: Fixture Request Handler
+# ============================
+class FixtureHandler(SimpleHTTPRequestHandler):
+    """
+    Serves the saved fixture pages and synthesizes their heavy assets:
+
+    - `/<page>.html`: a file from FIXTURES_DIR. `?page=N` / `?_pgn=N` / `?start=N` select a
+      results page: pages up to the server's `pages` return the fixture with `{{page}}` and
+      `{{next_page}}` filled in, later ones an empty results page
+    - `/scroll/<page>.html?offset=N`: the next batch of the page's infinite-scroll items (the
+      `<!-- scroll-item -->` template, `{{n}}` numbered), empty after the server's `scroll_items`
+    - `/assets/<name>.<ext>?kb=N`: N kilobytes of filler with the extension's content type
+    - `/analytics.js`, `/gtag/js?ms=N`: a tracker script that burns N ms of CPU
+
+    Every response is counted on the server (requests and bytes) so a benchmark can see
+    how much a browser profile actually downloaded.
+
+    Requests for an absolute URL (`GET http://any.host/<page>.html`, what a client sends to
+    an HTTP proxy) are served the same way, so a server also stands in for a proxy. Once a
+    server with `ban_after` has answered that many requests, every page is a robot check,
+    like a proxy exit IP the site has banned.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, directory=FIXTURES_DIR, **kwargs)
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output clean
+
+    def _send(self, body, content_type):
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")  # Every run downloads everything again
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.count(len(body))
+
+    def do_GET(self):
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        url = urlparse(self.path)
+        options = parse_qs(url.query)
+        if self.server.ban_after is not None and self.server.requests >= self.server.ban_after:
+            return self._send(ROBOT_CHECK, "text/html; charset=utf-8")
+        if url.path.startswith("/assets/"):
+            kilobytes = int(options.get("kb", ["50"])[0])
+            extension = os.path.splitext(url.path)[1].lower()
+            return self._send(b"\0" * kilobytes * 1024, CONTENT_TYPES.get(extension, "application/octet-stream"))
+        if url.path in ("/analytics.js", "/gtag/js"):
+            milliseconds = int(options.get("ms", ["50"])[0])
+            return self._send((TRACKER_SCRIPT % milliseconds).encode(), CONTENT_TYPES[".js"])
+        if url.path.startswith("/scroll/"):
+            template = self.server.fixture(url.path[len("/scroll"):])
+            if template is None:
+                return self.send_error(404)
+            offset = int(options.get("offset", ["0"])[0])
+            return self._send(self.server.render_batch(template, offset).encode(), "text/html; charset=utf-8")
+        if url.path.endswith(".html"):
+            template = self.server.fixture(url.path)
+            if template is None:
+                return self.send_error(404)
+            page = page_number(options)
+            if page > self.server.pages:
+                return self._send(EMPTY_RESULTS, "text/html; charset=utf-8")
+            return self._send(self.server.render(template, page).encode(), "text/html; charset=utf-8")
+        path = self.translate_path(url.path)
+        if os.path.isfile(path):
+            with open(path, "rb") as file:
+                return self._send(file.read(), self.guess_type(path))
+        self.send_error(404)
+
+
+# ============================
+# 🟡 Class: Fixture Server
+# ============================
+class FixtureServer(ThreadingHTTPServer):
+    """
+    A local HTTP server for the benchmark fixtures, running in a background thread.
+
+    Args:
+        port (int): Port to listen on (0 picks a free one).
+        latency (float): Seconds added before every response, to simulate a remote site.
+        pages (int): Results pages of every paginated fixture; later pages are empty.
+        scroll_items (int): Items an infinite-scroll fixture yields before its list ends.
+        scroll_batch (int): Items per initial render and per `/scroll/` request.
+        ban_after (int): Serve robot checks after this many responses (a banned proxy stand-in).
+
+    Example:
+        with FixtureServer() as server:
+            driver.get(server.url("amazon_product.html"))
+    """
+
+    daemon_threads = True
+
+    def __init__(self, port=0, latency=0.0, pages=5, scroll_items=100, scroll_batch=20, handler=FixtureHandler,
+                 ban_after=None):
+        super().__init__(("127.0.0.1", port), handler)
+        self.latency = latency
+        self.ban_after = ban_after
+        self.pages = pages
+        self.scroll_items = scroll_items
+        self.scroll_batch = scroll_batch
+        self._fixtures = {}  # Fixture path -> text, read once
+        self.requests = 0  # Responses served so far
+        self.bytes = 0  # Response bytes served so far
+        self._counter_lock = threading.Lock()
+        self._thread = threading.Thread(target=self.serve_forever, daemon=True)
+
+    def count(self, size):
+        with self._counter_lock:
+            self.requests += 1
+            self.bytes += size
+
+    def fixture(self, path):
+        """ Returns the text of the fixture at URL path `path`, or None if there is none. """
+        name = os.path.basename(path)
+        if name not in self._fixtures:
+            file_path = os.path.join(FIXTURES_DIR, name)
+            if not os.path.isfile(file_path):
+                return None
+            with open(file_path, encoding="utf-8") as file:
+                self._fixtures[name] = file.read()
+        return self._fixtures[name]
+
+    def render_batch(self, template, offset):
+        """ Renders infinite-scroll items `offset` .. `offset + scroll_batch` (fewer at the end of the list). """
+        match = SCROLL_ITEM.search(template)
+        if match is None:
+            return ""
+        end = min(offset + self.scroll_batch, self.scroll_items)
+        return "".join(match.group(1).replace("{{n}}", str(n)) for n in range(offset, end))
+
+    def render(self, template, page=1):
+        """ Fills in one results page of a fixture: page markers and the first batch of scroll items. """
+        html = template.replace("{{page}}", f"{page:03d}").replace("{{next_page}}", str(page + 1))
+        if SCROLL_ITEM.search(html):
+            html = SCROLL_ITEM.sub(lambda match: self.render_batch(template, 0), html, count=1)
+        return html
+
+    def snapshot(self):
+        """ Returns the (requests, bytes) counters, to diff around a measurement. """
+        with self._counter_lock:
+            return self.requests, self.bytes
+
+    def url(self, path=""):
+        return f"http://127.0.0.1:{self.server_address[1]}/{path.lstrip('/')}"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
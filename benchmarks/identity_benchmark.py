@@ -0,0 +1,90 @@
+import sys  # Import sys to extend the module search path
+import json  # Import json to print the results
+import time  # Import time to measure throughput
+import argparse  # Import argparse for the benchmark options
+import concurrent.futures  # Import concurrent.futures to fetch from several threads
+from contextlib import ExitStack  # Import ExitStack to run every proxy stand-in at once
+from pathlib import Path  # Import Path to locate the repository root
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # Make `common` and `benchmarks` importable
+from benchmarks.fixture_server import FixtureServer  # Import the local fixture server (here: proxy stand-ins)
+from common.http_client import HttpClient  # Import the pooled HTTP client
+from common.identities import IdentityPool  # Import the rotating identities
+from common.rate_limit import DomainRateLimiter  # Import the adaptive rate limiter
+
+
+SITE_URL = "http://shop.test/amazon_search.html?k=headphones&page=1"  # Never resolved: every request goes through a proxy
+
+
+# ============================
+# 🟡 Function: Crawl Through the Proxy Stand-Ins
+# ============================
+def crawl(proxies, pages, workers, cooldown, rotate=True):
+    """
+    Fetches `pages` results pages from `workers` threads through identities built on the
+    proxy stand-ins (only the first one without `rotate`).
+
+    Returns:
+        dict: Pages fetched, blocked and not attempted (no identity left), throughput, and
+        every identity's health at the end.
+    """
+    proxy_urls = [proxy.url() for proxy in proxies] if rotate else [proxies[0].url()]
+    identities = IdentityPool.generate(proxy_urls, cooldown=cooldown)
+    limiter = DomainRateLimiter(rate=200, burst=20, min_rate=10, max_rate=500, base_backoff=0.1, max_backoff=1.0, jitter=0)
+    clients = {identity.name: HttpClient(identity=identity, rate_limiter=limiter, timeout=5) for identity in identities.identities}
+
+    def fetch(_):
+        try:
+            identity = identities.acquire(timeout=cooldown * 4)
+        except (RuntimeError, TimeoutError):
+            return "no_identity"
+        try:
+            return "ok" if clients[identity.name].get_text(SITE_URL) else "blocked"
+        finally:
+            identities.release(identity)
+
+    start = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        outcomes = list(executor.map(fetch, range(pages)))
+    seconds = time.perf_counter() - start
+    for client in clients.values():
+        client.close()
+    return {
+        "ok": outcomes.count("ok"),
+        "blocked": outcomes.count("blocked"),
+        "no_identity": outcomes.count("no_identity"),
+        "seconds": round(seconds, 2),
+        "ok_pages_per_sec": round(outcomes.count("ok") / seconds, 1),
+        "identities": identities.summary(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure identity rotation against local proxy stand-ins that get banned.")
+    parser.add_argument("--proxies", type=int, default=4, help="proxy stand-ins; proxy i is banned after (i + 1) * --ban-after "
+                                                               "requests, the last one never")
+    parser.add_argument("--ban-after", type=int, default=40, help="requests before the first proxy is banned")
+    parser.add_argument("--pages", type=int, default=600, help="pages to fetch per run")
+    parser.add_argument("--workers", type=int, default=8, help="fetching threads")
+    parser.add_argument("--cooldown", type=float, default=1.0, help="first cool-down of a blocked identity, in seconds")
+    parser.add_argument("--output", metavar="FILE", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = {}
+    for name, rotate in (("single_identity", False), ("rotation", True)):
+        with ExitStack() as stack:
+            proxies = [stack.enter_context(FixtureServer(ban_after=None if index == args.proxies - 1 else (index + 1) * args.ban_after))
+                       for index in range(args.proxies)]
+            report[name] = crawl(proxies, args.pages, args.workers, args.cooldown, rotate=rotate)
+        result = report[name]
+        print(f"⏱️ {name}: {result['ok']} ok, {result['blocked']} blocked, {result['no_identity']} without an identity, "
+              f"{result['ok_pages_per_sec']} good pages/s")
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+import sys  # Import sys to extend the module search path
+import json  # Import json to print the results
+import time  # Import time to measure page loads
+import argparse  # Import argparse for the benchmark options
+import statistics  # Import statistics for medians
+from pathlib import Path  # Import Path to locate the repository root
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # Make `common` and `benchmarks` importable
+from benchmarks.fixture_server import FixtureServer  # Import the local fixture server
+from common.driver_factory import PROFILES, create_driver  # Import the shared WebDriver factory
+from common.selector_registry import SELECTORS  # Import the compiled per-site selector registry
+from common.waits import wait_for_selector  # Import the adaptive wait layer
+
+
+# Fixture page -> the scraper's selector set for it (waited for, then extracted)
+FIXTURES = {
+    "amazon_product.html": SELECTORS["amazon", "product"],
+    "ebay_search.html": SELECTORS["ebay", "search"],
+    "yelp_search.html": SELECTORS["yelp", "search"],
+}
+
+
+def chrome_cpu_seconds(driver):
+    """ Returns the CPU time used so far by the browser process tree, or None without psutil. """
+    try:
+        import psutil  # Optional: only needed for the CPU column
+    except ImportError:
+        return None
+    try:
+        root = psutil.Process(driver.service.process.pid)
+        processes = [root] + root.children(recursive=True)
+    except psutil.Error:
+        return None
+    total = 0.0
+    for process in processes:
+        try:
+            times = process.cpu_times()
+            total += times.user + times.system
+        except psutil.Error:
+            continue
+    return total
+
+
+# ============================
+# 🟡 Function: Benchmark One Profile
+# ============================
+def benchmark_profile(server, profile, repeat=5, headless=False, driver_path=None):
+    """
+    Loads every fixture page `repeat` times with one browser profile.
+
+    Returns:
+        dict: Median load time per page, bytes and requests downloaded per page,
+        browser CPU seconds per page (with psutil) and whether extraction still worked.
+    """
+    driver = create_driver(profile=profile, headless=headless, driver_path=driver_path)
+    results = {}
+    try:
+        for page, selectors in FIXTURES.items():
+            timings = []
+            requests_before, bytes_before = server.snapshot()
+            cpu_before = chrome_cpu_seconds(driver)
+            records = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                driver.get(server.url(page))
+                wait_for_selector(driver, selectors.xpath, timeout=10)
+                records = selectors.extract_js(driver)
+                timings.append(time.perf_counter() - start)
+            requests_after, bytes_after = server.snapshot()
+            cpu_after = chrome_cpu_seconds(driver)
+            results[page] = {
+                "median_seconds": round(statistics.median(timings), 4),
+                "requests_per_page": (requests_after - requests_before) / repeat,
+                "kilobytes_per_page": round((bytes_after - bytes_before) / repeat / 1024, 1),
+                "cpu_seconds_per_page": None if cpu_before is None else round((cpu_after - cpu_before) / repeat, 4),
+                "records": len(records),
+            }
+            print(f"⏱️ {profile:5} {page}: {results[page]}")
+    finally:
+        driver.quit()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the lean and full browser profiles on saved fixture pages.")
+    parser.add_argument("--repeat", type=int, default=5, help="page loads per fixture and profile")
+    parser.add_argument("--latency", type=float, default=0.02, help="seconds added to every response")
+    parser.add_argument("--headless", action="store_true", help="run the full profile headless too")
+    parser.add_argument("--driver", metavar="PATH", help="ChromeDriver executable (Selenium Manager if omitted)")
+    parser.add_argument("--output", metavar="FILE", help="also write the JSON report to this file")
+    args = parser.parse_args()
+
+    report = {}
+    with FixtureServer(latency=args.latency) as server:
+        for profile in PROFILES:
+            report[profile] = benchmark_profile(server, profile, repeat=args.repeat,
+                                                headless=args.headless, driver_path=args.driver)
+
+    report["lean_vs_full"] = {
+        page: {
+            "speedup": round(report["full"][page]["median_seconds"] / max(report["lean"][page]["median_seconds"], 1e-9), 2),
+            "bytes_saved": f'{100 * (1 - report["lean"][page]["kilobytes_per_page"] / max(report["full"][page]["kilobytes_per_page"], 1e-9)):.0f}%',
+        }
+        for page in FIXTURES
+    }
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(text)
+
+
+if __name__ == "__main__":
+    main()
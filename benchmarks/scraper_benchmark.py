@@ -0,0 +1,390 @@
+import sys  # Import sys to extend the module search path
+import json  # Import json to write and compare reports
+import time  # Import time to measure page timings
+import platform  # Import platform to describe the machine in the report
+import argparse  # Import argparse for the benchmark options
+import contextlib  # Import contextlib to silence the scrapers' progress prints
+import importlib.util  # Import importlib to load the scraper scripts by path
+import io  # Import io for the discarded progress output
+import subprocess  # Import subprocess to record the git commit
+import multiprocessing  # Import multiprocessing to measure every case in a fresh process
+import concurrent.futures  # Import concurrent.futures to run a case in a child process
+from pathlib import Path  # Import Path to locate the repository root
+from urllib.parse import urljoin, urlparse  # Import URL helpers to find the infinite-scroll endpoint
+
+ROOT = Path(__file__).resolve().parents[1]  # Repository root
+sys.path.append(str(ROOT))  # Make `common` and `benchmarks` importable
+from benchmarks.fixture_server import FixtureServer  # Import the local mock site server
+from common import search_urls  # Import the search URL templates (Yelp's is pointed at the mock server)
+from common.html_parser import parse_html  # Import the static-HTML parser
+from common.http_client import HttpClient  # Import the pooled HTTP client the lightweight mode uses
+from common.rate_limit import RATE_LIMITER  # Import the shared limiter the browser scrapers wait on
+from common.search_urls import with_query_param  # Import the results-page URL helper
+from common.selector_registry import SELECTORS  # Import the compiled per-site selector registry
+
+
+REPORT_VERSION = 2  # Bump when the report layout changes, so old baselines are not compared blindly
+
+# Case -> (fixture URL, what is timed, how it walks the site, results-page parameter)
+#   What is timed: a scraper script's own function (site, function), or a selector set for the
+#   notebooks' sites and the pages no script function covers on its own.
+#   single: one page; paged: results pages until one is empty; scroll: the page, then /scroll/ batches;
+#   next_link: follows the scraper's "next page" links; scraper: the scraper function walks the pages
+#   itself; browser: the scraper function drives headless Chrome (skipped where Chrome is missing).
+CASES = {
+    "amazon_search": ("amazon_search.html?k=headphones", ("amazon", "product_urls_from_html"), "paged", "page"),
+    "amazon_product": ("amazon_product.html", ("amazon", "product"), "single", None),
+    "ebay_search": ("ebay_search.html?_nkw=camera", ("ebay", "extract_products_lightweight"), "next_link", None),
+    "yelp_search": ("yelp_search.html", ("yelp", "extract_all_businesses"), "scraper", None),
+    "google_maps_feed": ("google_maps_feed.html", ("google_maps", "harvest_places"), "browser", None),
+    "linkedin_search": ("linkedin_search.html?keywords=data", ("linkedin", "search"), "paged", "page"),
+    "linkedin_profile": ("linkedin_profile.html", ("linkedin", "profile"), "single", None),
+    "instagram_profile": ("instagram_profile.html", ("instagram", "profile"), "single", None),
+    "instagram_posts": ("instagram_profile.html", ("instagram", "posts"), "scroll", None),
+}
+
+SCRIPTS = {  # Site -> scraper script whose functions the cases call
+    "amazon": "amazon_scraping/python-scripts/amazon_scraper.py",
+    "ebay": "ebay_scraping/python-scripts/ebay_scraper.py",
+    "yelp": "yelp_scraping/python-scripts/yelp_scraper.py",
+    "google_maps": "google_maps_scraping/python-scripts/google_maps_scraper.py",
+}
+
+
+def peak_rss_mb():
+    """ Returns this process's peak resident set size in MB, or None where it cannot be read. """
+    try:
+        import resource  # Unix only
+    except ImportError:
+        try:
+            import psutil  # Optional: Windows peak working set
+            return round(psutil.Process().memory_info().peak_wset / 2 ** 20, 1)
+        except (ImportError, AttributeError):
+            return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss  # KB on Linux, bytes on macOS
+    return round(peak / (2 ** 20 if sys.platform == "darwin" else 2 ** 10), 1)
+
+
+def percentile(values, q):
+    """ Returns the `q`-th percentile (nearest rank) of `values`, or None if there are none. """
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(q / 100 * len(ordered) + 0.5) - 1))]
+
+
+def page_urls(base_url, param):
+    """ Yields the URL of results page 1, 2, ... using the site's page parameter (Yelp counts results). """
+    page = 1
+    while True:
+        value = (page - 1) * 10 + 1 if param == "start" else page
+        yield with_query_param(base_url, param, value)
+        page += 1
+
+
+def load_scraper(site):
+    """ Imports a scraper script by path; its entry code only runs under `__main__`, so nothing is scraped. """
+    spec = importlib.util.spec_from_file_location(f"{site}_scraper", ROOT / SCRIPTS[site])
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+# ============================
+# 🟡 Class: Timed HTTP Client
+# ============================
+class TimedClient(HttpClient):
+    """ An HttpClient that records how long every `get_text` took, so fetch and extraction can be told apart. """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.fetch_seconds = []
+
+    def get_text(self, url, **kwargs):
+        start = time.perf_counter()
+        try:
+            return super().get_text(url, **kwargs)
+        finally:
+            self.fetch_seconds.append(time.perf_counter() - start)
+
+
+# ============================
+# 🟡 Class: Page Timer Sink
+# ============================
+class PageTimer:
+    """ A stand-in output sink that notes when each page's records arrive (`extract_all_businesses` streams pages to it). """
+
+    def __init__(self):
+        self.pages = []  # (records, perf_counter when they arrived)
+
+    def write_many(self, records):
+        self.pages.append((len(records), time.perf_counter()))
+
+    def flush(self):
+        pass
+
+
+# ============================
+# 🟡 Class: Timed WebDriver
+# ============================
+class TimedDriver:
+    """ Wraps a WebDriver and notes every call of one script (the scraper's harvest round); everything else is passed through. """
+
+    def __init__(self, driver, script):
+        self.driver = driver
+        self.script = script
+        self.rounds = []  # (records, seconds in the script, perf_counter when it returned)
+
+    def execute_script(self, script, *args):
+        if script != self.script:
+            return self.driver.execute_script(script, *args)
+        start = time.perf_counter()
+        result = self.driver.execute_script(script, *args)
+        done = time.perf_counter()
+        self.rounds.append((len(result["places"]) if result else 0, done - start, done))
+        return result
+
+    def __getattr__(self, name):
+        return getattr(self.driver, name)
+
+
+def fetch_and_extract(client, extract, url):
+    """ Returns (records on the page, seconds for fetch + parse + extract, seconds for parse + extract). """
+    start = time.perf_counter()
+    text = client.get_text(url)
+    fetched = time.perf_counter()
+    records = extract(text, url) if text and text.strip() else 0
+    done = time.perf_counter()
+    return records, done - start, done - fetched
+
+
+# ============================
+# 🟡 Function: Walk One Case
+# ============================
+def walk(client, extract, url, mode, param):
+    """
+    Fetches and extracts the pages of one case the way its scraper walks the site: one page,
+    results pages until an empty one, or an infinite-scroll feed batch by batch until it ends.
+    `extract(text, url)` returns the number of records on a page.
+
+    Yields:
+        tuple: (records on the page, seconds for fetch + parse + extract, seconds for parse + extract)
+    """
+    if mode == "paged":
+        for page_url in page_urls(url, param):
+            result = fetch_and_extract(client, extract, page_url)
+            if not result[0]:
+                return  # Past the last results page
+            yield result
+    elif mode == "scroll":
+        scroll_url = urljoin(url, "/scroll" + urlparse(url).path)  # Where the page's script loads more items
+        offset = 0
+        result = fetch_and_extract(client, extract, url)
+        while result[0]:
+            yield result
+            offset += result[0]
+            result = fetch_and_extract(client, extract, f"{scroll_url}?offset={offset}")
+    else:
+        result = fetch_and_extract(client, extract, url)
+        if result[0]:
+            yield result
+
+
+def walk_next_links(client, scrape, url):
+    """ Walks results pages with `scrape(client, url)` -> (records, next URL) | None, as eBay's lightweight mode does. """
+    while url:
+        start = time.perf_counter()
+        fetches = len(client.fetch_seconds)
+        result = scrape(client, url)
+        seconds = time.perf_counter() - start
+        if not result:
+            return  # Past the last results page
+        records, url = result
+        yield len(records), seconds, seconds - sum(client.fetch_seconds[fetches:])
+
+
+def walk_yelp(client, scraper, pages):
+    """ Runs `extract_all_businesses` over the mock server's results pages and times each page it streams out. """
+    sink = PageTimer()
+    start = time.perf_counter()
+    fetches = len(client.fetch_seconds)
+    with contextlib.redirect_stdout(io.StringIO()):
+        scraper.extract_all_businesses(None, "cafes", "London", max_pages=pages, client=client, sink=sink)
+    for (count, arrived), fetch in zip(sink.pages, client.fetch_seconds[fetches:]):
+        yield count, arrived - start, arrived - start - fetch
+        start = arrived
+
+
+def walk_browser(driver, scraper, url):
+    """ Opens the feed in the browser and runs `harvest_places` to its end, timing every scroll round. """
+    timed = TimedDriver(driver, scraper.HARVEST_SCRIPT)
+    start = time.perf_counter()
+    driver.get(url)
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in scraper.harvest_places(timed, scroll_timeout=5):
+            pass
+    for count, script, done in timed.rounds:
+        if count:
+            yield count, done - start, script
+        start = done
+
+
+def case_walker(name, base_url, pages):
+    """
+    Builds the walk of one case, loading its scraper script if it has one.
+
+    Returns:
+        tuple: (function(client) yielding page timings, WebDriver to quit afterwards or None)
+    """
+    fixture, target, mode, param = CASES[name]
+    url = base_url + fixture
+    if mode == "browser":
+        scraper = load_scraper(target[0])
+        from common.driver_factory import create_driver  # Imported here: only this case needs Selenium and Chrome
+        driver = create_driver(profile="lean", headless=True)
+        return (lambda client: walk_browser(driver, scraper, url)), driver
+    if mode == "scraper":
+        scraper = load_scraper(target[0])
+        search_urls.SEARCH_URLS["yelp"] = (url, search_urls.SEARCH_URLS["yelp"][1])  # Search "Yelp" on the mock server
+        return (lambda client: walk_yelp(client, scraper, pages)), None
+    if mode == "next_link":
+        scrape = getattr(load_scraper(target[0]), target[1])
+        return (lambda client: walk_next_links(client, scrape, url)), None
+    if target in SELECTORS.sets:
+        selectors = SELECTORS[target]
+        extract = lambda text, page_url: len(selectors.extract(parse_html(text, base_url=page_url), base_url=page_url))
+    else:
+        read_page = getattr(load_scraper(target[0]), target[1])
+        site_url = search_urls.SEARCH_URLS[target[0]][0]  # Links resolve as on the real site, whose product links the scraper keeps
+        extract = lambda text, page_url: len(read_page(text, site_url))
+    return (lambda client: walk(client, extract, url, mode, param)), None
+
+
+# ============================
+# 🟡 Function: Benchmark One Case
+# ============================
+def run_case(name, base_url, repeat=3, pages=5):
+    """
+    Runs one case `repeat` times against the fixture server at `base_url`.
+    Meant to run in a fresh process, so the peak RSS belongs to this case alone.
+
+    Returns:
+        dict: pages/s, records/s, p50/p95 page latency and extraction time (ms), peak RSS (MB);
+        or {"skipped": reason} when the case needs a browser that cannot be started.
+    """
+    page_seconds, extract_seconds = [], []
+    total_pages = records = 0
+    rss_start = peak_rss_mb()
+    RATE_LIMITER.rate = RATE_LIMITER.max_rate = 1e6  # The mock server needs no politeness delay
+    try:
+        walker, driver = case_walker(name, base_url, pages)
+    except Exception as e:  # No Chrome / ChromeDriver on this machine
+        return {"skipped": f"{type(e).__name__}: {str(e).splitlines()[0] if str(e) else ''}"}
+    try:
+        with TimedClient(rate_limiter=None) as client:
+            start = time.perf_counter()
+            for _ in range(repeat):
+                for count, seconds, extract in walker(client):
+                    total_pages += 1
+                    records += count
+                    page_seconds.append(seconds)
+                    extract_seconds.append(extract)
+            elapsed = time.perf_counter() - start
+    finally:
+        if driver is not None:
+            driver.quit()
+    return {
+        "pages": total_pages // repeat,
+        "records": records // repeat,
+        "pages_per_sec": round(total_pages / elapsed, 2) if elapsed else None,
+        "records_per_sec": round(records / elapsed, 1) if elapsed else None,
+        "p50_page_ms": round(1000 * percentile(page_seconds, 50), 2) if page_seconds else None,
+        "p95_page_ms": round(1000 * percentile(page_seconds, 95), 2) if page_seconds else None,
+        "p50_extract_ms": round(1000 * percentile(extract_seconds, 50), 3) if extract_seconds else None,
+        "p95_extract_ms": round(1000 * percentile(extract_seconds, 95), 3) if extract_seconds else None,
+        "rss_start_mb": rss_start,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def git_commit():
+    """ Returns the current commit (short hash), or None outside a git checkout. """
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=Path(__file__).resolve().parents[1], check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# ============================
+# 🟡 Function: Compare Two Reports
+# ============================
+def compare(report, baseline):
+    """ Returns per-case throughput and latency changes of `report` relative to `baseline`. """
+    if baseline.get("version") != report["version"] or baseline.get("settings") != report["settings"]:
+        print("⚠️ Baseline was recorded with another report version or other settings; ratios may mislead.")
+    changes = {}
+    for name, result in report["cases"].items():
+        old = baseline.get("cases", {}).get(name)
+        if not old or "skipped" in old or "skipped" in result:
+            continue
+        ratio = lambda key, digits=2: (round(result[key] / old[key], digits)
+                                       if result.get(key) is not None and old.get(key) else None)
+        changes[name] = {
+            "pages_per_sec": ratio("pages_per_sec"),
+            "p95_page_ms": ratio("p95_page_ms"),
+            "p95_extract_ms": ratio("p95_extract_ms"),
+            "peak_rss_mb": round(result["peak_rss_mb"] - old["peak_rss_mb"], 1)
+            if result.get("peak_rss_mb") is not None and old.get("peak_rss_mb") is not None else None,
+        }
+    return changes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every scraper's extraction functions on recorded fixture pages, offline.")
+    parser.add_argument("--cases", nargs="+", choices=list(CASES), default=list(CASES), help="cases to run (default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="walks per case")
+    parser.add_argument("--latency", type=float, default=0.0, help="seconds the mock server adds to every response")
+    parser.add_argument("--pages", type=int, default=5, help="results pages of every paginated fixture")
+    parser.add_argument("--scroll-items", type=int, default=100, help="items of every infinite-scroll fixture")
+    parser.add_argument("--in-process", action="store_true", help="run cases in this process (peak RSS is then cumulative)")
+    parser.add_argument("--output", metavar="FILE", help="also write the JSON report to this file")
+    parser.add_argument("--compare", metavar="FILE", help="baseline report to compare against (ratios new/old)")
+    args = parser.parse_args()
+
+    settings = {"repeat": args.repeat, "latency": args.latency, "pages": args.pages, "scroll_items": args.scroll_items}
+    report = {
+        "version": REPORT_VERSION,
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": settings,
+        "cases": {},
+    }
+    with FixtureServer(latency=args.latency, pages=args.pages, scroll_items=args.scroll_items) as server:
+        context = multiprocessing.get_context("spawn")  # A fresh interpreter per case
+        for name in args.cases:
+            if args.in_process:
+                result = run_case(name, server.url(), args.repeat, args.pages)
+            else:
+                with concurrent.futures.ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                    result = executor.submit(run_case, name, server.url(), args.repeat, args.pages).result()
+            report["cases"][name] = result
+            if "skipped" in result:
+                print(f"⏭️ {name}: skipped ({result['skipped']})")
+                continue
+            print(f"⏱️ {name}: {result['pages_per_sec']} pages/s, {result['records_per_sec']} records/s, "
+                  f"p95 {result['p95_page_ms']} ms, peak RSS {result['peak_rss_mb']} MB")
+
+    if args.compare:
+        with open(args.compare) as file:
+            report["compared_to"] = {"file": args.compare, "changes": compare(report, json.load(file))}
+    text = json.dumps(report, indent=2, sort_keys=True)
+    print(text)
+    if args.output:
+        with open(args.output, "w") as file:
+            file.write(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+import time  # Import time to measure waits
+import asyncio  # Import asyncio for the tab semaphore and the thread fallback
+from fnmatch import fnmatch  # Import fnmatch to match request URLs against the blocked patterns
+from contextlib import asynccontextmanager  # Import asynccontextmanager for the `page()` helper
+
+try:
+    from playwright.async_api import async_playwright  # Optional: native async browser over CDP (pip install playwright)
+except ImportError:
+    async_playwright = None
+
+from common.concurrency import ConcurrencyLimits  # Import the shared in-flight limits
+from common.driver_factory import BLOCKED_URL_PATTERNS  # Import the requests the lean profile never makes
+from common.driver_pool import DriverPool  # Import the WebDriver pool (fallback)
+from common.cookies import read_cookies  # Import the cookie jar reader for identities' own jars
+from common.identities import using_identity  # Import the identity tracking of the rate limiter
+from common.metrics import METRICS  # Import the hot-path timers and counters
+from common.rate_limit import RATE_LIMITER  # Import the shared per-domain rate limiter
+from common.block_detect import PROBE_SCRIPT  # Import the early block / empty page probe
+from common.js_extract import QUERY_HELPERS  # Import the XPath/CSS query helpers
+from common.waits import DOM_QUIET_SCRIPT, POLL_INTERVAL, WAIT_STATS, page_verdict, wait_for_dom_quiet, wait_for_selector  # Import the adaptive waits
+
+
+BLOCKED_RESOURCE_TYPES = {"image", "font", "media"}  # Playwright resource types dropped by `block_resources`
+VIEWPORT = {"width": 1280, "height": 800}  # Same window as the "lean" Selenium profile
+
+
+def playwright_cookie(cookie):
+    """ Converts a Selenium cookie (`driver.get_cookies()`, common/cookies.py files) to Playwright's format. """
+    converted = {
+        "name": cookie["name"],
+        "value": cookie["value"],
+        "domain": cookie.get("domain", ""),
+        "path": cookie.get("path", "/"),
+        "secure": cookie.get("secure", False),
+        "httpOnly": cookie.get("httpOnly", False),
+    }
+    if "expiry" in cookie:
+        converted["expires"] = cookie["expiry"]
+    if cookie.get("sameSite") in ("Strict", "Lax", "None"):
+        converted["sameSite"] = cookie["sameSite"]
+    return converted
+
+
+# ============================
+# 🟡 Class: Async Browser Page
+# ============================
+class AsyncPage:
+    """
+    One browser tab borrowed from `AsyncBrowser.page()`: a Playwright page, or a pooled
+    WebDriver session driven from a worker thread. Extraction is done on `content()` with
+    the lxml selector sets, so both engines return the same records.
+    """
+
+    def __init__(self, browser, page=None, driver=None):
+        self.browser = browser
+        self._page = page
+        self._driver = driver
+        self.url = None
+
+    async def goto(self, url):
+        """
+        Opens `url` once the site has a free slot and the rate limiter allows it.
+
+        Returns:
+            int | None: The HTTP status of the document (None on the WebDriver fallback).
+        """
+        async with self.browser.limits.slot(url):
+            if self.browser.rate_limiter is not None:
+                await self.browser.rate_limiter.acquire_async(url)
+            self.url = url
+            if self._page is None:
+                await asyncio.to_thread(self._driver.get, url)  # Timed as "navigate" by the instrumented driver
+                return None
+            with METRICS.span("navigate", engine="playwright"):
+                response = await self._page.goto(url, wait_until="domcontentloaded")
+        return response.status if response is not None else None
+
+    async def wait_for(self, xpath, timeout=10):
+        """
+        Waits until at least one node matches `xpath`; returns False if the upper bound was hit,
+        or as soon as the page is recognized as a block or empty result (see `wait_for_selector`).
+        """
+        if self._page is None:
+            return await asyncio.to_thread(wait_for_selector, self._driver, xpath, timeout)
+        start = time.monotonic()
+        ready, verdict = False, None
+        while time.monotonic() - start < timeout:
+            try:
+                probe = await self._page.evaluate(f"(selector) => {{{QUERY_HELPERS}{PROBE_SCRIPT}}}", xpath)
+            except Exception:  # E.g. the document was replaced mid-check
+                probe = None
+            verdict = page_verdict(probe)
+            if probe is True or verdict is not None:
+                ready = probe is True
+                break
+            await asyncio.sleep(POLL_INTERVAL)  # Other pages keep working meanwhile
+        WAIT_STATS.record("selector", time.monotonic() - start, ready)
+        if verdict is not None:
+            METRICS.count("early_exits", site=verdict.site, kind=verdict.kind)
+            print(f"⛔ Not waiting for {xpath}: {verdict.site} {verdict.kind} ({verdict.reason})")
+        return ready
+
+    async def wait_for_dom_quiet(self, quiet=0.5, timeout=5):
+        """ Waits until the DOM has not changed for `quiet` seconds (see `common.waits.wait_for_dom_quiet`). """
+        if self._page is None:
+            return await asyncio.to_thread(wait_for_dom_quiet, self._driver, quiet, timeout)
+        start = time.monotonic()
+        ready = False
+        while not ready and time.monotonic() - start < timeout:
+            ready = await self._page.evaluate(f"() => {{{DOM_QUIET_SCRIPT}}}") >= quiet * 1000
+            if not ready:
+                await asyncio.sleep(POLL_INTERVAL)  # Other pages keep working meanwhile
+        WAIT_STATS.record("dom_quiet", time.monotonic() - start, ready)
+        return ready
+
+    async def scroll(self, times=3, pixels=500, delay=2):
+        """ Scrolls down `times` times, waiting (at most `delay` seconds) for lazy content after each. """
+        for _ in range(times):
+            await self.evaluate(f"window.scrollBy(0, {int(pixels)});")
+            await self.wait_for_dom_quiet(quiet=0.3, timeout=delay)
+
+    async def evaluate(self, script):
+        """ Runs a script body (WebDriver `execute_script` style, `return` for a value) in the page. """
+        if self._page is None:
+            return await asyncio.to_thread(self._driver.execute_script, script)
+        with METRICS.span("script", engine="playwright"):
+            return await self._page.evaluate(f"() => {{{script}}}")
+
+    async def content(self):
+        """ Returns the page's current HTML. """
+        if self._page is None:
+            return await asyncio.to_thread(lambda: self._driver.page_source)
+        return await self._page.content()
+
+    async def current_url(self):
+        """ Returns the URL the tab ended up on (after redirects, e.g. to a login wall). """
+        if self._page is None:
+            return await asyncio.to_thread(lambda: self._driver.current_url)
+        return self._page.url
+
+    async def title(self):
+        """ Returns the page's title. """
+        if self._page is None:
+            return await asyncio.to_thread(lambda: self._driver.title)
+        return await self._page.title()
+
+
+# ============================
+# 🟡 Class: Async Browser
+# ============================
+class AsyncBrowser:
+    """
+    A browser shared by every coroutine of a scraper: one process, one tab per task.
+
+    - engine "playwright": one headless Chromium driven over CDP by Playwright's async API;
+      tabs are cheap, share one cookie jar and skip images, fonts, media, ads and analytics
+    - engine "selenium": a `DriverPool` of sessions from `factory`, each driven from a
+      worker thread so the event loop never blocks (persistent profiles, visible browsers)
+    - engine "auto": Playwright when it is installed, Selenium otherwise
+
+    At most `size` tabs are open at once; navigation also takes a `ConcurrencyLimits` slot
+    and waits for the rate limiter.
+
+    With an IdentityPool (common/identities.py), every tab takes a healthy identity: Playwright
+    opens one context per identity (user agent, proxy, viewport, locale and cookie jar), and
+    Selenium sessions are started with one (see `DriverPool`).
+
+    Args:
+        factory: Callable returning a new WebDriver (the Selenium engine's sessions).
+        size (int): Tabs / sessions open at once.
+        limits (ConcurrencyLimits): Shared in-flight limits (a default set if omitted).
+        engine (str): "auto", "playwright" or "selenium".
+        headless (bool): Run Playwright's Chromium without a window.
+        block_resources (bool): Drop images, fonts, media and BLOCKED_URL_PATTERNS (Playwright).
+        user_agent (str): User-Agent of Playwright's pages.
+        rate_limiter (DomainRateLimiter): Per-domain request pacing (None disables it).
+        max_pages (int): Recycle a Selenium session after this many tasks.
+        identities (IdentityPool): Identities to spread tabs / sessions over (None: one default identity).
+
+    Example:
+        async with AsyncBrowser(factory=setup_driver, size=4) as browser:
+            async with browser.page() as page:
+                await page.goto(url)
+                html = await page.content()
+    """
+
+    def __init__(self, factory=None, size=4, limits=None, engine="auto", headless=True, block_resources=True,
+                 user_agent=None, rate_limiter=RATE_LIMITER, max_pages=50, identities=None):
+        if engine == "auto":
+            engine = "playwright" if async_playwright is not None else "selenium"
+        if engine == "playwright" and async_playwright is None:
+            raise RuntimeError("Playwright is not installed (pip install playwright && playwright install chromium)")
+        if engine == "selenium" and factory is None:
+            raise ValueError("The Selenium engine needs a `factory` returning a WebDriver")
+        self.engine = engine
+        self.factory = factory
+        self.size = size
+        self.limits = limits or ConcurrencyLimits()
+        self.headless = headless
+        self.block_resources = block_resources
+        self.user_agent = user_agent
+        self.rate_limiter = rate_limiter
+        self.max_pages = max_pages
+        self.identities = identities
+        self._tabs = asyncio.Semaphore(size)
+        self._playwright = self._browser = self._context = None
+        self._contexts = {}  # Identity name -> its Playwright context
+        self._cookies = []  # Cookies added with `add_cookies`, for identity contexts without a jar of their own
+        self._pool = None
+
+    async def __aenter__(self):
+        if self.engine == "playwright":
+            with METRICS.span("driver_start", engine="playwright"):
+                self._playwright = await async_playwright().start()
+                self._browser = await self._playwright.chromium.launch(headless=self.headless)
+                self._context = await self._browser.new_context(user_agent=self.user_agent, viewport=VIEWPORT)
+            if self.block_resources:
+                await self._context.route("**/*", self._route)
+        else:
+            self._pool = await asyncio.to_thread(DriverPool, self.factory, self.size, self.max_pages,
+                                                 identities=self.identities)  # Pre-warms in threads
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    async def _route(self, route):
+        request = route.request
+        if request.resource_type in BLOCKED_RESOURCE_TYPES or any(fnmatch(request.url, pattern) for pattern in BLOCKED_URL_PATTERNS):
+            await route.abort()
+        else:
+            await route.continue_()
+
+    async def add_cookies(self, cookies):
+        """
+        Adds Selenium-format cookies to every Playwright tab. Selenium sessions get theirs
+        from `factory` (e.g. `restore_session`), so this is a no-op for that engine.
+        """
+        if self._context is not None and cookies:
+            self._cookies.extend(cookies)
+            for context in [self._context] + list(self._contexts.values()):
+                await context.add_cookies([playwright_cookie(cookie) for cookie in cookies])
+
+    async def _context_for(self, identity):
+        """ Returns the Playwright context of `identity` (the default context for None), opening it on first use. """
+        if identity is None:
+            return self._context
+        if identity.name not in self._contexts:
+            width, height = identity.viewport
+            context = await self._browser.new_context(
+                user_agent=identity.user_agent, viewport={"width": width, "height": height}, locale=identity.locale,
+                proxy=identity.playwright_proxy,
+            )
+            if self.block_resources:
+                await context.route("**/*", self._route)
+            cookies = read_cookies(identity.cookies) or self._cookies
+            if cookies:
+                await context.add_cookies([playwright_cookie(cookie) for cookie in cookies])
+            self._contexts[identity.name] = context
+        return self._contexts[identity.name]
+
+    @asynccontextmanager
+    async def page(self):
+        """
+        Borrows a tab for one task; waits while `size` tabs are in use. A Selenium session
+        is discarded if the block raises.
+        """
+        async with self._tabs:
+            if self._context is not None:
+                identity = await asyncio.to_thread(self.identities.acquire) if self.identities is not None else None
+                try:
+                    page = await (await self._context_for(identity)).new_page()
+                    try:
+                        with using_identity(identity):
+                            yield AsyncPage(self, page=page)
+                    finally:
+                        await page.close()
+                finally:
+                    if identity is not None:
+                        self.identities.release(identity)
+                return
+            pooled = await asyncio.to_thread(self._pool.checkout)
+            try:
+                with using_identity(pooled.identity):
+                    yield AsyncPage(self, driver=pooled.driver)
+            except Exception:
+                pooled.broken = True
+                raise
+            finally:
+                await asyncio.to_thread(self._pool.release, pooled)
+
+    async def close(self):
+        """ Closes every tab and the browser (or quits the pooled sessions). """
+        if self._context is not None:
+            for context in self._contexts.values():
+                await context.close()
+            self._contexts = {}
+            await self._context.close()
+            await self._browser.close()
+            await self._playwright.stop()
+            self._playwright = self._browser = self._context = None
+        if self._pool is not None:
+            await asyncio.to_thread(self._pool.close)
+            self._pool = None
@@ -0,0 +1,171 @@
+import random  # Import random to pick a user agent
+import asyncio  # Import asyncio for the thread fallback
+from http.cookies import SimpleCookie  # Import SimpleCookie to keep a copied cookie's domain and path
+
+try:
+    import aiohttp  # Optional: native async HTTP (pip install aiohttp)
+    from yarl import URL  # Installed with aiohttp; addresses cookies to their domain
+except ImportError:
+    aiohttp = None
+
+from common.block_detect import detect_block  # Import the block / CAPTCHA classifier
+from common.concurrency import ConcurrencyLimits  # Import the shared in-flight limits
+from common.http_client import USER_AGENTS, HttpClient  # Import the user agents and the blocking client (fallback)
+from common.identities import using_identity  # Import the identity tracking of the rate limiter
+from common.metrics import METRICS  # Import the hot-path timers and counters
+from common.rate_limit import RATE_LIMITER  # Import the shared per-domain rate limiter
+
+
+# ============================
+# 🟡 Class: Async HTTP Client
+# ============================
+class AsyncHttpClient:
+    """
+    The asyncio counterpart of `HttpClient` for static pages: one connection pool shared by
+    every coroutine, so hundreds of requests can be in flight from a single thread.
+
+    Uses aiohttp when it is installed. Without it, requests run on the blocking `HttpClient`
+    in worker threads, with the same API and limits.
+
+    Every request waits for a `ConcurrencyLimits` slot and the rate limiter (asynchronously),
+    reports its outcome to the limiter and goes through the page cache like `HttpClient.get_text`.
+
+    Args:
+        limits (ConcurrencyLimits): Shared in-flight limits (a default set if omitted).
+        pool_size (int): Maximum open connections.
+        timeout (float): Per-request timeout in seconds.
+        user_agent (str): User-Agent header (random pick from USER_AGENTS if omitted).
+        rate_limiter (DomainRateLimiter): Per-domain request pacing (None disables it).
+        cache (PageCache): Page cache: fresh pages are served without a request, stale ones revalidated.
+        identity (Identity): Persona to fetch as (user agent, language, proxy; see common/identities.py).
+
+    Example:
+        async with AsyncHttpClient() as client:
+            pages = await asyncio.gather(*(client.get_text(url) for url in urls))
+    """
+
+    def __init__(self, limits=None, pool_size=100, timeout=15, user_agent=None, rate_limiter=RATE_LIMITER, cache=None,
+                 identity=None):
+        self.limits = limits or ConcurrencyLimits()
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        self.identity = identity
+        self.headers = {
+            "User-Agent": user_agent or (identity.user_agent if identity else random.choice(USER_AGENTS)),
+            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+            "Accept-Language": identity.accept_language if identity else "en-US,en;q=0.9",
+        }
+        self._cookies = []  # (name, value, domain, path) copied from a browser before the session opens
+        self._session = None
+        self._fallback = None
+
+    async def __aenter__(self):
+        if aiohttp is not None:
+            connector = aiohttp.TCPConnector(limit=self.pool_size, ttl_dns_cache=300)
+            self._session = aiohttp.ClientSession(connector=connector, headers=self.headers,
+                                                  timeout=aiohttp.ClientTimeout(total=self.timeout))
+        else:
+            self._fallback = HttpClient(pool_size=self.pool_size, timeout=self.timeout,
+                                        user_agent=self.headers["User-Agent"], rate_limiter=None, identity=self.identity)
+        for cookie in self._cookies:
+            self._set_cookie(*cookie)
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
+
+    def _set_cookie(self, name, value, domain, path):
+        if self._session is not None:
+            cookie = SimpleCookie()
+            cookie[name] = value
+            if domain:
+                cookie[name]["domain"] = domain  # A domain cookie, sent to the site's subdomains too (not host-only)
+            cookie[name]["path"] = path
+            self._session.cookie_jar.update_cookies(cookie, URL(f"https://{domain.lstrip('.')}{path}"))
+        elif self._fallback is not None:
+            self._fallback.session.cookies.set(name, value, domain=domain, path=path)
+
+    def add_cookies(self, cookies):
+        """ Adds Selenium-format cookies (`driver.get_cookies()`, common/cookies.py files) to the session. """
+        for cookie in cookies:
+            entry = (cookie["name"], cookie["value"], cookie.get("domain", ""), cookie.get("path", "/"))
+            self._cookies.append(entry)
+            if self._session is not None or self._fallback is not None:
+                self._set_cookie(*entry)
+
+    def load_driver_cookies(self, driver):
+        """ Copies cookies (and the User-Agent) from a Selenium session so both see the same site state. """
+        self.add_cookies(driver.get_cookies())
+        try:
+            self.headers["User-Agent"] = driver.execute_script("return navigator.userAgent;")
+        except Exception:
+            pass
+
+    async def _fetch(self, url, headers):
+        """ Returns (status, text, response headers, final URL after redirects), or raises on a network error. """
+        if self._session is not None:
+            proxy = self.identity.proxy if self.identity is not None else None
+            async with self._session.get(url, headers=headers, proxy=proxy) as response:
+                return response.status, await response.text(errors="replace"), response.headers, str(response.url)
+        response = await asyncio.to_thread(self._fallback.session.get, url, headers=headers, timeout=self.timeout)
+        return response.status_code, response.text, response.headers, response.url
+
+    async def get_text(self, url, headers=None):
+        """
+        Fetches a URL and returns its body, or None on a network error, a non-2xx status or a
+        block page (robot check, login wall, consent page; never cached). With a cache, a fresh
+        cached copy is returned without touching the network, and a stale one is revalidated
+        (a 304 answer reuses the cached body).
+        """
+        if self._session is None and self._fallback is None:
+            raise RuntimeError("AsyncHttpClient must be used as `async with AsyncHttpClient() as client`")
+        cached = self.cache.get(url) if self.cache is not None else None
+        if cached is not None and cached.fresh and cached.html:
+            return cached.html
+        headers = dict(headers or {})
+        headers.setdefault("User-Agent", self.headers["User-Agent"])  # May have changed since the session opened
+        if cached is not None and cached.html:
+            headers = dict(cached.validators(), **headers)
+
+        with using_identity(self.identity):  # Paced and scored as this client's identity (None: a direct connection)
+            async with self.limits.slot(url):
+                if self.rate_limiter is not None:
+                    await self.rate_limiter.acquire_async(url)
+                try:
+                    with METRICS.span("http_get", engine="async"):
+                        status, text, response_headers, final_url = await self._fetch(url, headers)
+                except Exception as e:  # aiohttp.ClientError, requests.RequestException, timeouts
+                    print(f"⚠️ HTTP error fetching {url}: {e}")
+                    return None
+            METRICS.count("http_responses", status=status)
+            ok = 200 <= status < 300
+            final_url = final_url or url  # Where redirects ended: a robot check or login wall is recognised by its URL
+            if self.rate_limiter is not None:
+                verdict = self.rate_limiter.classify(final_url, status=status, text=text if ok else None)
+            else:
+                verdict = detect_block(final_url, status=status, text=text if ok else None)
+
+        if status == 304 and cached is not None and cached.html:
+            self.cache.touch(url)  # Not modified: the cached copy is fresh again
+            return cached.html
+        if verdict is not None and verdict.blocked:
+            print(f"⛔ Blocked fetching {url}: {verdict.kind} ({verdict.reason})")
+            return None
+        if not ok:
+            print(f"⚠️ HTTP {status} fetching {url}")
+            return None
+        if self.cache is not None:
+            self.cache.put(url, html=text, etag=response_headers.get("ETag"),
+                           last_modified=response_headers.get("Last-Modified"))
+        return text
+
+    async def close(self):
+        """ Closes all pooled connections. """
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        if self._fallback is not None:
+            self._fallback.close()
+            self._fallback = None
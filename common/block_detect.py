@@ -0,0 +1,127 @@
+import os  # Import os to locate the signature table
+import re  # Import re to compile the signatures into one pattern per site and field
+import json  # Import json to load the signature table
+from collections import namedtuple  # Import namedtuple for verdicts
+from urllib.parse import urlparse  # Import urlparse to pick a site's signatures
+
+from common.metrics import METRICS  # Import the hot-path timers and counters
+
+
+SIGNATURES_PATH = os.environ.get(  # Signature table; point SCRAPER_BLOCK_SIGNATURES at a copy to try new markers
+    "SCRAPER_BLOCK_SIGNATURES", os.path.join(os.path.dirname(os.path.abspath(__file__)), "block_signatures.json")
+)
+BLOCK_STATUSES = {403: "forbidden", 429: "rate_limited", 503: "rate_limited", 999: "rate_limited"}  # 999: LinkedIn's throttle answer
+BLOCK_KINDS = {"robot_check", "login_wall", "consent", "forbidden", "rate_limited", "suspect_empty"}  # Verdicts that mean "back off"; "empty_result" does not
+TEXT_PREFIX = 50000  # Characters of a response searched for text markers (block pages are small)
+TITLE_PATTERN = re.compile(r"<title[^>]*>(.*?)</title>", re.IGNORECASE | re.DOTALL)
+
+# Browser probe: true when `selector` matches, otherwise what the classifier needs, in one round trip.
+# The markup is returned rather than the visible text, like `page_source`, so markers that only
+# appear in the HTML (Yelp's "px-captcha" element) match too.
+# Needs QUERY_HELPERS (common/js_extract.py) and a `selector` variable.
+PROBE_SCRIPT = f"""
+if (queryFirst(document, selector) !== null) return true;
+return [location.href, document.title, document.documentElement ? document.documentElement.outerHTML.slice(0, {TEXT_PREFIX}) : ''];
+"""
+
+
+class Verdict(namedtuple("Verdict", "kind site reason")):
+    """ What a page is instead of the expected content: a block ("robot_check", "login_wall", ...) or "empty_result". """
+
+    __slots__ = ()
+
+    @property
+    def blocked(self):
+        return self.kind in BLOCK_KINDS
+
+
+class PageBlocked(Exception):
+    """ Raised to abandon a page as soon as it is recognized as a block; `verdict` says which. """
+
+    def __init__(self, verdict):
+        super().__init__(verdict)
+        self.verdict = verdict
+
+    def __str__(self):
+        return f"{self.verdict.site} {self.verdict.kind} ({self.verdict.reason})"
+
+
+# ============================
+# 🟡 Class: Block Detector
+# ============================
+class BlockDetector:
+    """
+    Recognizes robot checks, login walls, consent pages and empty result pages from the
+    cheapest signals first: the HTTP status, the final URL, the title, then the first
+    TEXT_PREFIX characters of the page. Markers come from a per-site table
+    (`block_signatures.json`, "*" applies to every site) compiled into one case-insensitive
+    pattern per site and field, so a check costs a few regex scans and no DOM work.
+
+    Args:
+        table (dict): {site: {kind: {"url" / "title" / "text": [markers]}}}.
+    """
+
+    FIELDS = ("url", "title", "text")
+
+    def __init__(self, table):
+        self._patterns = {}  # Site -> field -> compiled pattern with one named group per kind
+        for site, kinds in table.items():
+            for field in self.FIELDS:
+                groups = [f"(?P<{kind}>{'|'.join(re.escape(marker) for marker in markers[field])})"
+                          for kind, markers in kinds.items() if markers.get(field)]
+                if groups:
+                    self._patterns.setdefault(site, {})[field] = re.compile("|".join(groups), re.IGNORECASE)
+        self.sites = [site for site in table if site != "*"]
+
+    @classmethod
+    def load(cls, path=SIGNATURES_PATH):
+        with open(path, encoding="utf-8") as file:
+            return cls(json.load(file))
+
+    def site_of(self, url):
+        """ Returns the table's site for a URL ("amazon" for www.amazon.co.uk), or "*". """
+        host = urlparse(url or "").netloc.lower()
+        return next((site for site in self.sites if f"{site}." in host), "*")
+
+    def detect(self, url, status=None, text=None, title=None):
+        """
+        Classifies a response or a rendered page.
+
+        Args:
+            url (str): The URL the page ended up on (after redirects).
+            status (int): HTTP status, if known.
+            text (str): Page HTML or visible text; only the first TEXT_PREFIX characters are read.
+            title (str): Document title (read from `text` when omitted).
+
+        Returns:
+            Verdict | None: None when nothing matched (the page looks like real content).
+        """
+        site = self.site_of(url)
+        if status in BLOCK_STATUSES:
+            return self.verdict(BLOCK_STATUSES[status], site, f"HTTP {status}")
+        if text and title is None:
+            match = TITLE_PATTERN.search(text, 0, TEXT_PREFIX)
+            title = match.group(1).strip() if match else None
+        values = {"url": url, "title": title, "text": text[:TEXT_PREFIX] if text else None}
+        for field in self.FIELDS:
+            if not values[field]:
+                continue
+            for patterns in (self._patterns.get(site, {}), self._patterns.get("*", {})):
+                match = patterns[field].search(values[field]) if field in patterns else None
+                if match:
+                    return self.verdict(match.lastgroup, site, f"{field} matched '{match.group(0)}'")
+        return None
+
+    @staticmethod
+    def verdict(kind, site, reason):
+        """ Returns (and counts) a Verdict. """
+        METRICS.count("page_verdicts", site=site, kind=kind)
+        return Verdict(kind, site, reason)
+
+
+BLOCK_DETECTOR = BlockDetector.load()  # Loaded and compiled once per process
+
+
+def detect_block(url, status=None, text=None, title=None):
+    """ Classifies a page with the process-wide detector (see `BlockDetector.detect`). """
+    return BLOCK_DETECTOR.detect(url, status=status, text=text, title=title)
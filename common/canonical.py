@@ -0,0 +1,87 @@
+import re  # Import re to pull item IDs out of URLs
+from urllib.parse import parse_qs, unquote, urljoin, urlparse  # Import URL helpers
+
+from common.page_cache import normalize_url  # Import the generic URL normalization
+
+
+AMAZON_ASIN = re.compile(r"/(?:dp|gp/product|gp/aw/d|exec/obidos/ASIN|o/ASIN)/([A-Z0-9]{10})(?:[/?]|$)")
+EBAY_ITEM = re.compile(r"/itm/(?:[^/?]+/)?(\d{9,15})(?:[/?]|$)")
+YELP_BIZ = re.compile(r"/biz/([^/?#]+)")
+LINKEDIN_PROFILE = re.compile(r"/in/([^/?#]+)")
+MAPS_PLACE_ID = re.compile(r"!19s(ChIJ[\w-]+)")  # Google place ID in a /maps/place/ data blob
+MAPS_FEATURE_ID = re.compile(r"!1s(0x[0-9a-f]+:0x[0-9a-f]+)")  # Feature ID, present on every place link
+
+REDIRECT_PARAMS = ("url", "redirect_url", "u")  # Where ad / tracking redirects keep the real link
+
+
+def _unwrap_redirect(url):
+    """ Returns the target of a sponsored / ad redirect (Amazon /sspa/click, Yelp /adredir), else `url`. """
+    parts = urlparse(url)
+    if "/sspa/click" in parts.path or "/adredir" in parts.path:
+        query = parse_qs(parts.query)
+        for name in REDIRECT_PARAMS:
+            if name in query:
+                return urljoin(url, unquote(query[name][0]))
+    return url
+
+
+# ============================
+# 🟡 Function: Canonical Item Key
+# ============================
+def canonical_key(url):
+    """
+    Reduces a link to the identity of the item it points at, so every variant of the same
+    product / business / place maps to one key:
+
+    - Amazon: "amazon:<ASIN>" (sponsored, ref= and tracking variants included)
+    - eBay: "ebay:<item ID>"
+    - Yelp: "yelp:<biz slug>"
+    - Google Maps: "maps:<place ID>" (or the feature ID when the link has no place ID)
+    - LinkedIn: "linkedin:<profile slug>"
+    - anything else: the normalized URL
+
+    Args:
+        url (str): Absolute link as found on a page.
+    """
+    url = _unwrap_redirect(url)
+    host = urlparse(url).netloc.lower()
+    path = urlparse(url).path
+    if "amazon." in host and (match := AMAZON_ASIN.search(path)):
+        return f"amazon:{match.group(1)}"
+    if "ebay." in host and (match := EBAY_ITEM.search(path)):
+        return f"ebay:{match.group(1)}"
+    if "yelp." in host and (match := YELP_BIZ.search(path)):
+        return f"yelp:{unquote(match.group(1))}"
+    if "google." in host and "/maps" in path:
+        match = MAPS_PLACE_ID.search(url) or MAPS_FEATURE_ID.search(url)
+        if match:
+            return f"maps:{match.group(1)}"
+    if "linkedin." in host and (match := LINKEDIN_PROFILE.search(path)):
+        return f"linkedin:{unquote(match.group(1)).lower()}"
+    return normalize_url(url)
+
+
+# ============================
+# 🟡 Function: Canonical URL
+# ============================
+def canonical_url(url):
+    """
+    Returns the shortest URL that still opens the same item, e.g.
+    `https://www.amazon.com/Some-Name/dp/B0ABC12345/ref=sr_1_3?th=1` -> `https://www.amazon.com/dp/B0ABC12345`.
+    Links that are not a known item page are only normalized.
+    """
+    url = _unwrap_redirect(url)
+    parts = urlparse(url)
+    origin = f"{parts.scheme or 'https'}://{parts.netloc.lower()}"
+    site, _, item = canonical_key(url).partition(":")
+    if site == "amazon":
+        return f"{origin}/dp/{item}"
+    if site == "ebay":
+        return f"{origin}/itm/{item}"
+    if site == "yelp":
+        return f"{origin}/biz/{item}"
+    if site == "linkedin":
+        return f"{origin}/in/{item}/"
+    if site == "maps":
+        return url.split("?")[0]  # The place path already identifies it; only the tracking query goes
+    return normalize_url(url)
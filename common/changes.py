@@ -0,0 +1,257 @@
+import os  # Import os to derive the change-store and delta paths
+import json  # Import json to hash records field by field
+import time  # Import time to stamp runs
+import sqlite3  # Import sqlite3 for the persistent hash store
+import threading  # Import threading so worker threads can share one store
+
+from common.canonical import canonical_key, canonical_url  # Import the per-site item identity
+from common.dedup import fingerprint  # Import the 64-bit key fingerprint
+from common.metrics import METRICS  # Import the hot-path timers and counters
+from common.sinks import open_sink  # Import the streaming output sinks
+
+
+URL_FIELDS = ("URL", "Link")  # Where records keep their item's link
+IGNORED_FIELDS = URL_FIELDS + ("Change", "Run")  # Not part of an item's content: tracking links vary between crawls
+
+
+def url_field(record):
+    """ Returns the name of the record's link field ("URL", or "Link" for Google Maps places). """
+    return next((name for name in URL_FIELDS if record.get(name)), "URL")
+
+
+def record_hash(record, ignore=IGNORED_FIELDS):
+    """ Returns a signed 64-bit hash of a record's content (field order does not matter). """
+    content = json.dumps({name: value for name, value in record.items() if name not in ignore}, sort_keys=True, default=str)
+    value = fingerprint(content)
+    return value - (1 << 64) if value >= 1 << 63 else value  # SQLite integers are signed
+
+
+# ============================
+# 🟡 Class: Change Store
+# ============================
+class ChangeStore:
+    """
+    Remembers, per item key (ASIN, eBay item ID, Yelp biz slug; see `canonical_key`), a hash
+    of the record the last crawl produced and the run that last saw it. Each crawl then
+    classifies every record as new, changed or unchanged, and lists the items it no longer saw.
+
+    It also keeps a hash of an item's listing-level fields (price and rating on the results
+    page), so a scraper can skip the detail page of an item whose listing did not change.
+
+    The store is a few dozen bytes per item; what changes is written as a delta, so storage
+    and fetches grow with churn rather than with catalog size.
+
+    Args:
+        path (str): SQLite file, one per job (its output).
+        resume (bool): Continue the last run if it did not finish (items it saw are not "removed").
+    """
+
+    def __init__(self, path, resume=False):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS items (key TEXT PRIMARY KEY, url TEXT, hash INTEGER, listing INTEGER, "
+            "pending_listing INTEGER, run INTEGER, removed INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._conn.execute("CREATE TABLE IF NOT EXISTS runs (id INTEGER PRIMARY KEY AUTOINCREMENT, started REAL, finished REAL)")
+        last = self._conn.execute("SELECT id, started, finished FROM runs ORDER BY id DESC LIMIT 1").fetchone()
+        with self._conn:
+            if resume and last is not None and last[2] is None:
+                self.run, self.started = last[0], last[1]
+            else:
+                self.started = time.time()
+                self.run = self._conn.execute("INSERT INTO runs (started) VALUES (?)", (self.started,)).lastrowid
+        self.counts = {"new": 0, "changed": 0, "unchanged": 0, "skipped": 0, "removed": 0}
+
+    def classify(self, record, key=None):
+        """
+        Stores the record's hash and returns "new", "changed" or "unchanged" compared with the
+        last crawl. A listing remembered by `check_listing` is confirmed at the same time.
+        """
+        url = record.get(url_field(record))
+        key = key or canonical_key(url)
+        value = record_hash(record)
+        with self._lock:
+            row = self._conn.execute("SELECT hash, removed FROM items WHERE key = ?", (key,)).fetchone()
+            change = "new" if row is None or row[1] else "changed" if row[0] != value else "unchanged"
+            with self._conn:
+                self._conn.execute(
+                    "INSERT INTO items (key, url, hash, run, removed) VALUES (?, ?, ?, ?, 0) "
+                    "ON CONFLICT(key) DO UPDATE SET url = excluded.url, hash = excluded.hash, run = excluded.run, "
+                    "removed = 0, listing = COALESCE(pending_listing, listing), pending_listing = NULL",
+                    (key, url, value, self.run),
+                )
+            self.counts[change] += 1
+        METRICS.count("changes", change=change)
+        return change
+
+    def check_listing(self, url, listing):
+        """
+        Returns True when `listing` (the item's fields on the results page) is the same as when
+        its detail page was last scraped, so the detail page can be skipped. Otherwise the
+        listing is remembered until `classify` stores the new detail record, and False is
+        returned. Either way a known item counts as seen, so a detail page that fails to load
+        does not make it look removed. Call `skip` for the detail pages actually not fetched.
+        """
+        key = canonical_key(url)
+        value = record_hash(listing)
+        with self._lock:
+            row = self._conn.execute("SELECT listing, removed FROM items WHERE key = ?", (key,)).fetchone()
+            unchanged = row is not None and not row[1] and row[0] == value
+            with self._conn:
+                if unchanged:
+                    self._conn.execute("UPDATE items SET run = ? WHERE key = ?", (self.run, key))
+                elif row is not None:
+                    self._conn.execute("UPDATE items SET pending_listing = ?, run = CASE WHEN removed THEN run ELSE ? END "
+                                       "WHERE key = ?", (value, self.run, key))
+                else:
+                    self._conn.execute("INSERT INTO items (key, url, pending_listing, removed) VALUES (?, ?, ?, 1)",
+                                       (key, canonical_url(url), value))  # Not an item until its record is classified
+        return unchanged
+
+    def skip(self, count=1):
+        """ Counts detail pages not fetched because `check_listing` found their listing unchanged. """
+        with self._lock:
+            self.counts["skipped"] += count
+        METRICS.count("changes", count, change="skipped")
+
+    def take_removed(self):
+        """ Returns (key, url) of every item earlier runs saw and this one did not, and marks them removed. """
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                "SELECT key, url FROM items WHERE removed = 0 AND run < ?", (self.run,)
+            ).fetchall()
+            self._conn.execute("UPDATE items SET removed = 1 WHERE removed = 0 AND run < ?", (self.run,))
+            self.counts["removed"] += len(rows)
+        METRICS.count("changes", len(rows), change="removed")
+        return rows
+
+    def finish(self):
+        """ Marks the run complete, so a later `resume` starts a new one. """
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE runs SET finished = ? WHERE id = ?", (time.time(), self.run))
+
+    def summary(self):
+        return dict(self.counts)
+
+    def close(self):
+        self._conn.close()
+
+
+# ============================
+# 🟡 Class: Delta Sink
+# ============================
+class DeltaSink:
+    """
+    Wraps an output sink so only new and changed records reach it, each tagged with a
+    "Change" column ("new" / "changed") and the crawl time ("Run"). `close(complete=True)`
+    then appends one "removed" row per item the crawl no longer saw; an interrupted or
+    partial crawl passes `complete=False`, so its unseen items are not reported as removed.
+
+    Used as a context manager, the crawl is complete only if the scraper said so
+    (`mark_complete`, once pagination really reached the end of the results) and the block
+    did not raise. A crawl that stopped on a block page or at a page limit is not.
+
+    Every row carries all of `fields` (the record schema; missing values empty), so whichever
+    row comes first, the CSV header or SQLite table has every column.
+
+    Args:
+        sink (Sink): The delta output.
+        store (ChangeStore): Item hashes of earlier runs.
+        fields (list): Record fields, e.g. ["Title", "Price", "URL"] (None: the first record's).
+    """
+
+    def __init__(self, sink, store, fields=None):
+        self.sink = sink
+        self.store = store
+        self.fields = list(fields) if fields is not None else None
+        self.complete = False  # Set by `mark_complete` when the crawl saw every item
+        self._url_field = "URL"  # Column of the "removed" rows' links, as in the records
+        self._run = time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(store.started))
+
+    def _row(self, change, record):
+        """ Returns a delta row: Change and Run, then every field of the schema. """
+        if self.fields is None:
+            self.fields = list(record)
+        return dict({"Change": change, "Run": self._run}, **dict(dict.fromkeys(self.fields, ""), **record))
+
+    @property
+    def count(self):
+        return self.sink.count
+
+    def write(self, record):
+        self._url_field = url_field(record)
+        change = self.store.classify(record)
+        if change != "unchanged":
+            self.sink.write(self._row(change, record))
+
+    def write_many(self, records):
+        for record in records:
+            self.write(record)
+
+    def flush(self):
+        self.sink.flush()
+
+    def close(self, complete=False):
+        """ Writes the removed items (if the crawl was `complete`) and closes the sink and the store. """
+        if complete:
+            for _, url in self.store.take_removed():
+                self.sink.write(self._row("removed", {self._url_field: url}))
+            self.store.finish()
+        self.sink.close()
+        counts = self.store.summary()
+        print(f"🔁 Changes: {counts['new']} new, {counts['changed']} changed, {counts['removed']} removed, "
+              f"{counts['unchanged'] + counts['skipped']} unchanged ({counts['skipped']} detail pages skipped)")
+        self.store.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        self.close(complete=self.complete and exc_type is None)
+
+
+def mark_complete(sink):
+    """ Tells an incremental output that the crawl reached the end of its results (see DeltaSink); a no-op otherwise. """
+    if isinstance(sink, DeltaSink):
+        sink.complete = True
+
+
+# ============================
+# 🟡 Function: Open an Incremental Output
+# ============================
+def delta_paths(output):
+    """ Returns (delta file, change store) of an output, e.g. ("ebay_products.changes.csv", "ebay_products_changes.db"). """
+    stem, extension = os.path.splitext(output)
+    return f"{stem}.changes{extension}", f"{stem}_changes.db"
+
+
+def open_delta_sink(output, resume=False, fields=None, **kwargs):
+    """
+    Opens the incremental counterpart of `open_sink(output)`: new, changed and removed records
+    are appended to `<name>.changes<ext>` (one history across runs; a Parquet delta holds the
+    last run only), and item hashes are kept in `<name>_changes.db`.
+
+    Args:
+        output (str): The full output the scraper would otherwise write.
+        resume (bool): Continue the last unfinished run.
+        fields (list): Record fields, so every delta row (a "removed" one too) has all columns.
+        **kwargs: Forwarded to the sink (batch_size, fsync, ...).
+
+    Returns:
+        DeltaSink: The wrapped sink.
+    """
+    delta, store = delta_paths(output)
+    return DeltaSink(open_sink(delta, overwrite=False, **kwargs), ChangeStore(store, resume=resume), fields=fields)
+
+
+def open_output(output, resume=False, incremental=False, fields=None, **kwargs):
+    """
+    Opens a scraper's output: the delta of `open_delta_sink` (with the record `fields`), or the
+    full `open_sink` (appended to on `resume`).
+    """
+    if incremental:
+        return open_delta_sink(output, resume=resume, fields=fields, **kwargs)
+    return open_sink(output, overwrite=not resume, **kwargs)
@@ -0,0 +1,151 @@
+import json  # Import json to store cursor values
+import sqlite3  # Import sqlite3 for the disk-backed crawl state
+import threading  # Import threading so worker threads can share one checkpoint
+
+
+# ============================
+# 🟡 Class: Persistent Visited Set
+# ============================
+class PersistentSet:
+    """
+    A set of strings stored in a SQLite table. Supports `in`, `add`, `discard` and `len`,
+    so it can replace an in-memory `set()` such as LinkedIn's `visited_profiles`.
+    """
+
+    def __init__(self, checkpoint, table):
+        self._checkpoint = checkpoint
+        self._table = table
+        self._checkpoint._execute(f'CREATE TABLE IF NOT EXISTS "{table}" (key TEXT PRIMARY KEY)')
+
+    def __contains__(self, key):
+        return self._checkpoint._query_one(f'SELECT 1 FROM "{self._table}" WHERE key = ?', (key,)) is not None
+
+    def add(self, key):
+        self._checkpoint._execute(f'INSERT OR IGNORE INTO "{self._table}" (key) VALUES (?)', (key,))
+
+    def discard(self, key):
+        self._checkpoint._execute(f'DELETE FROM "{self._table}" WHERE key = ?', (key,))
+
+    def __len__(self):
+        return self._checkpoint._query_one(f'SELECT COUNT(*) FROM "{self._table}"')[0]
+
+    def __iter__(self):
+        return iter([row[0] for row in self._checkpoint._query_all(f'SELECT key FROM "{self._table}"')])
+
+
+# ============================
+# 🟡 Class: Crawl Checkpoint
+# ============================
+class Checkpoint:
+    """
+    Disk-backed crawl state so a crawl can resume after a crash or ban instead of
+    starting over. One SQLite file holds:
+
+    - `visited`: a persistent set of URLs (or other keys) already processed
+    - a frontier of URLs still to fetch (`add_to_frontier` / `pending` / `mark_done`)
+    - named cursors such as Yelp's `start` offset or eBay's page number
+
+    Every change is committed immediately, so the state on disk is always current.
+
+    Args:
+        path (str): SQLite file (created if missing).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)  # Autocommit
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._execute("CREATE TABLE IF NOT EXISTS frontier (url TEXT PRIMARY KEY, seq INTEGER, done INTEGER DEFAULT 0)")
+        self._execute("CREATE TABLE IF NOT EXISTS cursors (name TEXT PRIMARY KEY, value TEXT)")
+        self.visited = PersistentSet(self, "visited")
+
+    def _execute(self, sql, params=()):
+        with self._lock:
+            self._conn.execute(sql, params)
+
+    def _executemany(self, sql, rows):
+        with self._lock:
+            self._conn.execute("BEGIN")  # One transaction for the whole batch
+            try:
+                self._conn.executemany(sql, rows)
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+
+    def _query_one(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchone()
+
+    def _query_all(self, sql, params=()):
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    # ----- Frontier -----
+
+    def add_to_frontier(self, urls):
+        """ Queues URLs to fetch; URLs already in the frontier (done or not) are ignored. """
+        start = self._query_one("SELECT COALESCE(MAX(seq), 0) FROM frontier")[0]
+        rows = [(url, start + i + 1) for i, url in enumerate(urls)]
+        self._executemany("INSERT OR IGNORE INTO frontier (url, seq) VALUES (?, ?)", rows)
+
+    def pending(self):
+        """ Returns the URLs not yet marked done, in the order they were queued. """
+        return [row[0] for row in self._query_all("SELECT url FROM frontier WHERE done = 0 ORDER BY seq")]
+
+    def mark_done(self, url):
+        """ Marks a frontier URL as fetched and adds it to the visited set. """
+        self._execute("UPDATE frontier SET done = 1 WHERE url = ?", (url,))
+        self.visited.add(url)
+
+    def frontier_size(self):
+        """ Returns (pending, done) counts. """
+        pending, done = self._query_one("SELECT COALESCE(SUM(done = 0), 0), COALESCE(SUM(done = 1), 0) FROM frontier")
+        return pending, done
+
+    # ----- Cursors -----
+
+    def get_cursor(self, name, default=None):
+        """ Returns a stored cursor value (any JSON-serializable value), or `default`. """
+        row = self._query_one("SELECT value FROM cursors WHERE name = ?", (name,))
+        return json.loads(row[0]) if row else default
+
+    def set_cursor(self, name, value):
+        """ Stores a cursor value, e.g. `set_cursor("page", {"page": 3, "url": next_url})`. """
+        self._execute("INSERT OR REPLACE INTO cursors (name, value) VALUES (?, ?)", (name, json.dumps(value)))
+
+    # ----- Lifecycle -----
+
+    def reset(self):
+        """ Forgets all state (used when a new crawl starts without --resume). """
+        for table in ("frontier", "cursors", "visited"):
+            self._execute(f'DELETE FROM "{table}"')
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_checkpoint(path, resume=False):
+    """
+    Opens a site's checkpoint, clearing it unless the crawl is being resumed.
+
+    Args:
+        path (str): SQLite file for this site.
+        resume (bool): Keep the previous crawl's state.
+
+    Returns:
+        Checkpoint: The opened checkpoint.
+    """
+    checkpoint = Checkpoint(path)
+    if not resume:
+        checkpoint.reset()
+    return checkpoint
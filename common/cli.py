@@ -0,0 +1,61 @@
+import argparse  # Import argparse for the shared command-line options
+
+
+# ============================
+# 🟡 Function: Shared Argument Parser
+# ============================
+def build_parser(description):
+    """
+    Returns an ArgumentParser with the options every scraper script understands.
+    Scripts add their own site-specific options on top.
+
+    Passing `--query` (or `--profile`) or `--jobs` switches a script to non-interactive
+    batch mode: search URLs are built directly and no `input()` prompt is shown.
+
+    Args:
+        description (str): Shown in `--help`.
+    """
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument("--resume", action="store_true",
+                        help="continue the previous crawl from its checkpoint instead of starting over")
+    parser.add_argument("--jobs", metavar="FILE",
+                        help="JSON / JSON Lines file of jobs to run unattended")
+    parser.add_argument("--query", help="search term (runs a single job unattended)")
+    parser.add_argument("--max-pages", type=int, help="maximum number of result pages per job")
+    parser.add_argument("--cookies", metavar="FILE",
+                        help="cookie jar used to reuse a saved login / consent")
+    parser.add_argument("--headless", action="store_true",
+                        help="run Chrome headless (always on in batch mode)")
+    parser.add_argument("--profile", choices=["lean", "full"], default="lean",
+                        help="browser profile for batch runs: 'lean' skips images, fonts, media, ads and "
+                             "analytics; interactive runs always use the full, visible browser")
+    parser.add_argument("--warm", action="store_true",
+                        help="warm start: reuse the site's persistent browser profile and one long-lived chromedriver")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="ignore the on-disk page cache and fetch every page again")
+    parser.add_argument("--seen-index", metavar="FILE",
+                        help="skip items already scraped by earlier runs (a .bloom file uses a Bloom filter)")
+    parser.add_argument("--incremental", action="store_true",
+                        help="only write items that are new, changed or gone since the last crawl, to "
+                             "<output>.changes<ext> (item hashes are kept in <output>_changes.db)")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="in batch mode, split jobs into page tasks run by this many processes")
+    parser.add_argument("--frontier", metavar="URL",
+                        help="share the batch crawl's work with other processes or hosts through a frontier: "
+                             "memory://, sqlite:///frontier.db (one host) or redis://host:6379/0 (many hosts)")
+    parser.add_argument("--node", metavar="NAME",
+                        help="name of this node in a shared crawl, added to its output file names")
+    parser.add_argument("--crawl-id", metavar="ID",
+                        help="frontier crawl to join (default: today's UTC date); a new ID starts a fresh crawl")
+    parser.add_argument("--identities", metavar="FILE",
+                        help="JSON list of identities (proxy URLs, or objects with proxy, user_agent, viewport, locale, "
+                             "cookies) to spread browser sessions over; blocked identities are cooled down and retired")
+    parser.add_argument("--metrics-log", metavar="FILE",
+                        help="append a JSON line per timed stage (navigation, waits, extraction, writes, ...) to FILE")
+    parser.add_argument("--metrics-file", metavar="FILE",
+                        help="keep stage timings and counters in FILE in the Prometheus text format")
+    parser.add_argument("--metrics-port", type=int, metavar="PORT",
+                        help="serve the Prometheus metrics at http://127.0.0.1:PORT/metrics while running")
+    parser.add_argument("--cprofile", metavar="FILE",
+                        help="profile the first job with cProfile into FILE (a .html FILE uses pyinstrument if installed)")
+    return parser
@@ -0,0 +1,63 @@
+import asyncio  # Import asyncio for the semaphores
+from contextlib import asynccontextmanager  # Import asynccontextmanager for the `slot()` helper
+from urllib.parse import urlparse  # Import urlparse to key limits by domain
+
+
+SITE_CONCURRENCY = {  # Domain suffix -> requests in flight at once
+    "amazon.com": 16,
+    "ebay.com": 16,
+    "yelp.com": 8,
+    "yelp.co.uk": 8,
+    "google.com": 4,
+    "linkedin.com": 2,  # Logged-in session: keep it looking like one person
+    "instagram.com": 2,
+}
+
+
+# ============================
+# 🟡 Class: Concurrency Limits
+# ============================
+class ConcurrencyLimits:
+    """
+    Caps how many requests are in flight, in total and per site, for every coroutine of the
+    async core (`AsyncHttpClient`, `AsyncBrowser`). Each request holds a slot of the global
+    semaphore and one of its domain's while it runs; everything else awaits without a thread.
+
+    The rate limiter still decides how often a site is hit; these limits bound how many
+    requests can be outstanding at once (sockets, memory, browser tabs).
+
+    Args:
+        total (int): Requests in flight across all sites.
+        per_site (dict): Domain suffix -> requests in flight, merged over SITE_CONCURRENCY.
+        default_per_site (int): Limit for domains not listed.
+    """
+
+    def __init__(self, total=200, per_site=None, default_per_site=8):
+        self.total = total
+        self.per_site = dict(SITE_CONCURRENCY, **(per_site or {}))
+        self.default_per_site = default_per_site
+        self._global = asyncio.Semaphore(total)
+        self._sites = {}  # Domain -> semaphore, created on first use
+
+    def limit_for(self, url):
+        """ Returns the in-flight limit of `url`'s site. """
+        host = urlparse(url).netloc.lower()
+        return next((limit for suffix, limit in self.per_site.items() if host.endswith(suffix)), self.default_per_site)
+
+    def _site(self, url):
+        host = urlparse(url).netloc.lower()
+        if host not in self._sites:
+            self._sites[host] = asyncio.Semaphore(self.limit_for(url))
+        return self._sites[host]
+
+    @asynccontextmanager
+    async def slot(self, url):
+        """
+        Holds a global and a per-site slot for one request to `url`.
+
+        Example:
+            async with limits.slot(url):
+                text = await fetch(url)
+        """
+        async with self._global, self._site(url):
+            yield
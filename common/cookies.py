@@ -0,0 +1,53 @@
+import os  # Import os to check for a saved cookie jar
+import json  # Import JSON module for handling cookies
+
+
+# ============================
+# 🟡 Function: Save & Load Cookies
+# ============================
+def save_cookies(driver, filename="cookies.json"):
+    """ Saves cookies to a JSON file. """
+    with open(filename, "w") as file:
+        json.dump(driver.get_cookies(), file)
+    print("✅ Cookies saved.")
+
+def load_cookies(driver, filename="cookies.json"):
+    """
+    Loads cookies from a JSON file into the current domain.
+    Returns True if cookies were loaded, False if there was no cookie file.
+    """
+    try:
+        with open(filename, "r") as file:
+            cookies = json.load(file)
+            for cookie in cookies:
+                driver.add_cookie(cookie)
+        print("✅ Cookies loaded.")
+        return True
+    except FileNotFoundError:
+        print("⚠️ No cookies found. Proceeding without loading cookies.")
+        return False
+
+
+def read_cookies(filename):
+    """ Returns the cookies saved in `filename` (Selenium format), or [] if there is no such file. """
+    if not filename or not os.path.exists(filename):
+        return []
+    with open(filename, "r") as file:
+        return json.load(file)
+
+
+def restore_session(driver, home_url, filename):
+    """
+    Opens `home_url`, loads the saved cookie jar and reloads the page, so a previous
+    login is reused without any manual step.
+
+    Returns:
+        bool: True if a saved session was restored.
+    """
+    if not os.path.exists(filename):
+        return False
+    driver.get(home_url)  # Cookies can only be added for the domain currently open
+    if not load_cookies(driver, filename):
+        return False
+    driver.refresh()
+    return True
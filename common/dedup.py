@@ -0,0 +1,216 @@
+import os  # Import os to check for a saved index
+import math  # Import math to size the Bloom filter
+import struct  # Import struct for the index file header
+import hashlib  # Import hashlib for 64-bit key fingerprints
+import threading  # Import threading so worker threads can share one index
+from array import array  # Import array for the flat fingerprint table
+
+from common.canonical import canonical_key, canonical_url  # Import the per-site item identity
+
+
+def fingerprint(key):
+    """ Returns a non-zero 64-bit fingerprint of a key (0 marks an empty slot). """
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little") or 1
+
+
+# ============================
+# 🟡 Class: Compact Hash Set
+# ============================
+class FingerprintSet:
+    """
+    An exact-enough set of 64-bit fingerprints in one flat open-addressing table
+    (8 bytes per slot, at most 2/3 full), about 12 bytes per key instead of the
+    ~100 bytes a Python set of URL strings needs. False positives need a 64-bit
+    fingerprint collision, which is negligible below billions of keys.
+    """
+
+    MAGIC = b"FPS1"
+
+    def __init__(self, capacity=1024):
+        size = 1 << max(4, math.ceil(math.log2(capacity * 3 / 2)))
+        self._table = array("Q", bytes(8 * size))
+        self._mask = size - 1
+        self.count = 0
+
+    def _slot(self, value):
+        index = value & self._mask
+        while True:
+            current = self._table[index]
+            if current == 0 or current == value:
+                return index, current == value
+            index = (index + 1) & self._mask
+
+    def add_fingerprint(self, value):
+        """ Adds a fingerprint; returns True if it was not present. """
+        index, found = self._slot(value)
+        if found:
+            return False
+        self._table[index] = value
+        self.count += 1
+        if self.count * 3 > len(self._table) * 2:
+            self._grow()
+        return True
+
+    def contains_fingerprint(self, value):
+        return self._slot(value)[1]
+
+    def _grow(self):
+        old = self._table
+        self._table = array("Q", bytes(16 * len(old)))
+        self._mask = len(self._table) - 1
+        for value in old:
+            if value:
+                self._table[self._slot(value)[0]] = value
+
+    def __len__(self):
+        return self.count
+
+    def save(self, file):
+        file.write(self.MAGIC + struct.pack("<QQ", len(self._table), self.count))
+        self._table.tofile(file)
+
+    @classmethod
+    def load(cls, file):
+        size, count = struct.unpack("<QQ", file.read(16))
+        instance = cls.__new__(cls)
+        instance._table = array("Q")
+        instance._table.fromfile(file, size)
+        instance._mask = size - 1
+        instance.count = count
+        return instance
+
+
+# ============================
+# 🟡 Class: Bloom Filter
+# ============================
+class BloomFilter:
+    """
+    A Bloom filter for multi-million-key crawls: a fixed bit array sized for `capacity`
+    keys at `error_rate` false positives (about 1.2 bytes per key at 1%). It never forgets
+    a key, but may wrongly report an unseen key as seen with probability `error_rate`.
+    """
+
+    MAGIC = b"BLM1"
+
+    def __init__(self, capacity=10_000_000, error_rate=0.01):
+        self.bits = max(64, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        self._array = bytearray((self.bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, value):
+        low, high = value & 0xFFFFFFFF, value >> 32  # Double hashing from one 64-bit fingerprint
+        return [(low + i * high) % self.bits for i in range(self.hashes)]
+
+    def add_fingerprint(self, value):
+        """ Adds a fingerprint; returns True if it was (probably) not present. """
+        new = False
+        for position in self._positions(value):
+            byte, bit = divmod(position, 8)
+            if not self._array[byte] & (1 << bit):
+                self._array[byte] |= 1 << bit
+                new = True
+        self.count += new
+        return new
+
+    def contains_fingerprint(self, value):
+        return all(self._array[position // 8] & (1 << position % 8) for position in self._positions(value))
+
+    def __len__(self):
+        return self.count
+
+    def save(self, file):
+        file.write(self.MAGIC + struct.pack("<QQQ", self.bits, self.hashes, self.count))
+        file.write(self._array)
+
+    @classmethod
+    def load(cls, file):
+        bits, hashes, count = struct.unpack("<QQQ", file.read(24))
+        instance = cls.__new__(cls)
+        instance.bits, instance.hashes, instance.count = bits, hashes, count
+        instance._array = bytearray(file.read((bits + 7) // 8))
+        return instance
+
+
+# ============================
+# 🟡 Class: Dedup Index
+# ============================
+class DedupIndex:
+    """
+    Remembers which items were already fetched, keyed by `canonical_key`, so sponsored,
+    ref= and tracking variants of the same product count as one.
+
+    In memory it dedups within a run; with a `path` it is loaded at start and written back
+    by `save()` / `close()`, so it also dedups across runs. Paths ending in ".bloom" use a
+    Bloom filter (for multi-million-URL crawls), anything else the compact hash set.
+
+    Args:
+        path (str): Index file, or None for an in-memory index.
+        capacity (int): Expected number of keys (sizes the Bloom filter).
+        error_rate (float): Bloom filter false-positive rate.
+    """
+
+    def __init__(self, path=None, capacity=1_000_000, error_rate=0.01):
+        self.path = path
+        self._lock = threading.Lock()
+        bloom = bool(path) and path.endswith(".bloom")
+        if path and os.path.exists(path):
+            with open(path, "rb") as file:
+                magic = file.read(4)
+                self._store = (BloomFilter if magic == BloomFilter.MAGIC else FingerprintSet).load(file)
+            print(f"🧮 Loaded {len(self._store)} seen items from {path}")
+        elif bloom:
+            self._store = BloomFilter(capacity, error_rate)
+        else:
+            self._store = FingerprintSet()
+
+    def __contains__(self, url):
+        with self._lock:
+            return self._store.contains_fingerprint(fingerprint(canonical_key(url)))
+
+    def add(self, url):
+        """ Records an item; returns True if it had not been seen before. """
+        with self._lock:
+            return self._store.add_fingerprint(fingerprint(canonical_key(url)))
+
+    def unique(self, records, field="URL"):
+        """
+        Reduces the `field` link of every record to its `canonical_url` and returns the records
+        whose item was not seen before, recording them (sponsored and repeated items are dropped).
+        """
+        records = [dict(record, **{field: canonical_url(record[field])}) for record in records]
+        return [record for record in records if self.add(record[field])]
+
+    def filter_new(self, urls):
+        """ Returns the URLs whose item was not seen before (first variant wins), without recording them. """
+        batch = set()
+        new_urls = []
+        for url in urls:
+            value = fingerprint(canonical_key(url))
+            with self._lock:
+                seen = self._store.contains_fingerprint(value)
+            if not seen and value not in batch:
+                batch.add(value)
+                new_urls.append(url)
+        return new_urls
+
+    def __len__(self):
+        return len(self._store)
+
+    def save(self):
+        """ Writes the index to `path` (atomically, via a temporary file). """
+        if not self.path:
+            return
+        temporary = self.path + ".tmp"
+        with self._lock, open(temporary, "wb") as file:
+            self._store.save(file)
+        os.replace(temporary, self.path)
+
+    def close(self):
+        self.save()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,236 @@
+import os  # Import os for the persistent browser profile directories
+import atexit  # Import atexit to stop the shared driver service and remove snapshots
+import random  # Import random to pick a user agent
+import shutil  # Import shutil to snapshot profile directories and find chromedriver
+import tempfile  # Import tempfile for per-session profile snapshots
+import threading  # Import threading to start the shared driver service once
+from urllib.parse import urlparse  # Import urlparse to split proxy credentials off
+from selenium import webdriver  # Import Selenium WebDriver
+from selenium.webdriver.chrome.service import Service  # Import Service for ChromeDriver
+from selenium.webdriver.chrome.options import Options  # Import Options to configure WebDriver
+from selenium.webdriver.chrome.remote_connection import ChromeRemoteConnection  # Import the connection used to attach to a running chromedriver
+
+from common.identities import USER_AGENTS  # Import the shared user agents
+from common.metrics import METRICS, instrument_driver  # Import the hot-path timers
+
+
+# Requests the lean profile never makes: images, fonts, media, ads and analytics
+BLOCKED_URL_PATTERNS = [
+    "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif", "*.svg", "*.ico",  # Images
+    "*.woff", "*.woff2", "*.ttf", "*.otf", "*.eot",  # Fonts
+    "*.mp4", "*.webm", "*.m3u8", "*.mp3", "*.m4a", "*.ogg",  # Media
+    "*doubleclick.net*", "*googlesyndication.com*", "*amazon-adsystem.com*", "*adservice.google.*",  # Ads
+    "*google-analytics.com*", "*googletagmanager.com*", "*/gtag/js*", "*/analytics.js*",  # Analytics
+    "*facebook.net*", "*connect.facebook.*", "*scorecardresearch.com*", "*hotjar.com*", "*bat.bing.com*",
+]
+
+# Browser profiles: "full" is the visible, fully loading browser the scrapers always used;
+# "lean" is a small headless browser that skips every asset the extractors never read.
+PROFILES = {
+    "full": {
+        "headless": False,
+        "window": "--start-maximized",
+        "page_load_strategy": "normal",  # driver.get returns after every image and script has loaded
+        "block_resources": False,
+    },
+    "lean": {
+        "headless": True,
+        "window": "--window-size=1280,800",
+        "page_load_strategy": "eager",  # driver.get returns at DOMContentLoaded
+        "block_resources": True,
+    },
+}
+
+
+PROFILE_ROOT = os.environ.get("SCRAPER_PROFILE_DIR", os.path.join(os.path.expanduser("~"), ".scraper-profiles"))  # Persistent browser data
+SNAPSHOT_IGNORE = shutil.ignore_patterns("Singleton*", "lockfile", "Crashpad", "*ShaderCache")  # Locks and caches not worth copying
+
+_services = {}  # ChromeDriver path -> running Service shared by every session of this process
+_services_lock = threading.Lock()
+_snapshots = []  # Snapshot directories to delete at exit
+
+
+# ============================
+# 🟡 Function: Persistent Browser Data Directory
+# ============================
+def browser_data_dir(name, snapshot=False):
+    """
+    Returns the persistent Chrome user-data-dir for `name` (e.g. "linkedin"), so logins,
+    consent cookies and the HTTP cache survive between runs.
+
+    Chrome locks a user-data-dir while it runs, so sessions that may run concurrently (pool
+    sessions, scheduler workers) pass `snapshot=True` and get a throwaway copy of it, which
+    is deleted at exit. Changes made in a snapshot are not written back: sign in once with a
+    non-snapshot session (an interactive run) to update the persistent profile.
+
+    Args:
+        name (str): Profile name, one per site.
+        snapshot (bool): Return a private copy instead of the directory itself.
+    """
+    base = os.path.join(PROFILE_ROOT, name)
+    os.makedirs(base, exist_ok=True)
+    if not snapshot:
+        return base
+    copy = tempfile.mkdtemp(prefix=f"{name}-profile-")
+    shutil.copytree(base, copy, dirs_exist_ok=True, ignore=SNAPSHOT_IGNORE)
+    _snapshots.append(copy)
+    return copy
+
+
+@atexit.register
+def _remove_snapshots():
+    for path in _snapshots:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+# ============================
+# 🟡 Function: Long-Lived ChromeDriver Service
+# ============================
+def shared_service(driver_path=None):
+    """
+    Returns a chromedriver service started once per process. Sessions attach to it instead of
+    each launching (and waiting for) their own chromedriver; it is stopped at exit.
+
+    Args:
+        driver_path (str): ChromeDriver executable (looked up on PATH if omitted).
+    """
+    with _services_lock:
+        if driver_path not in _services:
+            executable = driver_path or shutil.which("chromedriver")
+            if not executable:
+                raise FileNotFoundError("chromedriver not found: pass driver_path or put it on PATH")
+            service = Service(executable_path=executable)
+            service.start()
+            atexit.register(service.stop)
+            _services[driver_path] = service
+        return _services[driver_path]
+
+
+# ============================
+# 🟡 Function: Build Chrome Options
+# ============================
+def build_options(profile="full", headless=False, user_agent=None, page_load_strategy=None, user_data_dir=None,
+                  identity=None):
+    """
+    Returns the Chrome options for a profile.
+
+    Args:
+        profile (str): "full" or "lean" (see PROFILES).
+        headless (bool): Run without a window (always on for "lean").
+        user_agent (str): User-Agent (the identity's, else a random pick from USER_AGENTS).
+        page_load_strategy (str): "normal", "eager" or "none"; overrides the profile's strategy.
+        user_data_dir (str): Chrome profile directory to reuse (see `browser_data_dir`).
+        identity (Identity): Persona of the session (common/identities.py): user agent, proxy,
+            window size and language.
+    """
+    settings = PROFILES[profile]
+    chrome_options = Options()
+    prefs = {}
+    if user_data_dir:
+        chrome_options.add_argument(f'--user-data-dir={user_data_dir}')  # Reuses logins, cookies and cache
+
+    # 🟢 Anti-bot settings shared by every profile
+    chrome_options.add_argument('--disable-blink-features=AutomationControlled')  # Hides Selenium automation flag
+    user_agent = user_agent or (identity.user_agent if identity else random.choice(USER_AGENTS))
+    chrome_options.add_argument(f'--user-agent={user_agent}')  # One user agent per session (rotated per identity)
+    chrome_options.add_argument('--disable-gpu')  # Disables GPU rendering for performance
+    chrome_options.add_argument('--log-level=3')  # Suppresses unnecessary logs
+    chrome_options.add_argument('--ignore-certificate-errors')  # Ignores SSL certificate errors
+    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])  # Further hides automation usage
+
+    if identity is not None:
+        # 🟣 The rest of the identity: its proxy, window size and language
+        if identity.proxy:
+            proxy = urlparse(identity.proxy)
+            if proxy.username:
+                print(f"⚠️ Chrome ignores proxy credentials; allow-list this host on {proxy.hostname} instead")
+            chrome_options.add_argument(f'--proxy-server={proxy.scheme}://{proxy.netloc.rsplit("@", 1)[-1]}')
+        chrome_options.add_argument('--window-size={},{}'.format(*identity.viewport))
+        chrome_options.add_argument(f'--lang={identity.locale}')
+        prefs["intl.accept_languages"] = identity.accept_language.split(";")[0]
+    else:
+        chrome_options.add_argument(settings["window"])
+    if headless or settings["headless"]:
+        chrome_options.add_argument('--headless=new')  # Runs without a browser window
+
+    if settings["block_resources"]:
+        # 🟡 Images are also switched off at the renderer level, before any request is made
+        chrome_options.add_argument('--blink-settings=imagesEnabled=false')
+        chrome_options.add_argument('--mute-audio')
+        chrome_options.add_argument('--disable-extensions')
+        prefs.update({
+            "profile.managed_default_content_settings.images": 2,
+            "profile.default_content_setting_values.notifications": 2,
+        })
+    if prefs:
+        chrome_options.add_experimental_option("prefs", prefs)
+
+    # 🏎️ Unlike a DesiredCapabilities copy, this is actually sent to the driver
+    chrome_options.page_load_strategy = page_load_strategy or settings["page_load_strategy"]
+    return chrome_options
+
+
+# ============================
+# 🟡 Function: Block Resources over CDP
+# ============================
+def block_resources(driver, patterns=None):
+    """
+    Makes the browser drop every request whose URL matches one of `patterns` before it is
+    sent (Chrome DevTools `Network.setBlockedURLs`).
+
+    Args:
+        driver: Selenium WebDriver instance (Chrome).
+        patterns (list): URL wildcard patterns (defaults to BLOCKED_URL_PATTERNS).
+    """
+    execute_cdp(driver, "Network.enable", {})
+    execute_cdp(driver, "Network.setBlockedURLs", {"urls": list(patterns or BLOCKED_URL_PATTERNS)})
+
+
+def execute_cdp(driver, command, params):
+    """ Runs a Chrome DevTools command on a local or attached (remote) session. """
+    if hasattr(driver, "execute_cdp_cmd"):
+        return driver.execute_cdp_cmd(command, params)
+    return driver.execute("executeCdpCommand", {"cmd": command, "params": params})["value"]
+
+
+# ============================
+# 🟡 Function: Create a WebDriver
+# ============================
+def create_driver(profile="full", headless=False, driver_path=None, user_agent=None,
+                  page_load_strategy=None, blocked_urls=None, user_data_dir=None, reuse_service=False, identity=None):
+    """
+    Shared WebDriver factory used by every scraper's `setup_driver`.
+
+    Args:
+        profile (str): "full" (visible browser, everything loaded) or "lean" (headless,
+            small viewport, eager page loads, images / fonts / media / ads / analytics blocked).
+        headless (bool): Run without a window (always on for "lean").
+        driver_path (str): ChromeDriver executable (Selenium Manager finds one if omitted).
+        user_agent (str): User-Agent (the identity's, or a random pick if omitted).
+        page_load_strategy (str): Overrides the profile's page-load strategy.
+        blocked_urls (list): Extra URL patterns to block on top of BLOCKED_URL_PATTERNS ("lean" only).
+        user_data_dir (str): Chrome profile directory to start from (warm start).
+        reuse_service (bool): Attach to the process-wide chromedriver (`shared_service`)
+            instead of launching a new one for this session.
+        identity (Identity): Persona of the session (user agent, proxy, window size, language);
+            `DriverPool` passes one from its IdentityPool.
+
+    Returns:
+        WebDriver: The started Chrome session, with navigation, element lookups and scripts timed
+        (see `common.metrics.instrument_driver`).
+    """
+    if profile not in PROFILES:
+        raise ValueError(f"Unknown browser profile '{profile}' (use one of {', '.join(PROFILES)})")
+    chrome_options = build_options(profile, headless=headless, user_agent=user_agent, page_load_strategy=page_load_strategy,
+                                   user_data_dir=user_data_dir, identity=identity)
+    with METRICS.span("driver_start", profile=profile, warm=bool(user_data_dir)):
+        if reuse_service:
+            # Quitting this session leaves the shared chromedriver running for the next one
+            connection = ChromeRemoteConnection(shared_service(driver_path).service_url, keep_alive=True)
+            driver = webdriver.Remote(command_executor=connection, options=chrome_options)
+        else:
+            chrome_service = Service(executable_path=driver_path) if driver_path else Service()
+            driver = webdriver.Chrome(service=chrome_service, options=chrome_options)
+        if PROFILES[profile]["block_resources"]:
+            block_resources(driver, BLOCKED_URL_PATTERNS + list(blocked_urls or []))
+    return instrument_driver(driver)
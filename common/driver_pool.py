@@ -0,0 +1,198 @@
+import queue  # Import queue for the thread-safe idle-session queue
+import threading  # Import threading for locks around the pool counters
+import concurrent.futures  # Import concurrent.futures to pre-warm sessions in parallel
+from contextlib import contextmanager  # Import contextmanager for the `session()` helper
+
+from common.identities import using_identity  # Import the identity tracking of the rate limiter
+
+
+# ============================
+# 🟡 Class: Pooled WebDriver Session
+# ============================
+class PooledDriver:
+    """
+    Wraps a WebDriver instance with the bookkeeping the pool needs
+    (how many pages it has served, whether it should be thrown away, and its identity).
+    """
+
+    def __init__(self, driver, identity=None):
+        self.driver = driver  # The underlying Selenium WebDriver
+        self.identity = identity  # Identity the session was started with (None without an IdentityPool)
+        self.pages = 0  # Number of checkouts served by this session
+        self.broken = False  # Set by callers when the session misbehaves
+
+
+# ============================
+# 🟡 Class: WebDriver Pool
+# ============================
+class DriverPool:
+    """
+    A fixed-size pool of pre-warmed WebDriver sessions.
+
+    Each worker thread borrows its own session with `checkout()` / `release()`
+    (or the `session()` context manager), so concurrent `driver.get` calls never
+    share a browser. Sessions failing a health check, or that have served
+    `max_pages` checkouts, are quit and replaced with a fresh one.
+
+    With an IdentityPool (common/identities.py), every session is started with an identity
+    taken from it (`factory(identity=...)`), and a session whose identity got benched or
+    retired for being blocked is replaced, at its next checkout, by one with a healthy identity.
+
+    Args:
+        factory: Callable returning a new WebDriver (e.g. a scraper's `setup_driver`).
+        size (int): Number of sessions to keep open.
+        max_pages (int): Recycle a session after this many checkouts (0 disables).
+        prewarm (bool): Start all sessions up front instead of on first use.
+        identities (IdentityPool): Identities to start sessions with (None: the factory's defaults).
+    """
+
+    def __init__(self, factory, size=4, max_pages=50, prewarm=True, identities=None):
+        self.factory = factory
+        self.size = size
+        self.max_pages = max_pages
+        self.identities = identities
+        self._idle = queue.Queue()  # Sessions ready to be borrowed
+        self._lock = threading.Lock()
+        self._created = 0  # Sessions currently alive (idle + borrowed)
+        self._closed = False
+
+        if prewarm:
+            self._prewarm()
+
+    def _prewarm(self):
+        """ Starts every session in parallel so browser start-up is paid once, concurrently. """
+        with self._lock:
+            slots = self.size - self._created
+            self._created += slots
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(slots, 1)) as executor:
+            futures = [executor.submit(self._spawn) for _ in range(slots)]
+            for future in concurrent.futures.as_completed(futures):
+                try:
+                    self._idle.put(future.result())
+                except Exception as e:
+                    print(f"⚠️ Failed to start pooled driver: {e}")
+
+    def _spawn(self):
+        """
+        Creates a new pooled session in a slot the caller already reserved (counted in
+        `_created` under the lock, so concurrent checkouts never start more than `size`
+        browsers); the slot is freed again if the browser fails to start.
+        """
+        identity = None
+        try:
+            if self.identities is None:
+                return PooledDriver(self.factory())
+            identity = self.identities.acquire()
+            return PooledDriver(self.factory(identity=identity), identity)
+        except Exception:
+            with self._lock:
+                self._created -= 1
+            if identity is not None:
+                self.identities.release(identity)
+            raise
+
+    def _retire(self, pooled):
+        """ Quits a session and frees its slot in the pool. """
+        with self._lock:
+            self._created -= 1
+        if pooled.identity is not None:
+            self.identities.release(pooled.identity)
+        try:
+            pooled.driver.quit()
+        except Exception as e:
+            print(f"⚠️ Error closing pooled driver: {e}")
+
+    def _benched(self, pooled):
+        """ True when the session's identity is cooling down or retired. """
+        return pooled.identity is not None and not self.identities.usable(pooled.identity)
+
+    @staticmethod
+    def is_healthy(driver):
+        """ Returns True if the browser still answers a trivial script call. """
+        try:
+            return driver.execute_script("return 1;") == 1
+        except Exception:
+            return False
+
+    def checkout(self, timeout=None):
+        """
+        Borrows a healthy session from the pool, starting a new one if a slot is free.
+
+        Args:
+            timeout (float): Seconds to wait for a free session (None waits forever).
+
+        Returns:
+            PooledDriver: The borrowed session; hand it back with `release()`.
+        """
+        if self._closed:
+            raise RuntimeError("Driver pool is closed")
+
+        while True:
+            try:
+                pooled = self._idle.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    can_spawn = self._created < self.size
+                    if can_spawn:
+                        self._created += 1  # Reserve the slot before the (slow) browser start
+                if can_spawn:
+                    return self._spawn()
+                pooled = self._idle.get(timeout=timeout)  # Raises queue.Empty on timeout
+
+            if self._benched(pooled):
+                print(f"🔄 Identity {pooled.identity.name} is benched, replacing its session.")
+            elif self.is_healthy(pooled.driver):
+                return pooled
+            else:
+                print("⚠️ Pooled driver failed health check, replacing it.")
+            self._retire(pooled)
+
+    def release(self, pooled, discard=False):
+        """
+        Returns a borrowed session to the pool, recycling it if it is worn out.
+
+        Args:
+            pooled (PooledDriver): Session obtained from `checkout()`.
+            discard (bool): Quit the session instead of reusing it.
+        """
+        pooled.pages += 1
+        worn_out = self.max_pages and pooled.pages >= self.max_pages
+        if self._closed or discard or pooled.broken or worn_out or self._benched(pooled):
+            self._retire(pooled)
+        else:
+            self._idle.put(pooled)
+
+    @contextmanager
+    def session(self, timeout=None):
+        """
+        Context manager yielding a WebDriver; the session is discarded if the block raises.
+        Inside the block, the rate limiter credits successes and blocks to the session's identity.
+
+        Example:
+            with pool.session() as driver:
+                driver.get(url)
+        """
+        pooled = self.checkout(timeout=timeout)
+        try:
+            with using_identity(pooled.identity):
+                yield pooled.driver
+        except Exception:
+            pooled.broken = True
+            raise
+        finally:
+            self.release(pooled)
+
+    def close(self):
+        """ Quits every idle session; borrowed sessions are quit when released. """
+        self._closed = True
+        while True:
+            try:
+                self._retire(self._idle.get_nowait())
+            except queue.Empty:
+                break
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
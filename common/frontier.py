@@ -0,0 +1,570 @@
+import os  # Import os to name per-node output files
+import heapq  # Import heapq for the in-process ready queue
+import json  # Import json to store items and derive their keys
+import time  # Import time for lease deadlines
+import uuid  # Import uuid for lease tokens
+import sqlite3  # Import sqlite3 for the single-host backend
+import itertools  # Import itertools for submission order
+import threading  # Import threading so worker threads can share one frontier
+from collections import namedtuple  # Import namedtuple for leases
+from urllib.parse import urlparse  # Import urlparse to pick a backend from a frontier URL
+
+try:
+    import redis  # Optional: many-host backend on Redis or a compatible broker (pip install redis)
+except ImportError:
+    redis = None
+
+from common.canonical import canonical_key  # Import the per-site item identity
+from common.jobs import job_slug  # Import the job slug for queue names
+from common.metrics import METRICS  # Import the hot-path timers and counters
+
+
+QUEUED, LEASED, DONE, FAILED = 0, 1, 2, 3  # Item states (the SQLite backend stores these numbers)
+
+Lease = namedtuple("Lease", "key item token attempts")  # One leased item; `attempts` counts this lease
+
+
+def item_key(item):
+    """ Returns an item's dedup key: the canonical key of a URL, or the sorted JSON of a task dict. """
+    return canonical_key(item) if isinstance(item, str) else json.dumps(item, sort_keys=True)
+
+
+# ============================
+# 🟡 Class: Base Crawl Frontier
+# ============================
+class Frontier:
+    """
+    A crawl frontier shared by several processes or hosts: items (URLs or task dicts) are
+    leased to one worker at a time and acknowledged once done.
+
+    - enqueue is deduplicated: an item whose key was ever queued in this frontier (queued,
+      leased, done or failed) is ignored, so every node can push the same jobs safely
+    - `lease` hands out the queued items with the lowest priority (then the oldest); a leased
+      item is invisible to other workers until its visibility timeout ends
+    - `ack` marks it done; `nack` (or an expired lease, e.g. a node that died) returns it to
+      the queue, unless it has been leased `max_attempts` times, in which case it is failed
+    - `extend` pushes a lease's deadline back while its worker is still busy
+
+    Every backend implements exactly these rules, so a crawl tested against the in-process
+    backend behaves the same on SQLite or Redis.
+
+    Args:
+        name (str): Queue name; frontiers with the same name and backend share their items.
+        visibility_timeout (float): Seconds a lease lasts before the item is handed out again.
+        max_attempts (int): Leases per item before it is given up.
+        clock: Returns the current time in seconds (hosts sharing a broker need synced clocks).
+    """
+
+    def __init__(self, name="default", visibility_timeout=300, max_attempts=3, clock=time.time):
+        self.name = name
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        self.clock = clock
+
+    def put(self, items, priority=0, keys=None):
+        """
+        Queues items not seen before in this frontier.
+
+        Args:
+            items (list): URLs or JSON-serializable dicts.
+            priority (int): Lower is leased first.
+            keys (list[str]): Dedup keys (default: `item_key` of each item).
+
+        Returns:
+            int: Number of items actually queued.
+        """
+        items = list(items)
+        keys = list(keys) if keys is not None else [item_key(item) for item in items]
+        added = self._put(items, keys, priority) if items else 0
+        METRICS.count("frontier", added, op="queued")
+        return added
+
+    def lease(self, count=1):
+        """ Leases up to `count` items (fewer, or none, when the queue has no visible items). """
+        leases = self._lease(count, self.clock(), uuid.uuid4().hex)
+        METRICS.count("frontier", len(leases), op="leased")
+        return leases
+
+    def ack(self, lease):
+        """ Marks a leased item done; returns False if the lease had expired and the item was handed out again. """
+        done = self._ack(lease)
+        METRICS.count("frontier", op="done" if done else "lost")
+        return done
+
+    def nack(self, lease, delay=0):
+        """ Gives an item back, visible again after `delay` seconds; returns False if it is failed instead. """
+        requeued = self._nack(lease, self.clock() + delay)
+        METRICS.count("frontier", op="requeued" if requeued else "failed")
+        return requeued
+
+    def extend(self, lease):
+        """ Restarts a lease's visibility timeout; returns False if the lease was already lost. """
+        return self._extend(lease, self.clock() + self.visibility_timeout)
+
+    def counts(self):
+        """ Returns the number of items per state: {"queued", "leased", "done", "failed"}. """
+        raise NotImplementedError
+
+    def drained(self):
+        """ True when nothing is queued or leased anywhere (leases held by other nodes count). """
+        counts = self.counts()
+        return not counts["queued"] and not counts["leased"]
+
+    def _put(self, items, keys, priority):
+        raise NotImplementedError
+
+    def _lease(self, count, now, token):
+        raise NotImplementedError
+
+    def _ack(self, lease):
+        raise NotImplementedError
+
+    def _nack(self, lease, visible_at):
+        raise NotImplementedError
+
+    def _extend(self, lease, deadline):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ============================
+# 🟡 Class: In-Process Frontier
+# ============================
+class MemoryFrontier(Frontier):
+    """ The frontier inside one process (threads and coroutines share it); used for tests and single-process runs. """
+
+    def __init__(self, name="default", visibility_timeout=300, max_attempts=3, clock=time.time):
+        super().__init__(name, visibility_timeout, max_attempts, clock)
+        self._lock = threading.Lock()
+        self._entries = {}  # Key -> {"item", "priority", "seq", "state", "token", "visible_at", "attempts"}
+        self._ready = []  # Heap of (priority, seq, key), visible now
+        self._delayed = []  # Heap of (visible_at, key), given back with a delay
+        self._leased = {}  # Key -> lease deadline
+        self._seq = itertools.count()
+
+    def _put(self, items, keys, priority):
+        added = 0
+        with self._lock:
+            for item, key in zip(items, keys):
+                if key in self._entries:
+                    continue
+                entry = {"item": item, "priority": priority, "seq": next(self._seq), "state": QUEUED,
+                         "token": None, "visible_at": 0.0, "attempts": 0}
+                self._entries[key] = entry
+                heapq.heappush(self._ready, (priority, entry["seq"], key))
+                added += 1
+        return added
+
+    def _requeue(self, key, visible_at, now):
+        entry = self._entries[key]
+        self._leased.pop(key, None)
+        entry["token"] = None
+        if entry["attempts"] >= self.max_attempts:
+            entry["state"], entry["item"] = FAILED, None
+            return False
+        entry["state"], entry["visible_at"] = QUEUED, visible_at
+        if visible_at > now:
+            heapq.heappush(self._delayed, (visible_at, key))
+        else:
+            heapq.heappush(self._ready, (entry["priority"], entry["seq"], key))
+        return True
+
+    def _lease(self, count, now, token):
+        with self._lock:
+            for key in [key for key, deadline in self._leased.items() if deadline <= now]:
+                self._requeue(key, now, now)
+            while self._delayed and self._delayed[0][0] <= now:
+                key = heapq.heappop(self._delayed)[1]
+                heapq.heappush(self._ready, (self._entries[key]["priority"], self._entries[key]["seq"], key))
+            leases = []
+            while self._ready and len(leases) < count:
+                key = heapq.heappop(self._ready)[2]
+                entry = self._entries[key]
+                entry.update(state=LEASED, token=token, visible_at=now + self.visibility_timeout, attempts=entry["attempts"] + 1)
+                self._leased[key] = entry["visible_at"]
+                leases.append(Lease(key, entry["item"], token, entry["attempts"]))
+            return leases
+
+    def _holds(self, lease):
+        entry = self._entries.get(lease.key)
+        return entry is not None and entry["state"] == LEASED and entry["token"] == lease.token
+
+    def _ack(self, lease):
+        with self._lock:
+            if not self._holds(lease):
+                return False
+            entry = self._entries[lease.key]
+            entry.update(state=DONE, token=None, item=None)
+            self._leased.pop(lease.key, None)
+            return True
+
+    def _nack(self, lease, visible_at):
+        with self._lock:
+            if not self._holds(lease):
+                return False
+            return self._requeue(lease.key, visible_at, self.clock())
+
+    def _extend(self, lease, deadline):
+        with self._lock:
+            if not self._holds(lease):
+                return False
+            self._entries[lease.key]["visible_at"] = self._leased[lease.key] = deadline
+            return True
+
+    def counts(self):
+        with self._lock:
+            counts = {"queued": 0, "leased": 0, "done": 0, "failed": 0}
+            names = {QUEUED: "queued", LEASED: "leased", DONE: "done", FAILED: "failed"}
+            for entry in self._entries.values():
+                counts[names[entry["state"]]] += 1
+            return counts
+
+
+# ============================
+# 🟡 Class: SQLite Frontier
+# ============================
+class SqliteFrontier(Frontier):
+    """
+    The frontier in a SQLite file, shared by every process on one host (or on a network
+    filesystem with working locks). Each lease runs in a `BEGIN IMMEDIATE` transaction, so the
+    file lock guarantees an item is never leased twice at once.
+
+    Args:
+        path (str): SQLite file (created if missing); one file can hold several named frontiers.
+    """
+
+    def __init__(self, path, name="default", visibility_timeout=300, max_attempts=3, clock=time.time):
+        super().__init__(name, visibility_timeout, max_attempts, clock)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=60, check_same_thread=False, isolation_level=None)  # Autocommit
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS frontier_items (queue TEXT NOT NULL, key TEXT NOT NULL, item TEXT, "
+            "priority INTEGER, seq INTEGER, state INTEGER, token TEXT, visible_at REAL, attempts INTEGER, "
+            "PRIMARY KEY (queue, key))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS frontier_ready ON frontier_items (queue, state, priority, seq)")
+
+    def _transaction(self, work):
+        """ Runs `work(conn)` in one write transaction (holding the file lock) and returns its result. """
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = work(self._conn)
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+            self._conn.execute("COMMIT")
+            return result
+
+    def _put(self, items, keys, priority):
+        def work(conn):
+            start = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM frontier_items WHERE queue = ?", (self.name,)).fetchone()[0]
+            before = conn.total_changes
+            conn.executemany(
+                "INSERT OR IGNORE INTO frontier_items (queue, key, item, priority, seq, state, visible_at, attempts) "
+                "VALUES (?, ?, ?, ?, ?, ?, 0, 0)",
+                [(self.name, key, json.dumps(item), priority, start + i + 1, QUEUED) for i, (item, key) in enumerate(zip(items, keys))],
+            )
+            return conn.total_changes - before
+        return self._transaction(work)
+
+    def _release(self, conn, where, params, visible_at):
+        """ Gives matching leased rows back (or fails them once out of attempts). """
+        conn.execute(
+            f"UPDATE frontier_items SET state = CASE WHEN attempts >= ? THEN {FAILED} ELSE {QUEUED} END, "
+            f"item = CASE WHEN attempts >= ? THEN NULL ELSE item END, token = NULL, visible_at = ? "
+            f"WHERE queue = ? AND state = {LEASED} AND {where}",
+            (self.max_attempts, self.max_attempts, visible_at, self.name) + params,
+        )
+
+    def _lease(self, count, now, token):
+        def work(conn):
+            self._release(conn, "visible_at <= ?", (now,), now)  # Expired leases
+            rows = conn.execute(
+                f"SELECT key, item, attempts FROM frontier_items WHERE queue = ? AND state = {QUEUED} AND visible_at <= ? "
+                "ORDER BY priority, seq LIMIT ?",
+                (self.name, now, count),
+            ).fetchall()
+            conn.executemany(
+                f"UPDATE frontier_items SET state = {LEASED}, token = ?, visible_at = ?, attempts = attempts + 1 "
+                "WHERE queue = ? AND key = ?",
+                [(token, now + self.visibility_timeout, self.name, key) for key, _, _ in rows],
+            )
+            return [Lease(key, json.loads(item), token, attempts + 1) for key, item, attempts in rows]
+        return self._transaction(work)
+
+    def _ack(self, lease):
+        def work(conn):
+            return conn.execute(
+                f"UPDATE frontier_items SET state = {DONE}, item = NULL, token = NULL "
+                f"WHERE queue = ? AND key = ? AND state = {LEASED} AND token = ?",
+                (self.name, lease.key, lease.token),
+            ).rowcount > 0
+        return self._transaction(work)
+
+    def _nack(self, lease, visible_at):
+        def work(conn):
+            row = conn.execute(
+                f"SELECT attempts FROM frontier_items WHERE queue = ? AND key = ? AND state = {LEASED} AND token = ?",
+                (self.name, lease.key, lease.token),
+            ).fetchone()
+            if row is None:
+                return False  # Lease lost: the item was already handed out again
+            self._release(conn, "key = ?", (lease.key,), visible_at)
+            return row[0] < self.max_attempts
+        return self._transaction(work)
+
+    def _extend(self, lease, deadline):
+        def work(conn):
+            return conn.execute(
+                f"UPDATE frontier_items SET visible_at = ? WHERE queue = ? AND key = ? AND state = {LEASED} AND token = ?",
+                (deadline, self.name, lease.key, lease.token),
+            ).rowcount > 0
+        return self._transaction(work)
+
+    def counts(self):
+        with self._lock:
+            rows = self._conn.execute("SELECT state, COUNT(*) FROM frontier_items WHERE queue = ? GROUP BY state", (self.name,)).fetchall()
+        by_state = dict(rows)
+        return {"queued": by_state.get(QUEUED, 0), "leased": by_state.get(LEASED, 0),
+                "done": by_state.get(DONE, 0), "failed": by_state.get(FAILED, 0)}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# ============================
+# 🟡 Class: Redis Frontier
+# ============================
+# Shared by the lease and nack scripts: gives a leased key back (or fails it once out of attempts).
+# KEYS: ready, delayed, leased, tokens, attempts, failed, items, scores
+_REQUEUE_LUA = """
+local function requeue(key, visible_at, now, max_attempts)
+  redis.call('ZREM', KEYS[3], key)
+  redis.call('HDEL', KEYS[4], key)
+  if tonumber(redis.call('HGET', KEYS[5], key) or '0') >= max_attempts then
+    redis.call('SADD', KEYS[6], key)
+    redis.call('HDEL', KEYS[7], key)
+    return 0
+  end
+  if visible_at > now then
+    redis.call('ZADD', KEYS[2], visible_at, key)
+  else
+    redis.call('ZADD', KEYS[1], redis.call('HGET', KEYS[8], key), key)
+  end
+  return 1
+end
+"""
+
+# ARGV: now, deadline, count, max_attempts, token
+_LEASE_LUA = _REQUEUE_LUA + """
+local now = tonumber(ARGV[1])
+for _, key in ipairs(redis.call('ZRANGEBYSCORE', KEYS[3], '-inf', now)) do
+  requeue(key, now, now, tonumber(ARGV[4]))
+end
+for _, key in ipairs(redis.call('ZRANGEBYSCORE', KEYS[2], '-inf', now)) do
+  redis.call('ZREM', KEYS[2], key)
+  redis.call('ZADD', KEYS[1], redis.call('HGET', KEYS[8], key), key)
+end
+local leased = {}
+for _, key in ipairs(redis.call('ZRANGE', KEYS[1], 0, tonumber(ARGV[3]) - 1)) do
+  redis.call('ZREM', KEYS[1], key)
+  redis.call('ZADD', KEYS[3], ARGV[2], key)
+  redis.call('HSET', KEYS[4], key, ARGV[5])
+  local attempts = redis.call('HINCRBY', KEYS[5], key, 1)
+  table.insert(leased, key)
+  table.insert(leased, redis.call('HGET', KEYS[7], key))
+  table.insert(leased, attempts)
+end
+return leased
+"""
+
+# ARGV: now, visible_at, key, token, max_attempts
+_NACK_LUA = _REQUEUE_LUA + """
+if redis.call('HGET', KEYS[4], ARGV[3]) ~= ARGV[4] then
+  return 0
+end
+return requeue(ARGV[3], tonumber(ARGV[2]), tonumber(ARGV[1]), tonumber(ARGV[5]))
+"""
+
+# KEYS: leased, tokens, items, scores, attempts, done; ARGV: key, token
+_ACK_LUA = """
+if redis.call('HGET', KEYS[2], ARGV[1]) ~= ARGV[2] then
+  return 0
+end
+redis.call('ZREM', KEYS[1], ARGV[1])
+redis.call('HDEL', KEYS[2], ARGV[1])
+redis.call('HDEL', KEYS[3], ARGV[1])
+redis.call('HDEL', KEYS[4], ARGV[1])
+redis.call('HDEL', KEYS[5], ARGV[1])
+redis.call('INCR', KEYS[6])
+return 1
+"""
+
+# KEYS: leased, tokens; ARGV: key, token, deadline
+_EXTEND_LUA = """
+if redis.call('HGET', KEYS[2], ARGV[1]) ~= ARGV[2] then
+  return 0
+end
+redis.call('ZADD', KEYS[1], ARGV[3], ARGV[1])
+return 1
+"""
+
+# KEYS: seen, items, scores, ready, seq; ARGV: priority, then key / item pairs
+_PUT_LUA = """
+local added = 0
+for i = 2, #ARGV, 2 do
+  if redis.call('SADD', KEYS[1], ARGV[i]) == 1 then
+    local score = tonumber(ARGV[1]) * 4294967296 + redis.call('INCR', KEYS[5])
+    redis.call('HSET', KEYS[2], ARGV[i], ARGV[i + 1])
+    redis.call('HSET', KEYS[3], ARGV[i], score)
+    redis.call('ZADD', KEYS[4], score, ARGV[i])
+    added = added + 1
+  end
+end
+return added
+"""
+
+
+class RedisFrontier(Frontier):
+    """
+    The frontier on a Redis-compatible broker (Redis, Valkey, KeyDB, Dragonfly, ...), shared by
+    any number of hosts. Every operation is one Lua script, so it is atomic on the broker.
+
+    Keys live under `frontier:<name>:`; the "seen" set keeps every key ever queued (dedup).
+
+    Args:
+        client: A `redis.Redis` client (see `open_frontier` for URLs).
+    """
+
+    def __init__(self, client, name="default", visibility_timeout=300, max_attempts=3, clock=time.time):
+        super().__init__(name, visibility_timeout, max_attempts, clock)
+        self.client = client
+        prefix = f"frontier:{name}:"
+        self._keys = {part: prefix + part for part in
+                      ("seen", "items", "scores", "ready", "delayed", "leased", "tokens", "attempts", "failed", "done", "seq")}
+        self._put_script = client.register_script(_PUT_LUA)
+        self._lease_script = client.register_script(_LEASE_LUA)
+        self._nack_script = client.register_script(_NACK_LUA)
+        self._ack_script = client.register_script(_ACK_LUA)
+        self._extend_script = client.register_script(_EXTEND_LUA)
+
+    def _key_list(self, *parts):
+        return [self._keys[part] for part in parts]
+
+    def _put(self, items, keys, priority):
+        args = [priority]
+        for item, key in zip(items, keys):
+            args += [key, json.dumps(item)]
+        return int(self._put_script(keys=self._key_list("seen", "items", "scores", "ready", "seq"), args=args))
+
+    def _requeue_keys(self):
+        return self._key_list("ready", "delayed", "leased", "tokens", "attempts", "failed", "items", "scores")
+
+    def _lease(self, count, now, token):
+        flat = self._lease_script(keys=self._requeue_keys(),
+                                  args=[now, now + self.visibility_timeout, count, self.max_attempts, token])
+        leases = []
+        for i in range(0, len(flat), 3):
+            key = flat[i].decode() if isinstance(flat[i], bytes) else flat[i]
+            leases.append(Lease(key, json.loads(flat[i + 1]), token, int(flat[i + 2])))
+        return leases
+
+    def _ack(self, lease):
+        return bool(self._ack_script(keys=self._key_list("leased", "tokens", "items", "scores", "attempts", "done"),
+                                     args=[lease.key, lease.token]))
+
+    def _nack(self, lease, visible_at):
+        return bool(self._nack_script(keys=self._requeue_keys(),
+                                      args=[self.clock(), visible_at, lease.key, lease.token, self.max_attempts]))
+
+    def _extend(self, lease, deadline):
+        return bool(self._extend_script(keys=self._key_list("leased", "tokens"), args=[lease.key, lease.token, deadline]))
+
+    def counts(self):
+        pipe = self.client.pipeline()
+        pipe.zcard(self._keys["ready"])
+        pipe.zcard(self._keys["delayed"])
+        pipe.zcard(self._keys["leased"])
+        pipe.get(self._keys["done"])
+        pipe.scard(self._keys["failed"])
+        ready, delayed, leased, done, failed = pipe.execute()
+        return {"queued": ready + delayed, "leased": leased, "done": int(done or 0), "failed": failed}
+
+    def close(self):
+        self.client.close()
+
+
+# ============================
+# 🟡 Function: Open a Frontier by URL
+# ============================
+def open_frontier(url, name="default", **kwargs):
+    """
+    Opens the frontier named by `url`:
+
+    - "memory://": in this process only
+    - "sqlite:///path/frontier.db" (or just a .db path): every process on this host
+    - "redis://host:6379/0" (or "rediss://"): every host that can reach the broker
+
+    Args:
+        url (str): Backend URL.
+        name (str): Queue name (see `queue_name`).
+        **kwargs: visibility_timeout, max_attempts, clock.
+
+    Returns:
+        Frontier: The opened frontier.
+    """
+    scheme = urlparse(url).scheme
+    if scheme == "memory":
+        return MemoryFrontier(name, **kwargs)
+    if scheme in ("redis", "rediss"):
+        if redis is None:
+            raise ImportError("The Redis frontier requires redis-py: pip install redis")
+        return RedisFrontier(redis.Redis.from_url(url), name, **kwargs)
+    if scheme == "sqlite":
+        return SqliteFrontier(url[len("sqlite:///"):] if url.startswith("sqlite:///") else urlparse(url).path, name, **kwargs)
+    if scheme in ("", "file") or len(scheme) == 1:  # Plain path (a Windows drive letter parses as a scheme)
+        return SqliteFrontier(url[len("file://"):] if scheme == "file" else url, name, **kwargs)
+    raise ValueError(f"Unsupported frontier '{url}' (use memory://, sqlite:///path.db or redis://host:port/db)")
+
+
+def queue_name(site, job=None, crawl_id=None):
+    """
+    Returns the frontier name of a site's crawl, e.g. "ebay:headphones:2026-10-18". Nodes with
+    the same name share work; a new `crawl_id` (default: today's UTC date) starts a fresh crawl,
+    since items done under an old name are never queued there again.
+    """
+    crawl_id = crawl_id or time.strftime("%Y-%m-%d", time.gmtime())
+    return f"{site}:{job_slug(job)}:{crawl_id}" if job else f"{site}:{crawl_id}"
+
+
+def frontier_from_args(args, site, job=None):
+    """ Opens the frontier of `--frontier` / `--crawl-id` for a site (or one of its jobs); None without `--frontier`. """
+    if not args.frontier:
+        return None
+    if getattr(args, "incremental", False):
+        print("⚠️ --incremental is ignored with --frontier (each node only sees part of the crawl).")
+        args.incremental = False
+    frontier = open_frontier(args.frontier, queue_name(site, job, args.crawl_id))
+    print(f"🌐 Joined frontier '{frontier.name}' as {args.node or 'the only node'}: {frontier.counts()}")
+    return frontier
+
+
+def node_path(path, node=None):
+    """ Returns a node's own copy of an output path, e.g. "ebay_products.node-2.csv" (`path` unchanged without a node). """
+    if not node:
+        return path
+    stem, extension = os.path.splitext(path)
+    return f"{stem}.{node}{extension}"
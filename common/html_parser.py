@@ -0,0 +1,42 @@
+from urllib.parse import urljoin  # Import urljoin to absolutize extracted links
+from lxml import html as lxml_html  # Import lxml's HTML parser
+
+
+# ============================
+# 🟡 Helper Function: Parse HTML
+# ============================
+def parse_html(text, base_url=None):
+    """
+    Parses an HTML document into an lxml tree.
+
+    Args:
+        text (str): Raw HTML.
+        base_url (str): URL the page was fetched from, used to resolve relative links.
+
+    Returns:
+        lxml.html.HtmlElement: The document root.
+    """
+    return lxml_html.fromstring(text, base_url=base_url)
+
+
+def is_xpath(selector):
+    """ Returns True for XPath selectors (the scrapers write those starting with '/', './' or '(', or '.'). """
+    return selector == "." or selector.startswith(("/", "./", "("))
+
+
+def node_text(node):
+    """ Returns the whitespace-normalized text of a node, like Selenium's `.text`. """
+    return " ".join(node.text_content().split())
+
+
+def node_value(node, attribute=None, base_url=None):
+    """
+    Reads a node's text, or one of its attributes when `attribute` is given.
+    `href`/`src` values are resolved to absolute URLs, matching Selenium's `get_attribute`.
+    """
+    if attribute is None:
+        return node_text(node)
+    value = node.get(attribute)
+    if value is not None and attribute in ("href", "src") and base_url:
+        value = urljoin(base_url, value)
+    return value
@@ -0,0 +1,128 @@
+import random  # Import random to pick a user agent
+import requests  # Import requests for the pooled keep-alive HTTP session
+from requests.adapters import HTTPAdapter  # Import HTTPAdapter to size the connection pool
+
+from common.block_detect import detect_block  # Import the block / CAPTCHA classifier
+from common.identities import USER_AGENTS, using_identity  # Import the shared user agents and identity tracking
+from common.metrics import METRICS  # Import the hot-path timers and counters
+from common.rate_limit import RATE_LIMITER  # Import the shared per-domain rate limiter
+
+
+# ============================
+# 🟡 Class: Pooled HTTP Client
+# ============================
+class HttpClient:
+    """
+    A keep-alive HTTP client used by the browser-free "lightweight" fetch mode.
+
+    One `requests.Session` is shared by all callers, so TCP/TLS connections are
+    reused across pages instead of being re-opened for every request.
+
+    Args:
+        pool_size (int): Maximum number of kept-alive connections per host.
+        timeout (float): Per-request timeout in seconds.
+        user_agent (str): User-Agent header (random pick from USER_AGENTS if omitted).
+        rate_limiter (DomainRateLimiter): Every request waits for it and reports its outcome to it
+            (None disables throttling).
+        cache (PageCache): Page cache used by `get_text`: fresh pages are served without a request,
+            stale ones are revalidated with If-None-Match / If-Modified-Since.
+        identity (Identity): Persona to fetch as (common/identities.py): its user agent, language
+            and proxy are used, and its health score gets every outcome.
+    """
+
+    def __init__(self, pool_size=10, timeout=15, user_agent=None, rate_limiter=RATE_LIMITER, cache=None, identity=None):
+        self.timeout = timeout
+        self.rate_limiter = rate_limiter
+        self.cache = cache
+        self.identity = identity
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers.update({
+            "User-Agent": user_agent or (identity.user_agent if identity else random.choice(USER_AGENTS)),
+            "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+            "Accept-Language": identity.accept_language if identity else "en-US,en;q=0.9",
+        })
+        if identity is not None:
+            self.session.proxies.update(identity.proxies)
+
+    def add_cookies(self, cookies):
+        """ Adds Selenium-format cookies (`driver.get_cookies()`, common/cookies.py files) to the session. """
+        for cookie in cookies:
+            self.session.cookies.set(cookie["name"], cookie["value"], domain=cookie.get("domain"), path=cookie.get("path", "/"))
+
+    def load_driver_cookies(self, driver):
+        """ Copies cookies (and the User-Agent) from a Selenium session so both see the same site state. """
+        self.add_cookies(driver.get_cookies())
+        try:
+            self.session.headers["User-Agent"] = driver.execute_script("return navigator.userAgent;")
+        except Exception:
+            pass
+
+    def get(self, url, **kwargs):
+        """
+        Fetches a URL and returns the response.
+
+        Args:
+            url (str): Page to fetch.
+            **kwargs: Extra arguments forwarded to `requests.Session.get`.
+
+        Returns:
+            requests.Response: The response (status is not raised on), with `verdict` set to its
+            block classification (common/block_detect.py; None for a normal page).
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        with using_identity(self.identity):  # Paced and scored as this client's identity (None: a direct connection)
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(url)
+            with METRICS.span("http_get"):
+                response = self.session.get(url, **kwargs)
+            METRICS.count("http_responses", status=response.status_code)
+            text = response.text if response.ok else None
+            if self.rate_limiter is None:
+                response.verdict = detect_block(response.url or url, status=response.status_code, text=text)
+            else:
+                response.verdict = self.rate_limiter.classify(response.url or url, status=response.status_code, text=text)
+        return response
+
+    def get_text(self, url, **kwargs):
+        """
+        Fetches a URL and returns its body, or None on a network error, a non-2xx status or a
+        block page (robot check, login wall, consent page; never cached). With a cache, a fresh
+        cached copy is returned without touching the network, and a stale one is revalidated
+        (a 304 answer reuses the cached body).
+        """
+        cached = self.cache.get(url) if self.cache is not None else None
+        if cached is not None and cached.fresh and cached.html:
+            return cached.html
+        if cached is not None and cached.html:
+            kwargs["headers"] = dict(cached.validators(), **kwargs.get("headers", {}))
+        try:
+            response = self.get(url, **kwargs)
+        except requests.RequestException as e:
+            print(f"⚠️ HTTP error fetching {url}: {e}")  # Already counted under errors{stage="http_get"}
+            return None
+        if response.status_code == 304 and cached is not None and cached.html:
+            self.cache.touch(url)  # Not modified: the cached copy is fresh again
+            return cached.html
+        if response.verdict is not None and response.verdict.blocked:
+            print(f"⛔ Blocked fetching {url}: {response.verdict.kind} ({response.verdict.reason})")
+            return None
+        if not response.ok:
+            print(f"⚠️ HTTP {response.status_code} fetching {url}")
+            return None
+        if self.cache is not None:
+            self.cache.put(url, html=response.text, etag=response.headers.get("ETag"),
+                           last_modified=response.headers.get("Last-Modified"))
+        return response.text
+
+    def close(self):
+        """ Closes all pooled connections. """
+        self.session.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,66 @@
+import re  # Import re to turn queries into file-name slugs
+import json  # Import json to read job files
+
+
+# ============================
+# 🟡 Function: Load Jobs
+# ============================
+def load_jobs(path, site=None):
+    """
+    Reads scrape jobs from a JSON file (a list of objects) or a JSON Lines file (one object per line).
+
+    Each job is a dict with a "site" plus the inputs that site needs, for example:
+        {"site": "yelp", "query": "pizza", "location": "London", "max_pages": 3}
+        {"site": "instagram", "profile": "galaxies"}
+
+    Args:
+        path (str): Job file.
+        site (str): Only return jobs for this site.
+
+    Returns:
+        list[dict]: The jobs, in file order.
+    """
+    with open(path, encoding="utf-8") as file:
+        text = file.read().strip()
+    if text.startswith("["):
+        jobs = json.loads(text)
+    else:
+        jobs = [json.loads(line) for line in text.splitlines() if line.strip()]
+    return [job for job in jobs if site is None or job.get("site") == site]
+
+
+def jobs_from_args(args, site):
+    """
+    Returns the jobs requested on the command line: the `--jobs` file (filtered to `site`)
+    or a single job built from `--query` / `--location` / `--profile`. Empty means interactive mode.
+    """
+    if args.jobs:
+        return load_jobs(args.jobs, site)
+    job = {name: getattr(args, name) for name in ("query", "location", "profile", "max_pages", "limit")
+           if getattr(args, name, None) is not None}
+    if not (job.get("query") or job.get("profile")):
+        return []
+    job["site"] = site
+    return [job]
+
+
+# ============================
+# 🟡 Function: Per-Job File Names
+# ============================
+def job_slug(job):
+    """ Returns a file-name-safe slug for a job, e.g. 'pizza-london'. """
+    parts = [str(job[key]) for key in ("query", "location", "profile") if job.get(key)]
+    return re.sub(r"[^a-z0-9]+", "-", " ".join(parts).lower()).strip("-") or "job"
+
+
+def job_path(job, default):
+    """
+    Returns the file a job writes to: the job's explicit "output", `default` in
+    interactive mode, or `default` with the job slug inserted before the extension.
+    """
+    if job is None:
+        return default
+    if job.get("output"):
+        return job["output"]
+    stem, dot, extension = default.rpartition(".")
+    return f"{stem}_{job_slug(job)}.{extension}" if dot else f"{default}_{job_slug(job)}"
@@ -0,0 +1,72 @@
+# ============================
+# 🟡 In-Page Query Helpers
+# ============================
+# Shared by every script run in the page. Selectors starting with '/', './', '(' or
+# equal to '.' are XPath, anything else CSS.
+QUERY_HELPERS = """
+const isXPath = (sel) => sel === '.' || /^(\\/|\\.\\/|\\()/.test(sel);
+
+function queryAll(root, sel) {
+    if (!isXPath(sel)) return Array.from(root.querySelectorAll(sel));
+    const snap = document.evaluate(sel, root, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    const nodes = [];
+    for (let i = 0; i < snap.snapshotLength; i++) nodes.push(snap.snapshotItem(i));
+    return nodes;
+}
+
+function queryFirst(root, sel) {
+    if (!isXPath(sel)) return root.querySelector(sel);
+    return document.evaluate(sel, root, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+}
+"""
+
+
+# ============================
+# 🟡 In-Page Extraction Script With Fallbacks
+# ============================
+# Runs inside the browser: finds every container node, then reads each field relative to it.
+# Every selector is a list of XPath fallbacks tried in order (CSS is translated to XPath
+# beforehand, see `common.selector_registry`). Returns the index of the container
+# selector that matched and, per field, [value, index of the selector that hit].
+EXTRACT_FALLBACK_SCRIPT = """
+const [containers, fields] = arguments;
+
+function queryAll(root, xpath) {
+    const snap = document.evaluate(xpath, root, null, XPathResult.ORDERED_NODE_SNAPSHOT_TYPE, null);
+    const nodes = [];
+    for (let i = 0; i < snap.snapshotLength; i++) nodes.push(snap.snapshotItem(i));
+    return nodes;
+}
+
+function queryFirst(root, xpath) {
+    return document.evaluate(xpath, root, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null).singleNodeValue;
+}
+
+function read(el, attr) {
+    if (el.nodeType !== Node.ELEMENT_NODE) return (el.nodeValue || el.textContent || '').trim();  // Attribute / text nodes
+    if (attr === null || attr === undefined) return (el.innerText || el.textContent || '').trim();
+    if (attr === 'href' || attr === 'src') return el[attr] || el.getAttribute(attr);
+    return el.getAttribute(attr);
+}
+
+let cards = [];
+let containerIndex = -1;
+for (let i = 0; i < containers.length; i++) {
+    cards = queryAll(document, containers[i]);
+    if (cards.length) { containerIndex = i; break; }
+}
+
+const records = cards.map((card) => {
+    const record = {};
+    for (const [name, [selectors, attr]] of Object.entries(fields)) {
+        record[name] = [null, -1];
+        for (let i = 0; i < selectors.length; i++) {
+            const el = queryFirst(card, selectors[i]);
+            const value = el ? read(el, attr) : null;
+            if (value) { record[name] = [value, i]; break; }  // Empty matches fall through to the next selector
+        }
+    }
+    return record;
+});
+return {container: containerIndex, records: records};
+"""
@@ -0,0 +1,310 @@
+import os  # Import os for atomic file replacement and the process ID
+import json  # Import json for the structured log lines
+import time  # Import time to time spans and stamp log lines
+import atexit  # Import atexit to write the metrics file when the script ends
+import pstats  # Import pstats to print the profile summary
+import cProfile  # Import cProfile for the optional job profiler
+import threading  # Import threading to guard the metrics and run the exporters
+import functools  # Import functools to keep wrapped method names
+from contextlib import contextmanager  # Import contextmanager for span timers and the profiler
+from collections import defaultdict  # Import defaultdict for the metric tables
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer  # Import the standard-library HTTP server
+
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)  # Span histogram bounds (seconds)
+PREFIX = "scraper"  # Prometheus metric name prefix
+
+
+def _label_key(labels):
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    escaped = (value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n") for _, value in pairs)
+    return "{" + ",".join(f'{name}="{value}"' for (name, _), value in zip(pairs, escaped)) + "}"
+
+
+# ============================
+# 🟡 Class: Metrics Registry
+# ============================
+class Metrics:
+    """
+    Process-wide timings and counters for the scraping hot path.
+
+    - spans: `with METRICS.span("navigate"):` times a stage (browser start, navigation, waits,
+      element lookups, extraction, sink writes) into a histogram per stage and labels
+    - counters: `METRICS.count("records_written", 10)` for records, errors, retries, cache hits, ...
+
+    Everything is kept in memory and costs a lock and a few additions per call. Nothing is
+    written unless `configure()` is called: a JSON Lines log gets one line per span / event,
+    a Prometheus text file is rewritten periodically and at exit, and `/metrics` can be
+    served over HTTP.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._spans = {}  # (stage, labels) -> [count, sum, max, bucket counts]
+        self._counters = defaultdict(float)  # (name, labels) -> value
+        self._log = None
+        self._log_lock = threading.Lock()
+        self.prometheus_path = None
+        self._owner_pid = os.getpid()
+        self._server = None
+        self._stop = threading.Event()
+
+    # ----- Recording -----
+
+    def observe(self, stage, seconds, **labels):
+        """ Records one duration of `stage`. """
+        key = (stage, _label_key(labels))
+        with self._lock:
+            entry = self._spans.get(key)
+            if entry is None:
+                entry = self._spans[key] = [0, 0.0, 0.0, [0] * len(BUCKETS)]
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+            for index, bound in enumerate(BUCKETS):
+                if seconds <= bound:
+                    entry[3][index] += 1
+                    break
+
+    def count(self, name, value=1, **labels):
+        """ Adds `value` to counter `name`. """
+        with self._lock:
+            self._counters[(name, _label_key(labels))] += value
+
+    @contextmanager
+    def span(self, stage, **labels):
+        """ Times the block as one `stage` span; an exception is counted under errors{stage=...}. """
+        start = time.perf_counter()
+        failed = False
+        try:
+            yield
+        except BaseException:
+            failed = True
+            self.count("errors", stage=stage)
+            raise
+        finally:
+            seconds = time.perf_counter() - start
+            self.observe(stage, seconds, **labels)
+            if self._log is not None:
+                self.log("span", stage=stage, seconds=round(seconds, 6), error=failed, **labels)
+
+    def wrap(self, stage, function, **labels):
+        """ Returns `function` timed as a `stage` span on every call. """
+        @functools.wraps(function)
+        def timed(*args, **kwargs):
+            with self.span(stage, **labels):
+                return function(*args, **kwargs)
+        return timed
+
+    def log(self, event, **fields):
+        """ Writes one JSON line to the metrics log (if configured). """
+        if self._log is None:
+            return
+        line = json.dumps(dict(ts=round(time.time(), 3), pid=os.getpid(), event=event, **fields), default=str)
+        with self._log_lock:
+            self._log.write(line + "\n")
+            self._log.flush()
+
+    # ----- Reading -----
+
+    def drain(self):
+        """ Returns everything recorded so far and starts from zero (used to ship worker metrics to the parent). """
+        with self._lock:
+            state = {"spans": self._spans, "counters": dict(self._counters)}
+            self._spans, self._counters = {}, defaultdict(float)
+        return state
+
+    def merge(self, state):
+        """ Adds a `drain()` result from another process. """
+        with self._lock:
+            for key, (count, total, maximum, buckets) in state["spans"].items():
+                entry = self._spans.setdefault(key, [0, 0.0, 0.0, [0] * len(BUCKETS)])
+                entry[0] += count
+                entry[1] += total
+                entry[2] = max(entry[2], maximum)
+                entry[3] = [mine + theirs for mine, theirs in zip(entry[3], buckets)]
+            for key, value in state["counters"].items():
+                self._counters[key] += value
+
+    def summary(self):
+        """ Returns {stage: {count, total, mean, max}} and {counter: value}, labels folded into the names. """
+        with self._lock:
+            spans = {
+                stage + _format_labels(labels): {
+                    "count": count, "total": round(total, 3), "mean": round(total / count, 4), "max": round(maximum, 3),
+                }
+                for (stage, labels), (count, total, maximum, _) in sorted(self._spans.items())
+            }
+            counters = {name + _format_labels(labels): value for (name, labels), value in sorted(self._counters.items())}
+        return {"spans": spans, "counters": counters}
+
+    def prometheus_text(self):
+        """ Returns every metric in the Prometheus text exposition format. """
+        lines = []
+        with self._lock:
+            spans = sorted(self._spans.items())
+            counters = sorted(self._counters.items())
+        if spans:
+            name = f"{PREFIX}_stage_seconds"
+            lines += [f"# HELP {name} Time spent per scraping stage.", f"# TYPE {name} histogram"]
+            for (stage, labels), (count, total, _, buckets) in spans:
+                key = (("stage", stage),) + labels
+                cumulative = 0
+                for bound, hits in zip(BUCKETS, buckets):
+                    cumulative += hits
+                    lines.append(f"{name}_bucket{_format_labels(key, [('le', str(bound))])} {cumulative}")
+                lines.append(f"{name}_bucket{_format_labels(key, [('le', '+Inf')])} {count}")
+                lines.append(f"{name}_sum{_format_labels(key)} {total:.6f}")
+                lines.append(f"{name}_count{_format_labels(key)} {count}")
+        typed = set()
+        for (counter, labels), value in counters:
+            name = f"{PREFIX}_{counter}_total"
+            if name not in typed:
+                typed.add(name)
+                lines.append(f"# TYPE {name} counter")
+            lines.append(f"{name}{_format_labels(labels)} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    # ----- Exporters -----
+
+    def configure(self, log_path=None, prometheus_path=None, port=None, interval=15.0):
+        """
+        Turns on the exporters.
+
+        Args:
+            log_path (str): JSON Lines file; one line per span and event (appended to).
+            prometheus_path (str): Prometheus text file, rewritten every `interval` seconds and at exit
+                (worker processes write `<path>.<pid>`).
+            port (int): Serve the Prometheus text at http://localhost:<port>/metrics.
+            interval (float): Seconds between metrics file rewrites.
+        """
+        if log_path:
+            self._log = open(log_path, "a", encoding="utf-8")
+        if prometheus_path:
+            self.prometheus_path = prometheus_path
+            threading.Thread(target=self._write_periodically, args=(interval,), daemon=True).start()
+        if port is not None:
+            self._server = ThreadingHTTPServer(("127.0.0.1", port), _handler_for(self))
+            threading.Thread(target=self._server.serve_forever, daemon=True).start()
+            print(f"📈 Metrics served at http://127.0.0.1:{self._server.server_address[1]}/metrics")
+        atexit.register(self.close)
+
+    def _write_periodically(self, interval):
+        while not self._stop.wait(interval):
+            self.write_prometheus()
+
+    def write_prometheus(self, path=None):
+        """ Writes the Prometheus text file atomically (for node_exporter's textfile collector and the like). """
+        path = path or self.prometheus_path
+        if not path:
+            return
+        if os.getpid() != self._owner_pid:
+            path = f"{path}.{os.getpid()}"  # Forked worker: never clobber the parent's file
+        temporary = path + ".tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            file.write(self.prometheus_text())
+        os.replace(temporary, path)
+
+    def close(self):
+        """ Writes the metrics file a last time and stops the exporters. """
+        self._stop.set()
+        if self.prometheus_path:
+            self.write_prometheus()
+            print(f"📈 Metrics written to {self.prometheus_path}")
+        if self._server is not None:
+            self._server.shutdown()
+            self._server = None
+        if self._log is not None:
+            with self._log_lock:
+                self._log.close()
+                self._log = None
+
+
+def _handler_for(metrics):
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                return self.send_error(404)
+            body = metrics.prometheus_text().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+    return MetricsHandler
+
+
+METRICS = Metrics()  # Process-wide registry used by the whole `common` package
+
+
+# ============================
+# 🟡 Function: Instrument a WebDriver
+# ============================
+def instrument_driver(driver, metrics=METRICS):
+    """
+    Times the WebDriver calls on the hot path: `get` (navigate), `find_element(s)` and
+    `execute_script` (script). Returns the same driver.
+    """
+    for method, stage in (("get", "navigate"), ("find_element", "find_element"),
+                          ("find_elements", "find_element"), ("execute_script", "script")):
+        setattr(driver, method, metrics.wrap(stage, getattr(driver, method)))
+    return driver
+
+
+# ============================
+# 🟡 Function: Configure From the Command Line
+# ============================
+def configure_metrics(args):
+    """ Turns on the exporters requested with --metrics-log / --metrics-file / --metrics-port. """
+    if args.metrics_log or args.metrics_file or args.metrics_port is not None:
+        METRICS.configure(log_path=args.metrics_log, prometheus_path=args.metrics_file, port=args.metrics_port)
+
+
+# ============================
+# 🟡 Function: Profile One Job
+# ============================
+@contextmanager
+def profile_run(path=None, top=25):
+    """
+    Profiles the block with cProfile and saves the stats to `path` (open with `python -m pstats`
+    or snakeviz). A path ending in ".html" uses pyinstrument instead, if it is installed.
+    Does nothing without a path.
+    """
+    if not path:
+        yield
+        return
+    if path.endswith(".html"):
+        try:
+            from pyinstrument import Profiler  # Optional: sampling profiler with an HTML report
+        except ImportError:
+            print("⚠️ pyinstrument is not installed; using cProfile instead.")
+            path = path[:-len(".html")] + ".prof"
+        else:
+            profiler = Profiler()
+            profiler.start()
+            try:
+                yield
+            finally:
+                profiler.stop()
+                with open(path, "w", encoding="utf-8") as file:
+                    file.write(profiler.output_html())
+                print(f"🔬 Profile written to {path}")
+            return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
+        pstats.Stats(profiler).sort_stats("cumulative").print_stats(top)
+        print(f"🔬 Profile written to {path}")
@@ -0,0 +1,282 @@
+import os  # Import os to name the output file
+import re  # Import re to compile the column patterns once
+import sys  # Import sys to extend the module search path when run as a script
+import argparse  # Import argparse for the command-line entry point
+import sqlite3  # Import sqlite3 to read SqliteSink outputs
+from pathlib import Path  # Import Path to locate the repository root
+
+import numpy as np  # Import NumPy for the compact numeric dtypes
+import pandas as pd  # Import pandas for the column-wise string operations
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # Make `common` importable when run as a script
+from common.metrics import METRICS  # Import the hot-path timers and counters
+
+
+# Price: optional currency ("$", "£", "US $", "EUR"), an amount, an optional "to" / "-" upper bound,
+# and the currency after the amount where sites put it there ("1.299,00 €")
+CURRENCY = r"[A-Z]{1,2}\s?\$|[A-Z]{3}|[$£€¥₹]"
+AMOUNT = r"\d[\d.,]*\d|\d"
+EUROPEAN_AMOUNT = r"^\d{1,3}(?:\.\d{3})*,\d{1,2}$"  # "1.299,00" and "5,00" use a decimal comma
+PRICE_PATTERN = re.compile(
+    rf"(?P<currency>{CURRENCY})?\s*(?P<low>{AMOUNT})(?:\s*(?:to|-|–)\s*(?:{CURRENCY})?\s*(?P<high>{AMOUNT}))?"
+    rf"(?:\s*(?P<suffix>[$£€¥₹]|[A-Z]{{3}}\b))?"
+)
+# Rating: "4.5 out of 5 stars", "4.5 star rating", "4.5/5" or a bare "4.5"; a lone "4,5" has a decimal comma
+RATING = r"\d,\d(?!\d)|\d+(?:\.\d+)?"
+RATING_PATTERN = re.compile(
+    rf"(?P<value>{RATING})\s*(?:out of \d|stars?|/\s*5)|^\s*(?P<bare>{RATING})\s*$", re.IGNORECASE
+)
+# Review count: "12,345 ratings", "1.2K reviews", "(87)" or a bare "87"; commas only between 3-digit groups,
+# so a rating such as "4,5" is not read as 45 reviews
+COUNT = r"\d{1,3}(?:,\d{3})+|\d+"
+REVIEW_COUNT_PATTERN = re.compile(
+    rf"(?<![\d,.])(?P<count>(?:{COUNT})(?:\.\d+)?)\s*(?P<unit>[KM])?\s*(?:ratings?|reviews?)|^\s*\(?(?P<bare>{COUNT})\)?\s*$",
+    re.IGNORECASE,
+)
+
+CURRENCY_CODES = {"$": "USD", "US$": "USD", "£": "GBP", "€": "EUR", "¥": "JPY", "₹": "INR", "C$": "CAD", "AU$": "AUD"}
+UNITS = {"K": 1e3, "M": 1e6}
+
+# Site -> raw columns holding its price / rating / review count, and the currency of bare amounts
+SITE_FIELDS = {
+    "amazon": {"price": "Price", "rating": "Reviews", "review_count": "Reviews", "currency": "USD"},
+    "ebay": {"price": "Price", "currency": "USD"},
+    "yelp": {"rating": "Rating"},
+    "google_maps": {},
+    "linkedin": {},
+    "instagram": {},
+}
+
+
+def _to_number(strings, dtype):
+    """ Parses a column of digit strings ("1,299") into `dtype`; anything else becomes NaN. """
+    return pd.to_numeric(strings.str.replace(",", "", regex=False), errors="coerce").astype(dtype)
+
+
+def _to_amount(strings):
+    """ Parses a column of amounts, with thousands commas ("1,299.99") or a decimal comma ("1.299,99"), into float32. """
+    european = strings.str.match(EUROPEAN_AMOUNT, na=False)
+    decimal_comma = strings.str.replace(".", "", regex=False).str.replace(",", ".", regex=False)
+    return _to_number(strings.where(~european, decimal_comma), np.float32)
+
+
+def _by_value(raw, parse):
+    """
+    Runs `parse` on the distinct values of `raw` only and broadcasts the result back to every
+    row with the factorized codes (a NumPy take). Scraped prices and ratings repeat a lot, so
+    the regexes run over thousands of values instead of millions of rows.
+    """
+    codes, uniques = pd.factorize(raw)
+    values = pd.Series(list(uniques) + [""], dtype=object).astype(str)  # "" stands in for missing values
+    codes[codes < 0] = len(uniques)
+    parsed = parse(values).take(codes)
+    parsed.index = raw.index
+    return parsed
+
+
+# ============================
+# 🟡 Function: Parse Prices
+# ============================
+def parse_prices(raw, currency=None):
+    """
+    Parses a column of raw prices ("$1,299.99", "1,299", "$10.00 to $25.00", "£8.50",
+    "No featured offers available"); each distinct string is parsed once.
+
+    Args:
+        raw (pd.Series): Price strings as scraped.
+        currency (str): Currency code of amounts without a symbol (e.g. Amazon's "1,299").
+
+    Returns:
+        pd.DataFrame: price (the amount, or the lower bound of a range), price_min, price_max
+        (float32, NaN when there is no price) and currency (categorical ISO code).
+    """
+    return _by_value(raw, lambda values: _parse_prices(values, currency))
+
+
+def _parse_prices(values, currency):
+    parts = values.str.extract(PRICE_PATTERN)
+    price_min = _to_amount(parts["low"])
+    price_max = _to_amount(parts["high"]).fillna(price_min)
+    symbols = parts["currency"].fillna(parts["suffix"]).str.replace(r"\s+", "", regex=True)
+    codes = symbols.replace(CURRENCY_CODES)
+    if currency is not None:
+        codes = codes.fillna(currency)
+    codes = codes.where(price_min.notna())  # No amount, no currency
+    return pd.DataFrame({
+        "price": price_min,
+        "price_min": price_min,
+        "price_max": price_max,
+        "currency": codes.astype("category"),
+    })
+
+
+# ============================
+# 🟡 Function: Parse Ratings
+# ============================
+def parse_ratings(raw):
+    """ Parses a column of ratings ("4.5 star rating", "4.5 out of 5 stars", "4,5") into float32. """
+    return _by_value(raw, _parse_ratings)
+
+
+def _parse_ratings(values):
+    parts = values.str.extract(RATING_PATTERN)
+    numbers = parts["value"].fillna(parts["bare"]).str.replace(",", ".", regex=False)
+    return pd.to_numeric(numbers, errors="coerce").astype(np.float32)
+
+
+# ============================
+# 🟡 Function: Parse Review Counts
+# ============================
+def parse_review_counts(raw):
+    """ Parses a column of review counts ("12,345 ratings", "1.2K reviews", "(87)") into nullable Int32. """
+    return _by_value(raw, _parse_review_counts)
+
+
+def _parse_review_counts(values):
+    parts = values.str.extract(REVIEW_COUNT_PATTERN)
+    counts = _to_number(parts["count"].fillna(parts["bare"]), np.float64)
+    scale = parts["unit"].str.upper().map(UNITS).fillna(1.0)
+    return (counts * scale).round().astype("Int32")
+
+
+# ============================
+# 🟡 Function: Normalize a Batch of Records
+# ============================
+def normalize_frame(frame, site, keep_raw=False, categorical=None, category_ratio=0.5):
+    """
+    Replaces a site's raw price / rating / review columns with typed ones and stores
+    repetitive text columns as categoricals, so millions of rows take a fraction of the memory
+    and aggregate quickly.
+
+    Args:
+        frame (pd.DataFrame): Records as written by the scrapers (string columns).
+        site (str): Key of SITE_FIELDS.
+        keep_raw (bool): Keep the raw source columns next to the typed ones.
+        categorical (set): Text columns to store as categoricals (inferred when None: columns
+            whose distinct values are at most `category_ratio` of the rows).
+        category_ratio (float): Threshold of the inference.
+
+    Returns:
+        pd.DataFrame: The typed batch.
+    """
+    fields = SITE_FIELDS[site]
+    with METRICS.span("normalize", site=site):
+        typed = {}
+        if fields.get("price") in frame:
+            typed.update(parse_prices(frame[fields["price"]], fields.get("currency")).items())
+        if fields.get("rating") in frame:
+            typed["rating"] = parse_ratings(frame[fields["rating"]]).rename("rating")
+        if fields.get("review_count") in frame:
+            typed["review_count"] = parse_review_counts(frame[fields["review_count"]]).rename("review_count")
+
+        raw_columns = {fields.get(name) for name in ("price", "rating", "review_count")} - {None}
+        text = frame if keep_raw else frame.drop(columns=[column for column in raw_columns if column in frame])
+        if categorical is None:
+            categorical = {
+                column for column in text.columns
+                if text[column].dtype == object or pd.api.types.is_string_dtype(text[column])
+                if text[column].nunique(dropna=True) <= category_ratio * len(text)
+            }
+        result = text.astype({column: "category" for column in categorical if column in text})
+        for name, column in typed.items():
+            result[name] = column
+    return result
+
+
+def read_batches(path, chunksize):
+    """ Yields DataFrames of at most `chunksize` string records from a sink output (.csv, .jsonl, .parquet, .db). """
+    extension = os.path.splitext(path)[1].lower()
+    if extension == ".csv":
+        yield from pd.read_csv(path, dtype=str, chunksize=chunksize)
+    elif extension == ".jsonl":
+        yield from pd.read_json(path, lines=True, dtype=False, chunksize=chunksize)
+    elif extension == ".parquet":
+        import pyarrow.parquet  # Already required to write Parquet
+        for batch in pyarrow.parquet.ParquetFile(path).iter_batches(batch_size=chunksize):
+            yield batch.to_pandas()
+    elif extension in (".db", ".sqlite"):
+        with sqlite3.connect(path) as conn:
+            yield from pd.read_sql_query('SELECT * FROM "records"', conn, chunksize=chunksize)
+    else:
+        raise ValueError(f"Unsupported input format '{extension}' (use .csv, .jsonl, .parquet or .db)")
+
+
+# ============================
+# 🟡 Function: Normalize an Output File
+# ============================
+def normalize_file(path, site, output=None, chunksize=250_000, keep_raw=False):
+    """
+    Normalizes a scraper output file batch by batch, so memory stays bounded whatever its size,
+    and writes the typed records to Parquet (dictionary-encoded categoricals, float32 prices
+    and ratings, Int32 review counts) or CSV.
+
+    Args:
+        path (str): Scraper output (.csv, .jsonl, .parquet or .db).
+        site (str): Key of SITE_FIELDS.
+        output (str): Typed output; defaults to `<name>.typed.parquet` next to the input.
+        chunksize (int): Records normalized per batch.
+        keep_raw (bool): Keep the raw source columns.
+
+    Returns:
+        dict: rows, raw and typed in-memory sizes (MB) and the output path.
+    """
+    output = output or os.path.splitext(path)[0] + ".typed.parquet"
+    parquet = output.endswith(".parquet")
+    if parquet:
+        try:
+            import pyarrow  # Imported lazily, like ParquetSink
+            import pyarrow.parquet
+        except ImportError as e:
+            raise ImportError("Parquet output requires pyarrow: pip install pyarrow (or pass a .csv output)") from e
+    if os.path.exists(output):
+        os.remove(output)
+
+    writer = schema = categorical = None
+    rows = raw_bytes = typed_bytes = 0
+    try:
+        for batch in read_batches(path, chunksize):
+            typed = normalize_frame(batch, site, keep_raw=keep_raw, categorical=categorical)
+            if categorical is None:
+                categorical = {column for column in typed.columns if isinstance(typed[column].dtype, pd.CategoricalDtype)}
+            rows += len(batch)
+            raw_bytes += batch.memory_usage(deep=True).sum()
+            typed_bytes += typed.memory_usage(deep=True).sum()
+            if not parquet:
+                typed.to_csv(output, mode="a", header=writer is None, index=False)
+                writer = True
+                continue
+            if schema is None:
+                # Every batch has its own categories: fix the dictionary index type so all row groups share one schema
+                schema = pyarrow.Schema.from_pandas(typed, preserve_index=False)
+                for index, field in enumerate(schema):
+                    if pyarrow.types.is_dictionary(field.type):
+                        schema = schema.set(index, pyarrow.field(field.name, pyarrow.dictionary(pyarrow.int32(), pyarrow.string())))
+                writer = pyarrow.parquet.ParquetWriter(output, schema)
+            writer.write_table(pyarrow.Table.from_pandas(typed, schema=schema, preserve_index=False))
+    finally:
+        if parquet and writer is not None:
+            writer.close()
+    METRICS.count("records_normalized", rows, site=site)
+    return {
+        "rows": rows,
+        "raw_mb": round(float(raw_bytes) / 2 ** 20, 2),
+        "typed_mb": round(float(typed_bytes) / 2 ** 20, 2),
+        "output": output,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parse prices, ratings and review counts of a scraper output into typed columns.")
+    parser.add_argument("path", help="scraper output (.csv, .jsonl, .parquet or .db)")
+    parser.add_argument("--site", required=True, choices=list(SITE_FIELDS), help="site the records come from")
+    parser.add_argument("--output", metavar="FILE", help="typed output (.parquet or .csv; default <name>.typed.parquet)")
+    parser.add_argument("--chunksize", type=int, default=250_000, help="records normalized per batch")
+    parser.add_argument("--keep-raw", action="store_true", help="keep the raw price / rating / review columns")
+    args = parser.parse_args()
+    result = normalize_file(args.path, args.site, output=args.output, chunksize=args.chunksize, keep_raw=args.keep_raw)
+    print(f"🧮 {result['rows']} records normalized: {result['raw_mb']} MB as text -> {result['typed_mb']} MB typed, "
+          f"written to {result['output']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,234 @@
+import json  # Import json to store extracted records
+import time  # Import time for TTLs and LRU timestamps
+import zlib  # Import zlib to compress cached HTML
+import sqlite3  # Import sqlite3 for the on-disk cache
+import hashlib  # Import hashlib to key pages by a hash of their URL
+import threading  # Import threading so worker threads can share one cache
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse  # Import URL helpers for normalization
+
+from common.metrics import METRICS  # Import the hot-path timers and counters
+
+
+HOUR = 3600
+SITE_TTLS = {  # Domain suffix -> seconds a cached page stays fresh
+    "amazon.com": 6 * HOUR,  # Prices and stock change during the day
+    "ebay.com": 2 * HOUR,
+    "yelp.co.uk": 24 * HOUR,
+    "yelp.com": 24 * HOUR,
+    "linkedin.com": 7 * 24 * HOUR,  # Profiles and contact info rarely change
+    "instagram.com": 24 * HOUR,
+    "google.com": 24 * HOUR,
+}
+DEFAULT_TTL = 12 * HOUR
+
+TRACKING_PARAMS = {"ref", "ref_", "tag", "psc", "smid", "spia", "qid", "sr", "crid", "sprefix", "trk", "trackingId", "lipi", "fbclid", "gclid"}
+TRACKING_PREFIXES = ("utm_", "pf_rd_", "pd_rd_", "_trk")
+
+
+def normalize_url(url):
+    """
+    Returns the cache form of a URL: lower-case scheme and host without "www.", no fragment,
+    no tracking parameters (utm_*, ref=, pf_rd_*, ...) and the remaining query sorted.
+    """
+    parts = urlparse(url)
+    host = parts.netloc.lower()
+    host = host[4:] if host.startswith("www.") else host
+    query = sorted(
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if name not in TRACKING_PARAMS and not name.startswith(TRACKING_PREFIXES)
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urlunparse((parts.scheme.lower(), host, path, "", urlencode(query), ""))
+
+
+# ============================
+# 🟡 Class: Cached Page
+# ============================
+class CachedPage:
+    """ One cache entry: the page HTML, the records extracted from it and its validators. """
+
+    def __init__(self, url, html, records, etag, last_modified, fetched_at, fresh):
+        self.url = url
+        self.html = html  # Decompressed HTML, or None if only records were cached
+        self.records = records  # Records extracted from the page, or None
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fetched_at = fetched_at
+        self.fresh = fresh  # Younger than the site's TTL
+
+    def validators(self):
+        """ Returns the conditional request headers (If-None-Match / If-Modified-Since) for revalidation. """
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+# ============================
+# 🟡 Class: Page Cache
+# ============================
+class PageCache:
+    """
+    On-disk cache of fetched pages, keyed by a hash of the normalized URL.
+
+    Each entry holds the zlib-compressed HTML, the records extracted from it and the
+    ETag / Last-Modified validators. Entries are fresh for the site's TTL (SITE_TTLS);
+    stale entries stay available for conditional revalidation and for replaying
+    extractors offline. The least recently used entries are evicted once the compressed
+    size exceeds `max_bytes`; the total size is kept up to date by triggers (so it stays
+    right with several processes on one file) and a write never has to sum the table.
+
+    Args:
+        path (str): SQLite file (created if missing).
+        max_bytes (int): Size cap of the stored (compressed) pages.
+        ttls (dict): Domain suffix -> TTL in seconds, merged over SITE_TTLS.
+        default_ttl (float): TTL for domains not listed.
+    """
+
+    def __init__(self, path="page_cache.db", max_bytes=512 * 1024 * 1024, ttls=None, default_ttl=DEFAULT_TTL):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttls = dict(SITE_TTLS, **(ttls or {}))
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)  # Autocommit
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS pages (key TEXT PRIMARY KEY, url TEXT, html BLOB, records TEXT, etag TEXT,"
+            " last_modified TEXT, fetched_at REAL, accessed_at REAL, size INTEGER)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS pages_lru ON pages (accessed_at)")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS cache_size (id INTEGER PRIMARY KEY CHECK (id = 0), total INTEGER NOT NULL);
+            INSERT OR IGNORE INTO cache_size VALUES (0, (SELECT COALESCE(SUM(size), 0) FROM pages));
+            CREATE TRIGGER IF NOT EXISTS pages_size_insert AFTER INSERT ON pages
+                BEGIN UPDATE cache_size SET total = total + NEW.size; END;
+            CREATE TRIGGER IF NOT EXISTS pages_size_update AFTER UPDATE OF size ON pages
+                BEGIN UPDATE cache_size SET total = total + NEW.size - OLD.size; END;
+            CREATE TRIGGER IF NOT EXISTS pages_size_delete AFTER DELETE ON pages
+                BEGIN UPDATE cache_size SET total = total - OLD.size; END;
+        """)  # Summed once, when an older cache file gets the table
+
+    @staticmethod
+    def key(url):
+        return hashlib.sha256(normalize_url(url).encode()).hexdigest()
+
+    def ttl_for(self, url):
+        """ Returns the freshness lifetime of `url`'s site in seconds. """
+        host = urlparse(url).netloc.lower()
+        return next((ttl for suffix, ttl in self.ttls.items() if host.endswith(suffix)), self.default_ttl)
+
+    def get(self, url):
+        """
+        Returns the cached entry for `url` (fresh or stale), or None. Check `.fresh` before
+        skipping the network; a stale entry can still be revalidated with `.validators()`.
+        """
+        key = self.key(url)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT html, records, etag, last_modified, fetched_at FROM pages WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None:
+                self._conn.execute("UPDATE pages SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        if row is None:
+            self.misses += 1
+            METRICS.count("cache_requests", result="miss")
+            return None
+        html, records, etag, last_modified, fetched_at = row
+        fresh = time.time() - fetched_at < self.ttl_for(url)
+        if fresh:
+            self.hits += 1
+        else:
+            self.misses += 1
+        METRICS.count("cache_requests", result="hit" if fresh else "stale")
+        return CachedPage(
+            url, zlib.decompress(html).decode("utf-8") if html else None,
+            json.loads(records) if records else None, etag, last_modified, fetched_at, fresh,
+        )
+
+    def put(self, url, html=None, records=None, etag=None, last_modified=None):
+        """
+        Stores (or replaces) the entry for `url` and evicts old entries past the size cap.
+
+        Args:
+            url (str): Page URL.
+            html (str): Page HTML, stored compressed.
+            records (list): Records extracted from the page.
+            etag (str): ETag response header, for revalidation.
+            last_modified (str): Last-Modified response header, for revalidation.
+        """
+        blob = zlib.compress(html.encode("utf-8"), 6) if html else None
+        records_json = json.dumps(records, ensure_ascii=False, default=str) if records is not None else None
+        size = len(blob or b"") + len(records_json or "")
+        now = time.time()
+        with self._lock:
+            self._conn.execute(  # An upsert, not INSERT OR REPLACE: its implicit delete would skip the size trigger
+                "INSERT INTO pages (key, url, html, records, etag, last_modified, fetched_at, accessed_at, size)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) ON CONFLICT (key) DO UPDATE SET url = excluded.url,"
+                " html = excluded.html, records = excluded.records, etag = excluded.etag,"
+                " last_modified = excluded.last_modified, fetched_at = excluded.fetched_at,"
+                " accessed_at = excluded.accessed_at, size = excluded.size",
+                (self.key(url), url, blob, records_json, etag, last_modified, now, now, size),
+            )
+            self._evict_locked()
+
+    def put_records(self, url, records):
+        """ Attaches extracted records to an existing entry (or creates a records-only entry). """
+        records_json = json.dumps(records, ensure_ascii=False, default=str)
+        with self._lock:
+            updated = self._conn.execute(
+                "UPDATE pages SET records = ?, size = LENGTH(COALESCE(html, '')) + ? WHERE key = ?",
+                (records_json, len(records_json), self.key(url)),
+            ).rowcount
+        if not updated:
+            self.put(url, records=records)
+
+    def touch(self, url):
+        """ Marks an entry fresh again, after the server answered 304 Not Modified. """
+        METRICS.count("cache_requests", result="revalidated")
+        with self._lock:
+            self._conn.execute("UPDATE pages SET fetched_at = ?, accessed_at = ? WHERE key = ?",
+                               (time.time(), time.time(), self.key(url)))
+
+    def size(self):
+        """ Returns the stored (compressed) size of every entry in bytes. """
+        with self._lock:
+            return self._size_locked()
+
+    def _size_locked(self):
+        return self._conn.execute("SELECT total FROM cache_size").fetchone()[0]
+
+    def _evict_locked(self):
+        total = self._size_locked()
+        if total <= self.max_bytes:
+            return
+        victims = []
+        for key, size in self._conn.execute("SELECT key, size FROM pages ORDER BY accessed_at"):  # Oldest first, read lazily
+            victims.append((key,))
+            total -= size
+            if total <= self.max_bytes:
+                break
+        self._conn.executemany("DELETE FROM pages WHERE key = ?", victims)
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def summary(self):
+        """ Returns hit / miss counts for this run. """
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self)}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,197 @@
+import time  # Import time for token refill and back-off timing
+import asyncio  # Import asyncio for the non-blocking acquire
+import random  # Import random to jitter waits
+import threading  # Import threading so all worker threads share one limiter
+from urllib.parse import urlparse  # Import urlparse to key buckets by domain
+
+from common.block_detect import BLOCK_DETECTOR, PageBlocked, detect_block  # Import the block / CAPTCHA classifier
+from common.identities import current_identity, report_identity  # Import the identity of the current session
+from common.metrics import METRICS  # Import the hot-path timers and counters
+
+
+# ============================
+# 🟡 Class: Token Bucket
+# ============================
+class TokenBucket:
+    """
+    A token bucket for one domain: `rate` requests per second on average, bursts of up to `capacity`.
+    `blocked_until` pauses the bucket entirely after a block.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.strikes = 0  # Consecutive blocks, drives the exponential back-off
+
+    def reserve(self, now):
+        """ Takes a token if one is available; otherwise returns how long to wait (seconds). """
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if now < self.blocked_until:
+            return self.blocked_until - now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+
+# ============================
+# 🟡 Class: Per-Domain Rate Limiter
+# ============================
+class DomainRateLimiter:
+    """
+    Adaptive per-domain rate limiter (additive increase, multiplicative decrease).
+
+    Every fetch calls `acquire(url)` first. Healthy responses (`report_success`) raise the
+    domain's rate by `increase` up to `max_rate`; blocks (`report_block`: CAPTCHA pages,
+    HTTP 429/503, suspicious empty result pages) halve it and pause the domain for an
+    exponentially growing back-off. The result is the highest sustained rate a site tolerates.
+
+    A session using an identity with a proxy (common/identities.py) gets a bucket per domain
+    and proxy, so a block on one exit IP does not slow down the others; every outcome is also
+    credited to the identity's health score.
+
+    Args:
+        rate (float): Starting requests per second for a new domain.
+        burst (int): Bucket capacity (requests allowed back to back).
+        min_rate (float): Lowest rate after repeated blocks.
+        max_rate (float): Highest rate reached while healthy.
+        increase (float): Rate added per healthy response.
+        base_backoff (float): Pause after the first block, in seconds; doubles per consecutive block.
+        max_backoff (float): Upper bound of the pause.
+        jitter (float): Random extra wait (fraction of the wait) to avoid a robotic rhythm.
+        domain_rates (dict): Per-domain starting rates overriding `rate`, e.g. {"linkedin.com": 0.2}.
+    """
+
+    def __init__(self, rate=1.0, burst=2, min_rate=0.05, max_rate=5.0, increase=0.05,
+                 base_backoff=10.0, max_backoff=600.0, jitter=0.2, domain_rates=None):
+        self.rate = rate
+        self.burst = burst
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.jitter = jitter
+        self.domain_rates = domain_rates or {}
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def domain(url):
+        """ Returns the bucket key for a URL ('www.' is ignored). """
+        host = urlparse(url).netloc.lower()
+        return host[4:] if host.startswith("www.") else host
+
+    def _bucket(self, url):
+        domain = self.domain(url)
+        identity = current_identity()
+        key = f"{domain}@{identity.proxy}" if identity is not None and identity.proxy else domain
+        if key not in self._buckets:
+            rate = next((value for suffix, value in self.domain_rates.items() if domain.endswith(suffix)), self.rate)
+            self._buckets[key] = TokenBucket(rate, self.burst)
+        return self._buckets[key]
+
+    def _reserve(self, url, waited):
+        """ Takes a slot for `url`, or returns the (jittered) seconds to sleep before trying again. """
+        with self._lock:
+            wait_for = self._bucket(url).reserve(time.monotonic())
+        if wait_for <= 0:
+            if waited:
+                METRICS.observe("rate_limit", waited, domain=self.domain(url))
+            return 0.0
+        return wait_for * (1 + random.uniform(0, self.jitter))
+
+    def acquire(self, url):
+        """ Blocks until a request to `url`'s domain is allowed. Returns the seconds waited. """
+        waited = 0.0
+        while wait_for := self._reserve(url, waited):
+            time.sleep(wait_for)
+            waited += wait_for
+        return waited
+
+    async def acquire_async(self, url):
+        """ Like `acquire`, but sleeps with asyncio so the event loop keeps serving other requests. """
+        waited = 0.0
+        while wait_for := self._reserve(url, waited):
+            await asyncio.sleep(wait_for)
+            waited += wait_for
+        return waited
+
+    def report_success(self, url):
+        """ Records a healthy response: clears the strikes and nudges the rate up. """
+        with self._lock:
+            bucket = self._bucket(url)
+            bucket.strikes = 0
+            bucket.rate = min(self.max_rate, bucket.rate + self.increase)
+        report_identity(True)
+
+    def report_block(self, url, reason="blocked"):
+        """ Records a block: halves the rate and pauses the domain with exponential back-off. """
+        with self._lock:
+            bucket = self._bucket(url)
+            bucket.strikes += 1
+            bucket.rate = max(self.min_rate, bucket.rate / 2)
+            pause = min(self.max_backoff, self.base_backoff * 2 ** (bucket.strikes - 1))
+            bucket.blocked_until = time.monotonic() + pause
+            bucket.tokens = 0
+        identity = current_identity()
+        METRICS.count("blocks", domain=self.domain(url))
+        METRICS.log("block", domain=self.domain(url), reason=reason, backoff=pause,
+                    identity=identity.name if identity is not None else None)
+        via = f" via {identity.name}" if identity is not None else ""
+        print(f"🐢 {self.domain(url)}{via} {reason}: backing off {pause:.0f}s, rate now {bucket.rate:.2f}/s")
+        report_identity(False, reason)
+
+    def classify(self, url, status=None, text=None, title=None, empty=False):
+        """
+        Classifies a response or rendered page with the site's block signatures
+        (common/block_detect.py) and reports it: robot checks, login walls, consent pages and
+        HTTP 403/429/503/999 back the domain off; anything else counts as healthy. A page that
+        came back `empty` without a known "no results" marker is treated as a silent block.
+
+        Returns:
+            Verdict | None: The verdict (None for a normal page).
+        """
+        verdict = detect_block(url, status=status, text=text, title=title)
+        if verdict is None and empty:
+            verdict = BLOCK_DETECTOR.verdict("suspect_empty", BLOCK_DETECTOR.site_of(url), "no results and no known marker")
+        if verdict is not None and verdict.blocked:
+            self.report_block(url, f"{verdict.kind} ({verdict.reason})")
+        else:
+            self.report_success(url)
+        return verdict
+
+    def report_response(self, url, status=None, text=None, empty=False, title=None):
+        """
+        Classifies a response and reports it (see `classify`).
+
+        Returns:
+            bool: True if the response looked healthy (an empty result with a "no results" marker included).
+        """
+        verdict = self.classify(url, status=status, text=text, title=title, empty=empty)
+        return verdict is None or not verdict.blocked
+
+    def check_page(self, url, status=None, text=None, title=None, empty=False):
+        """
+        Like `classify`, but raises PageBlocked on a block, so a task is abandoned (and retried
+        later by the scheduler) instead of being scraped as an empty page.
+
+        Returns:
+            Verdict | None: None, or the "empty_result" verdict of a genuinely empty results page.
+        """
+        verdict = self.classify(url, status=status, text=text, title=title, empty=empty)
+        if verdict is not None and verdict.blocked:
+            raise PageBlocked(verdict)
+        return verdict
+
+    def current_rate(self, url):
+        """ Returns the domain's current requests-per-second rate. """
+        with self._lock:
+            return self._bucket(url).rate
+
+
+RATE_LIMITER = DomainRateLimiter(domain_rates={"linkedin.com": 0.2, "google.com": 0.5})  # Process-wide limiter
@@ -0,0 +1,312 @@
+import os  # Import os to size the worker pool
+import json  # Import json to key tasks in a shared frontier
+import time  # Import time for retry back-off
+import heapq  # Import heapq for the priority queue of pending tasks
+import itertools  # Import itertools for a tie-breaking task counter
+import multiprocessing.util  # Import multiprocessing.util to close worker resources on exit
+from collections import Counter  # Import Counter to track running tasks per site
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait  # Import the process pool
+
+from common.block_detect import PageBlocked  # Import the early block / CAPTCHA signal of a handler
+from common.metrics import METRICS  # Import the hot-path timers and counters
+from common.changes import open_delta_sink  # Import the incremental (changes only) output
+from common.dedup import DedupIndex  # Import the seen-item index
+from common.frontier import node_path  # Import the per-node output names
+from common.sinks import open_sink  # Import the streaming output sinks
+
+
+# ============================
+# 🟡 Per-Process Worker Resources
+# ============================
+_WORKER_RESOURCES = {}  # Resource name -> object, one set per worker process
+
+
+def _close_worker_resources():
+    """ Quits browsers / closes HTTP sessions created in this worker process. """
+    for resource in _WORKER_RESOURCES.values():
+        try:
+            (getattr(resource, "quit", None) or resource.close)()
+        except Exception as e:
+            print(f"⚠️ Error closing worker resource: {e}")
+    _WORKER_RESOURCES.clear()
+
+
+def worker_resource(name, factory):
+    """
+    Returns this process's instance of a resource (a WebDriver, an HttpClient, ...),
+    creating it with `factory()` on first use. Each worker process therefore keeps its own
+    browser or HTTP session across all the tasks it runs, closed when the process exits.
+
+    Args:
+        name (str): Resource key, e.g. "driver" or "http".
+        factory: Zero-argument callable creating the resource.
+    """
+    if name not in _WORKER_RESOURCES:
+        if not _WORKER_RESOURCES:
+            multiprocessing.util.Finalize(None, _close_worker_resources, exitpriority=10)
+        _WORKER_RESOURCES[name] = factory()
+    return _WORKER_RESOURCES[name]
+
+
+def _start_worker():
+    """ Process pool initializer: a forked worker starts with empty metrics, not a copy of the parent's. """
+    METRICS.drain()
+
+
+NODE_FIELDS = ("output", "profile", "warm", "cookies", "priority", "identities")  # Per-node settings, not part of what a task is
+
+
+def task_key(task):
+    """ Returns a task's frontier key, the same on every node whatever its local settings. """
+    return json.dumps({name: value for name, value in task.items() if name not in NODE_FIELDS}, sort_keys=True)
+
+
+def _run_task(handler, task):
+    """ Runs a handler in a worker process and ships the worker's metrics back with its records. """
+    start = time.perf_counter()
+    records = handler(task)  # A failure is counted by the parent, which also decides on the retry
+    METRICS.observe("task", time.perf_counter() - start, site=task["site"])
+    return records, METRICS.drain()
+
+
+# ============================
+# 🟡 Class: Job Scheduler
+# ============================
+class Scheduler:
+    """
+    Fans (site, query, params) tasks out across worker processes.
+
+    Tasks are dicts with at least a "site" key; the handler registered for that site is
+    called with the task in a worker process and returns a list of records. Records are
+    written to the sink named by the task's "output" (opened lazily, one per file).
+
+    - priorities: lower `priority` runs first, ties in submission order
+    - per-site caps: at most `site_limits[site]` tasks of a site run at once
+    - retries: a task whose handler raises is retried up to `max_retries` times,
+      waiting `backoff * 2 ** attempt` seconds between attempts
+    - blocks: a handler raising PageBlocked (a robot check, login wall or consent page, see
+      `common.block_detect`) also pauses every task of that site for `block_pause` seconds,
+      doubling while the site keeps answering with blocks, so the other workers stop hitting it
+    - dedup: with a `dedup_field`, every output only gets the first record of each item,
+      keyed by that link field (`DedupIndex.unique`, the same as the single-process scrapers),
+      however many pages and workers the item showed up in
+    - incremental: outputs only get new, changed and removed records (see `common.changes`);
+      removals are only written when no task failed
+    - frontier: tasks are queued in a shared `common.frontier` instead of in this process, so
+      schedulers on several hosts split one crawl; each leases tasks as it has free workers,
+      acknowledges them once stored, gives failed ones back with the back-off delay (the
+      frontier's `max_attempts` then bounds retries) and runs until the frontier is drained
+
+    Handlers must be module-level functions so they can be sent to the worker processes.
+
+    Args:
+        handlers (dict): Site -> handler(task) returning a list of records.
+        workers (int): Number of worker processes (defaults to the CPU count).
+        site_limits (dict): Site -> maximum concurrent tasks for that site.
+        max_retries (int): Retries per task after the first failure.
+        backoff (float): Base retry delay in seconds.
+        incremental (bool): Write each output as a delta against the last run.
+        frontier (Frontier): Shared task queue (see `open_frontier`); None keeps tasks in this process.
+        node (str): Name of this node, added to output file names so nodes on one host do not collide.
+        block_pause (float): Seconds a site's tasks wait after one of them hit a block page.
+        dedup_field (str): Record field holding the item link to canonicalize and dedup on (None keeps every record).
+    """
+
+    MAX_BLOCK_PAUSE = 600.0  # Upper bound of a site's pause after repeated blocks
+
+    def __init__(self, handlers, workers=None, site_limits=None, max_retries=3, backoff=2.0, incremental=False,
+                 frontier=None, node=None, block_pause=30.0, dedup_field=None):
+        self.handlers = handlers
+        self.workers = workers or os.cpu_count() or 1
+        self.site_limits = site_limits or {}
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.incremental = incremental
+        self.frontier = frontier
+        self.node = node
+        self.block_pause = block_pause
+        self.dedup_field = dedup_field
+        self._paused_until = {}  # Site -> time.monotonic() its tasks may start again after a block
+        self._block_strikes = Counter()  # Site -> consecutive blocked tasks
+        self._leases = {}  # Task seq -> frontier Lease of a running task
+        self._held = []  # Leases waiting for their site's cap
+        self._last_heartbeat = time.monotonic()
+        self._queue = []  # Heap of (priority, not_before, seq, attempt, task)
+        self._seq = itertools.count()
+        self._sinks = {}
+        self._seen = {}  # Output -> DedupIndex of the items written to it
+        self.stats = Counter()
+
+    def submit(self, task, priority=0):
+        """ Queues a task; `priority` lower runs earlier. """
+        if task["site"] not in self.handlers:
+            raise ValueError(f"No handler registered for site '{task['site']}'")
+        if self.frontier is not None:
+            self.frontier.put([task], priority=priority, keys=[task_key(task)])  # Ignored if a node already queued it
+            return
+        heapq.heappush(self._queue, (priority, 0.0, next(self._seq), 0, task))
+
+    def submit_many(self, tasks, priority=0):
+        for task in tasks:
+            self.submit(task, priority=task.get("priority", priority))
+
+    def _next_ready(self, running_per_site):
+        """ Pops the best task that is due and whose site has a free slot, or None. """
+        if self.frontier is not None:
+            return self._lease_ready(running_per_site)
+        now = time.monotonic()
+        skipped = []
+        entry = None
+        while self._queue:
+            candidate = heapq.heappop(self._queue)
+            _, not_before, _, _, task = candidate
+            limit = self.site_limits.get(task["site"])
+            if (not_before > now or self._paused_until.get(task["site"], 0.0) > now
+                    or (limit is not None and running_per_site[task["site"]] >= limit)):
+                skipped.append(candidate)
+                continue
+            entry = candidate
+            break
+        for candidate in skipped:
+            heapq.heappush(self._queue, candidate)
+        return entry
+
+    def _lease_ready(self, running_per_site):
+        """ Frontier mode: a held or newly leased task whose site has a free slot, as a queue entry, or None. """
+        now = time.monotonic()
+        candidates = list(self._held)
+        if len(self._held) < self.workers:
+            candidates += self.frontier.lease(1)
+        for lease in candidates:
+            limit = self.site_limits.get(lease.item["site"])
+            if (self._paused_until.get(lease.item["site"], 0.0) > now
+                    or (limit is not None and running_per_site[lease.item["site"]] >= limit)):
+                if lease not in self._held:
+                    self._held.append(lease)  # Kept leased (and alive) until the site has a slot
+                continue
+            if lease in self._held:
+                self._held.remove(lease)
+            seq = next(self._seq)
+            self._leases[seq] = lease
+            return (0, 0.0, seq, lease.attempts - 1, lease.item)
+        return None
+
+    def _heartbeat(self):
+        """ Frontier mode: extends the leases of running and held tasks before they time out. """
+        now = time.monotonic()
+        if now - self._last_heartbeat < self.frontier.visibility_timeout / 3:
+            return
+        self._last_heartbeat = now
+        for lease in list(self._leases.values()) + self._held:
+            self.frontier.extend(lease)
+
+    def _pending(self):
+        """ True while tasks are left to start (here, or anywhere in a shared frontier). """
+        if self.frontier is not None:
+            return bool(self._held) or not self.frontier.drained()
+        return bool(self._queue)
+
+    def _store(self, task, records):
+        """ Writes a task's records to its output; returns the records actually written. """
+        output = task.get("output")
+        if not output or not records:
+            return records
+        output = node_path(output, self.node)
+        if output not in self._sinks:
+            self._sinks[output] = open_delta_sink(output) if self.incremental else open_sink(output, overwrite=True)
+            self._seen[output] = DedupIndex()
+        if self.dedup_field:
+            records = self._seen[output].unique(records, self.dedup_field)
+        self._sinks[output].write_many(records)
+        return records
+
+    def _pause_site(self, site, blocked):
+        """ Holds back a site's tasks after one of them hit a block page (PageBlocked `blocked`). """
+        self._block_strikes[site] += 1
+        pause = min(self.MAX_BLOCK_PAUSE, self.block_pause * 2 ** (self._block_strikes[site] - 1))
+        self._paused_until[site] = time.monotonic() + pause
+        self.stats["blocked"] += 1
+        METRICS.count("blocked_tasks", site=site, kind=blocked.verdict.kind)
+        print(f"⛔ {site} task hit a block page ({blocked}): pausing {site} tasks for {pause:.0f}s")
+
+    def _retry_or_fail(self, entry, error):
+        priority, _, seq, attempt, task = entry
+        if self.frontier is not None:
+            delay = self.backoff * 2 ** attempt
+            if self.frontier.nack(self._leases.pop(seq), delay=delay):
+                print(f"🔁 Returned {task['site']} task to the frontier (retry in {delay:.0f}s) after error: {error}")
+                self.stats["retried"] += 1
+                METRICS.count("retries", site=task["site"])
+            else:
+                print(f"❌ Giving up on {task['site']} task {task}: {error}")
+                self.stats["failed"] += 1
+                METRICS.count("failed_tasks", site=task["site"])
+            return
+        if attempt < self.max_retries:
+            delay = self.backoff * 2 ** attempt
+            print(f"🔁 Retrying {task['site']} task in {delay:.0f}s after error: {error}")
+            heapq.heappush(self._queue, (priority, time.monotonic() + delay, seq, attempt + 1, task))
+            self.stats["retried"] += 1
+            METRICS.count("retries", site=task["site"])
+        else:
+            print(f"❌ Giving up on {task['site']} task {task}: {error}")
+            self.stats["failed"] += 1
+            METRICS.count("failed_tasks", site=task["site"])
+
+    def run(self):
+        """
+        Runs every queued task to completion and closes the output sinks.
+
+        Returns:
+            Counter: Totals for "completed", "failed", "retried", "blocked" and "records".
+        """
+        running = {}  # Future -> queue entry
+        running_per_site = Counter()
+        complete = False
+        try:
+            with ProcessPoolExecutor(max_workers=self.workers, initializer=_start_worker) as pool:
+                while self._pending() or running:
+                    while len(running) < self.workers:
+                        entry = self._next_ready(running_per_site)
+                        if entry is None:
+                            break
+                        task = entry[4]
+                        running[pool.submit(_run_task, self.handlers[task["site"]], task)] = entry
+                        running_per_site[task["site"]] += 1
+
+                    if self.frontier is not None:
+                        self._heartbeat()
+                    if not running:
+                        time.sleep(0.1)  # Everything left is waiting for its retry back-off (or on other nodes)
+                        continue
+
+                    done, _ = wait(running, timeout=0.5, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        entry = running.pop(future)
+                        task = entry[4]
+                        running_per_site[task["site"]] -= 1
+                        try:
+                            records, worker_metrics = future.result()
+                        except Exception as e:
+                            METRICS.count("errors", stage="task", site=task["site"])
+                            if isinstance(e, PageBlocked):
+                                self._pause_site(task["site"], e)
+                            self._retry_or_fail(entry, e)
+                            continue
+                        self._block_strikes[task["site"]] = 0
+                        METRICS.merge(worker_metrics)  # One set of metrics for the whole run
+                        records = self._store(task, records or [])
+                        if self.frontier is not None:
+                            self.frontier.ack(self._leases.pop(entry[2]))  # Stored: no node runs it again
+                        self.stats["completed"] += 1
+                        self.stats["records"] += len(records)
+            # A failed page's items would look removed, and a node of a shared crawl only sees its share
+            complete = not self.stats["failed"] and self.frontier is None
+        finally:
+            for sink in self._sinks.values():
+                if self.incremental:
+                    sink.close(complete=complete)
+                else:
+                    sink.close()
+        print(f"✅ Scheduler finished: {dict(self.stats)}")
+        return self.stats
@@ -0,0 +1,59 @@
+from urllib.parse import urlencode, quote_plus, urlparse, urlunparse, parse_qs, parse_qsl  # Import URL helpers to build and parse search URLs
+
+
+# ============================
+# 🟡 Search URL Templates
+# ============================
+# Site -> (base URL, {job field: query parameter}). Fields missing from a job are left out.
+SEARCH_URLS = {
+    "amazon": ("https://www.amazon.com/s", {"query": "k", "page": "page"}),
+    "ebay": ("https://www.ebay.com/sch/i.html", {"query": "_nkw", "page": "_pgn"}),
+    "yelp": ("https://www.yelp.co.uk/search", {"query": "find_desc", "location": "find_loc", "start": "start"}),
+    "linkedin": ("https://www.linkedin.com/search/results/people/", {"query": "keywords", "page": "page"}),
+}
+
+
+# ============================
+# 🟡 Function: Build a Search URL
+# ============================
+def build_search_url(site, **params):
+    """
+    Builds a site's search results URL directly, so no one has to type into the search box.
+    The inverse of parsing the query out of the URL (see `get_query_param`).
+
+    Args:
+        site (str): One of SEARCH_URLS, or "google_maps" / "instagram".
+        **params: Job fields such as query, location, page, start or profile.
+
+    Returns:
+        str: The search (or profile) URL.
+
+    Example:
+        build_search_url("yelp", query="pizza", location="London", start=11)
+    """
+    if site == "google_maps":
+        return f"https://www.google.com/maps/search/{quote_plus(params['query'])}"
+    if site == "instagram":
+        return f"https://www.instagram.com/{params['profile']}/"
+    if site not in SEARCH_URLS:
+        raise ValueError(f"Unknown site '{site}'")
+
+    base_url, names = SEARCH_URLS[site]
+    query = {names[field]: value for field, value in params.items() if field in names and value is not None}
+    return f"{base_url}?{urlencode(query)}"
+
+
+# ============================
+# 🟡 Function: Read a Query Parameter
+# ============================
+def get_query_param(url, name, default=""):
+    """ Returns the first value of query parameter `name` in `url` (e.g. Yelp's 'find_desc'). """
+    return parse_qs(urlparse(url).query).get(name, [default])[0]
+
+
+def with_query_param(url, name, value):
+    """ Returns `url` with query parameter `name` set to `value`, e.g. another results page (`page=3`). """
+    parts = urlparse(url)
+    query = [(key, current) for key, current in parse_qsl(parts.query, keep_blank_values=True) if key != name]
+    query.append((name, str(value)))
+    return urlunparse(parts._replace(query=urlencode(query)))
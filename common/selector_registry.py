@@ -0,0 +1,217 @@
+import os  # Import os to locate the registry file
+import json  # Import json to load the registry
+import threading  # Import threading so worker threads can share the hit counters
+from cssselect import HTMLTranslator  # Import the CSS-to-XPath translator
+from lxml import etree  # Import etree for compiled XPath objects
+
+from common.html_parser import is_xpath, node_value, parse_html  # Import the shared selector and node helpers
+from common.js_extract import EXTRACT_FALLBACK_SCRIPT  # Import the in-page extraction script with fallbacks
+from common.metrics import METRICS  # Import the hot-path timers and counters
+
+
+REGISTRY_PATH = os.environ.get(  # Selector registry; point SCRAPER_SELECTORS at a copy to try new selectors
+    "SCRAPER_SELECTORS", os.path.join(os.path.dirname(os.path.abspath(__file__)), "selectors.json")
+)
+
+_CSS = HTMLTranslator()
+
+
+# ============================
+# 🟡 Class: Compiled Selector
+# ============================
+class CompiledSelector:
+    """
+    One registry selector, compiled once: CSS is translated to XPath and the XPath compiled
+    to an lxml `etree.XPath`, so pages only pay for evaluation.
+
+    Args:
+        source (str): Selector as written in the registry (XPath or CSS).
+    """
+
+    def __init__(self, source):
+        self.source = source
+        self.xpath = source if is_xpath(source) else _CSS.css_to_xpath(source)  # Also what the browser evaluates
+        self._compiled = etree.XPath(self.xpath)
+
+    def __call__(self, node):
+        return self._compiled(node)
+
+    def __repr__(self):
+        return f"CompiledSelector({self.source!r})"
+
+
+# ============================
+# 🟡 Class: Selector Set
+# ============================
+class SelectorSet:
+    """
+    The selectors of one page type (e.g. eBay search results): a container selector matching
+    each result card and the fields read relative to it, each with an ordered list of fallbacks.
+    The first selector that yields a non-empty value wins, and every hit is counted per
+    selector, so a fallback taking over shows that the site's markup changed.
+
+    Args:
+        name (str): "<site>.<page>", used in messages.
+        container (list[str]): Container selectors, tried in order until one matches.
+        fields (dict): Field name -> {"selectors": [...], "attribute": None or an attribute name}.
+        required (iterable): Fields that must be present; cards missing one are skipped.
+        wait (list[str]): Selectors that mean the page is ready (default: the container's).
+    """
+
+    def __init__(self, name, container, fields, required=(), wait=None):
+        self.name = name
+        self.container = [CompiledSelector(source) for source in container]
+        self.fields = {
+            field: ([CompiledSelector(source) for source in spec["selectors"]], spec.get("attribute"))
+            for field, spec in fields.items()
+        }
+        self.required = tuple(required)
+        wait_selectors = [CompiledSelector(source) for source in wait] if wait else self.container
+        self.xpath = "(" + " | ".join(selector.xpath for selector in wait_selectors) + ")"  # Any of them, for waits
+        self._js_fields = {
+            field: [[selector.xpath for selector in selectors], attribute]
+            for field, (selectors, attribute) in self.fields.items()
+        }
+        self._lock = threading.Lock()
+        self.hits = {"container": [0] * len(self.container)}
+        self.hits.update({field: [0] * len(selectors) for field, (selectors, _) in self.fields.items()})
+        self.misses = dict.fromkeys(self.hits, 0)
+        self._reported = set()  # Fallbacks already announced
+
+    def _record(self, part, index):
+        with self._lock:
+            if index < 0:
+                self.misses[part] += 1
+                return
+            self.hits[part][index] += 1
+            announce = index > 0 and (part, index) not in self._reported
+            self._reported.add((part, index))
+        if announce:
+            sources = self.container if part == "container" else self.fields[part][0]
+            print(f"🧩 {self.name} {part}: fallback #{index} matched ({sources[index].source}); the primary selector may be outdated.")
+
+    def _finish(self, values, default):
+        """ Applies `required` / `default` to one card's raw values (None = no selector hit). """
+        if any(values[field] is None for field in self.required):
+            return None
+        return {field: (value if value is not None else default) for field, value in values.items()}
+
+    # ----- Static HTML (lxml) -----
+
+    def cards(self, root):
+        """ Returns the container nodes of the first container selector that matches anything. """
+        for index, selector in enumerate(self.container):
+            nodes = selector(root)
+            if nodes:
+                self._record("container", index)
+                return nodes
+        self._record("container", -1)
+        return []
+
+    def read(self, node, field, base_url=None):
+        """ Returns the value of `field` relative to `node` from its first fallback that yields one, or None. """
+        selectors, attribute = self.fields[field]
+        for index, selector in enumerate(selectors):
+            for match in selector(node)[:1]:
+                value = match.strip() if isinstance(match, str) else node_value(match, attribute, base_url)
+                if value:
+                    self._record(field, index)
+                    return value
+        self._record(field, -1)
+        return None
+
+    def extract(self, root, base_url=None, default="N/A"):
+        """
+        Extracts one record per card from a parsed page (see `common.html_parser.parse_html`).
+
+        Returns:
+            list[dict]: Records, empty if no container selector matched.
+        """
+        records = []
+        with METRICS.span("extract", selectors=self.name, engine="lxml"):
+            for card in self.cards(root):
+                record = self._finish({field: self.read(card, field, base_url) for field in self.fields}, default)
+                if record is not None:
+                    records.append(record)
+        return records
+
+    def fetch(self, client, url):
+        """
+        Lightweight fetch: downloads `url` over plain HTTP and extracts records from the static markup.
+
+        Returns:
+            tuple | None: (records, root), or None (rather than an empty list) when the request failed
+            or no card was found, which tells callers to fall back to the browser.
+        """
+        text = client.get_text(url)
+        if not text:
+            return None
+        root = parse_html(text, base_url=url)
+        records = self.extract(root, base_url=url)
+        if not records:
+            return None
+        return records, root
+
+    # ----- Live page (Selenium) -----
+
+    def extract_js(self, driver, default="N/A"):
+        """ Extracts one record per card from the browser's current page in a single `execute_script` call. """
+        with METRICS.span("extract", selectors=self.name, engine="browser"):
+            result = driver.execute_script(EXTRACT_FALLBACK_SCRIPT, [selector.xpath for selector in self.container],
+                                           self._js_fields) or {}
+        self._record("container", result.get("container", -1))
+        records = []
+        for raw in result.get("records", []):
+            values = {}
+            for field, (value, index) in raw.items():
+                self._record(field, index)
+                values[field] = value
+            record = self._finish(values, default)
+            if record is not None:
+                records.append(record)
+        return records
+
+    def summary(self):
+        """ Returns the hit count of every selector and the misses, per part. """
+        with self._lock:
+            summary = {}
+            for part, counts in self.hits.items():
+                sources = self.container if part == "container" else self.fields[part][0]
+                summary[part] = {selector.source: count for selector, count in zip(sources, counts) if count}
+                if self.misses[part]:
+                    summary[part]["miss"] = self.misses[part]
+            return summary
+
+
+# ============================
+# 🟡 Class: Selector Registry
+# ============================
+class SelectorRegistry:
+    """
+    Every site's selector sets, compiled once when loaded. When a site's markup changes, update
+    `selectors.json` (or a copy named by SCRAPER_SELECTORS) instead of the scraper code.
+
+    Example:
+        SELECTORS["ebay", "search"].extract(root, base_url=url)
+    """
+
+    def __init__(self, spec):
+        self.sets = {
+            (site, page): SelectorSet(f"{site}.{page}", **page_spec)
+            for site, pages in spec.items() for page, page_spec in pages.items()
+        }
+
+    @classmethod
+    def load(cls, path=REGISTRY_PATH):
+        with open(path, encoding="utf-8") as file:
+            return cls(json.load(file))
+
+    def __getitem__(self, key):
+        return self.sets[key]
+
+    def summary(self):
+        """ Returns the selector hits of every page type that was used. """
+        return {selectors.name: stats for selectors in self.sets.values() if any((stats := selectors.summary()).values())}
+
+
+SELECTORS = SelectorRegistry.load()  # Loaded and compiled once per process
@@ -0,0 +1,242 @@
+import os  # Import os for fsync and file checks
+import csv  # Import csv for the append-only CSV writer
+import json  # Import json for the JSON Lines writer
+import sqlite3  # Import sqlite3 for the SQLite writer
+import threading  # Import threading so worker threads can share one sink
+
+from common.metrics import METRICS  # Import the hot-path timers and counters
+
+
+# ============================
+# 🟡 Class: Base Output Sink
+# ============================
+class Sink:
+    """
+    Base class for streaming output sinks.
+
+    Records are buffered and flushed every `batch_size` writes, so memory stays constant
+    and everything extracted before a crash is already on disk. Sinks are thread-safe
+    and usable as context managers (closing flushes the remaining buffer).
+
+    Args:
+        path (str): Output file.
+        batch_size (int): Number of records buffered before a flush.
+        fsync (bool): fsync the file after every flush (durable, but slower).
+        overwrite (bool): Start a fresh file instead of appending to an existing one.
+    """
+
+    def __init__(self, path, batch_size=100, fsync=False, overwrite=False):
+        if overwrite and os.path.exists(path):
+            os.remove(path)
+        self.path = path
+        self.batch_size = batch_size
+        self.fsync = fsync
+        self.count = 0  # Records written so far
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._closed = False
+
+    def write(self, record):
+        """ Buffers one record (a dict) and flushes when the batch is full. """
+        with self._lock:
+            self._buffer.append(record)
+            self.count += 1
+            if len(self._buffer) >= self.batch_size:
+                self._flush_locked()
+
+    def write_many(self, records):
+        """ Buffers several records. """
+        for record in records:
+            self.write(record)
+
+    def flush(self):
+        """ Writes any buffered records to disk. """
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._buffer:
+            return
+        batch, self._buffer = self._buffer, []
+        with METRICS.span("sink_write", sink=type(self).__name__):
+            self._write_batch(batch)
+        METRICS.count("records_written", len(batch))
+
+    def _write_batch(self, batch):
+        raise NotImplementedError
+
+    def _sync(self, file):
+        """ Pushes a file's buffers to the OS and, if requested, to the disk. """
+        file.flush()
+        if self.fsync:
+            os.fsync(file.fileno())
+
+    def close(self):
+        """ Flushes the buffer and releases the underlying file. """
+        with self._lock:
+            if self._closed:
+                return
+            self._flush_locked()
+            self._close()
+            self._closed = True
+
+    def _close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# ============================
+# 🟡 Class: CSV Sink
+# ============================
+class CsvSink(Sink):
+    """
+    Append-only CSV writer. Columns come from the existing header, or the first record
+    for a new file; keys not in the header are ignored and missing ones left empty.
+    """
+
+    def __init__(self, path, batch_size=100, fsync=False, overwrite=False, fieldnames=None):
+        super().__init__(path, batch_size, fsync, overwrite)
+        self.fieldnames = fieldnames
+        exists = os.path.exists(path) and os.path.getsize(path) > 0
+        if exists and self.fieldnames is None:
+            with open(path, newline="", encoding="utf-8") as file:
+                self.fieldnames = next(csv.reader(file), None)
+        self._needs_header = not exists
+        self._file = open(path, "a", newline="", encoding="utf-8")
+        self._writer = None
+
+    def _write_batch(self, batch):
+        if self._writer is None:
+            self.fieldnames = self.fieldnames or list(batch[0].keys())
+            self._writer = csv.DictWriter(self._file, fieldnames=self.fieldnames, extrasaction="ignore")
+            if self._needs_header:
+                self._writer.writeheader()
+        self._writer.writerows(batch)
+        self._sync(self._file)
+
+    def _close(self):
+        self._file.close()
+
+
+# ============================
+# 🟡 Class: JSON Lines Sink
+# ============================
+class JsonLinesSink(Sink):
+    """ Append-only JSON Lines writer: one JSON object per line. """
+
+    def __init__(self, path, batch_size=100, fsync=False, overwrite=False):
+        super().__init__(path, batch_size, fsync, overwrite)
+        self._file = open(path, "a", encoding="utf-8")
+
+    def _write_batch(self, batch):
+        self._file.writelines(json.dumps(record, ensure_ascii=False, default=str) + "\n" for record in batch)
+        self._sync(self._file)
+
+    def _close(self):
+        self._file.close()
+
+
+# ============================
+# 🟡 Class: Parquet Sink
+# ============================
+class ParquetSink(Sink):
+    """
+    Parquet writer that emits one row group per batch (requires `pyarrow`).
+    The schema is inferred from the first batch. Unlike the other sinks the file is
+    only readable once closed, since the Parquet footer is written last, and it cannot
+    be appended to (an existing file is always replaced).
+    """
+
+    def __init__(self, path, batch_size=10000, fsync=False, overwrite=True):
+        super().__init__(path, batch_size, fsync, overwrite)
+        try:
+            import pyarrow  # Imported lazily so the other sinks work without pyarrow
+            import pyarrow.parquet
+        except ImportError as e:
+            raise ImportError("ParquetSink requires pyarrow: pip install pyarrow") from e
+        self._pa = pyarrow
+        self._writer = None
+
+    def _write_batch(self, batch):
+        if self._writer is None:
+            table = self._pa.Table.from_pylist(batch)
+            self._writer = self._pa.parquet.ParquetWriter(self.path, table.schema)
+        else:
+            table = self._pa.Table.from_pylist(batch, schema=self._writer.schema)
+        self._writer.write_table(table)
+
+    def _close(self):
+        if self._writer is not None:
+            self._writer.close()
+            if self.fsync:
+                with open(self.path, "rb") as file:
+                    os.fsync(file.fileno())
+
+
+# ============================
+# 🟡 Class: SQLite Sink
+# ============================
+class SqliteSink(Sink):
+    """
+    Inserts records into a SQLite table (created from the first record's keys, all TEXT).
+    When appending to an existing table its columns are kept, like the CSV header.
+    Each flush is one transaction; `fsync` maps to `PRAGMA synchronous=FULL`.
+    """
+
+    def __init__(self, path, batch_size=500, fsync=False, overwrite=False, table="records"):
+        super().__init__(path, batch_size, fsync, overwrite)
+        self.table = table
+        self.columns = None
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(f"PRAGMA synchronous={'FULL' if fsync else 'NORMAL'}")
+
+    def _write_batch(self, batch):
+        if self.columns is None:
+            existing = [row[1] for row in self._conn.execute(f'PRAGMA table_info("{self.table}")')]
+            self.columns = existing or list(batch[0].keys())
+            if not existing:
+                column_defs = ", ".join(f'"{column}" TEXT' for column in self.columns)
+                self._conn.execute(f'CREATE TABLE "{self.table}" ({column_defs})')
+        placeholders = ", ".join("?" for _ in self.columns)
+        column_names = ", ".join(f'"{column}"' for column in self.columns)
+        rows = [tuple(record.get(column) for column in self.columns) for record in batch]
+        with self._conn:
+            self._conn.executemany(f'INSERT INTO "{self.table}" ({column_names}) VALUES ({placeholders})', rows)
+
+    def _close(self):
+        self._conn.close()
+
+
+# ============================
+# 🟡 Function: Open a Sink by File Extension
+# ============================
+SINKS = {
+    ".csv": CsvSink,
+    ".jsonl": JsonLinesSink,
+    ".parquet": ParquetSink,
+    ".db": SqliteSink,
+    ".sqlite": SqliteSink,
+}
+
+
+def open_sink(path, **kwargs):
+    """
+    Opens the sink matching `path`'s extension (.csv, .jsonl, .parquet, .db/.sqlite).
+
+    Args:
+        path (str): Output file.
+        **kwargs: Forwarded to the sink (batch_size, fsync, ...).
+
+    Returns:
+        Sink: The opened sink.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in SINKS:
+        raise ValueError(f"Unsupported output format '{extension}' (use one of {', '.join(SINKS)})")
+    return SINKS[extension](path, **kwargs)
@@ -0,0 +1,217 @@
+import time  # Import time for polling and measuring waits
+import threading  # Import threading to guard the shared wait statistics
+from collections import defaultdict  # Import defaultdict to group wait timings by name
+
+from common.block_detect import PROBE_SCRIPT, PageBlocked, detect_block  # Import the early block / empty page check
+from common.js_extract import QUERY_HELPERS  # Reuse the XPath/CSS query helpers in page scripts
+from common.metrics import METRICS  # Import the hot-path timers and counters
+
+
+POLL_INTERVAL = 0.1  # Seconds between readiness checks
+
+
+# ============================
+# 🟡 Class: Wait Statistics
+# ============================
+class WaitStats:
+    """
+    Records how long each adaptive wait actually took and whether the page became ready
+    before the upper bound, so fixed sleeps can be compared against real readiness.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._timings = defaultdict(list)  # Wait name -> list of (seconds, ready)
+
+    def record(self, name, seconds, ready):
+        with self._lock:
+            self._timings[name].append((seconds, ready))
+        METRICS.observe("wait", seconds, wait=name)
+        if not ready:
+            METRICS.count("wait_timeouts", wait=name)
+
+    def summary(self):
+        """ Returns {wait name: {count, total, mean, max, timeouts}} for every wait seen so far. """
+        with self._lock:
+            summary = {}
+            for name, timings in self._timings.items():
+                durations = [seconds for seconds, _ in timings]
+                summary[name] = {
+                    "count": len(durations),
+                    "total": round(sum(durations), 3),
+                    "mean": round(sum(durations) / len(durations), 3),
+                    "max": round(max(durations), 3),
+                    "timeouts": sum(1 for _, ready in timings if not ready),
+                }
+            return summary
+
+    def reset(self):
+        with self._lock:
+            self._timings.clear()
+
+
+WAIT_STATS = WaitStats()  # Process-wide recorder used by all waits below
+
+
+# ============================
+# 🟡 Helper Function: Poll Until Ready
+# ============================
+def poll_until(check, timeout, name, interval=POLL_INTERVAL):
+    """
+    Calls `check()` until it returns a truthy value or `timeout` seconds pass. A check may
+    raise PageBlocked to end the wait at once (recorded as not ready, then re-raised).
+
+    Args:
+        check: Zero-argument callable; exceptions count as "not ready yet".
+        timeout (float): Upper bound in seconds.
+        name (str): Label under which the elapsed time is recorded in WAIT_STATS.
+        interval (float): Seconds between checks.
+
+    Returns:
+        bool: True if the condition was met, False if the upper bound was hit.
+    """
+    start = time.monotonic()
+    deadline = start + timeout
+    ready = False
+    while True:
+        try:
+            ready = bool(check())
+        except PageBlocked:
+            WAIT_STATS.record(name, time.monotonic() - start, False)
+            raise
+        except Exception:
+            ready = False
+        if ready or time.monotonic() >= deadline:
+            break
+        time.sleep(interval)
+    WAIT_STATS.record(name, time.monotonic() - start, ready)
+    return ready
+
+
+# ============================
+# 🟡 Function: Wait for Selector
+# ============================
+SELECTOR_PROBE_SCRIPT = QUERY_HELPERS + "const selector = arguments[0];" + PROBE_SCRIPT
+
+
+def page_verdict(probe):
+    """ Classifies a PROBE_SCRIPT result that is not `true`: a Verdict for a block or empty result page, else None. """
+    if not probe or probe is True:
+        return None
+    url, title, text = probe
+    return detect_block(url, text=text, title=title)
+
+
+def wait_for_selector(driver, selector, timeout=10, detect_blocks=True):
+    """
+    Waits until at least one node matches `selector` (XPath or CSS).
+
+    With `detect_blocks`, every poll also checks the URL, title and markup against the
+    site's block signatures (common/block_detect.py), and returns False as soon as the page is
+    a robot check, login wall, consent page or empty result instead of waiting out `timeout`.
+    The caller's usual "not loaded" handling (e.g. `RATE_LIMITER.report_response`) then applies.
+    """
+    def check():
+        probe = driver.execute_script(SELECTOR_PROBE_SCRIPT, selector)
+        verdict = page_verdict(probe) if detect_blocks else None
+        if verdict is not None:
+            raise PageBlocked(verdict)
+        return probe is True
+
+    try:
+        return poll_until(check, timeout, "selector")
+    except PageBlocked as e:
+        METRICS.count("early_exits", site=e.verdict.site, kind=e.verdict.kind)
+        print(f"⛔ Not waiting for {selector}: {e}")
+        return False
+
+
+# ============================
+# 🟡 Function: Wait for DOM Quiescence
+# ============================
+DOM_QUIET_SCRIPT = """
+if (!window.__scraperMutations) {
+    window.__scraperMutations = {last: performance.now()};
+    new MutationObserver(() => { window.__scraperMutations.last = performance.now(); })
+        .observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+}
+return performance.now() - window.__scraperMutations.last;
+"""
+
+
+def wait_for_dom_quiet(driver, quiet=0.5, timeout=5):
+    """
+    Waits until the DOM has not changed for `quiet` seconds.
+    A MutationObserver installed on first use timestamps every change.
+    """
+    return poll_until(lambda: driver.execute_script(DOM_QUIET_SCRIPT) >= quiet * 1000, timeout, "dom_quiet")
+
+
+# ============================
+# 🟡 Function: Wait for Network Idle
+# ============================
+NETWORK_IDLE_SCRIPT = """
+const entries = performance.getEntriesByType('resource');
+const lastEnd = entries.reduce((latest, entry) => Math.max(latest, entry.responseEnd), 0);
+return {
+    loaded: document.readyState !== 'loading',
+    count: entries.length,
+    idleFor: performance.now() - lastEnd,
+};
+"""
+
+
+def wait_for_network_idle(driver, idle=0.5, timeout=10):
+    """
+    Waits until the document is parsed and no resource has finished loading for `idle` seconds.
+    Uses the Resource Timing buffer, so no browser-level network hooks are needed.
+    """
+    def check():
+        state = driver.execute_script(NETWORK_IDLE_SCRIPT)
+        return state["loaded"] and state["idleFor"] >= idle * 1000
+
+    return poll_until(check, timeout, "network_idle")
+
+
+# ============================
+# 🟡 Function: Wait for Node Count to Settle
+# ============================
+def count_nodes(driver, selector):
+    """ Returns the number of nodes matching `selector` (XPath or CSS). """
+    script = QUERY_HELPERS + "return queryAll(document, arguments[0]).length;"
+    return driver.execute_script(script, selector)
+
+
+def wait_for_count_stable(driver, selector, previous=0, settle=0.5, timeout=5):
+    """
+    Waits until more than `previous` nodes match `selector` and the count stops growing
+    for `settle` seconds (e.g. after a scroll triggers lazy loading).
+
+    Returns:
+        bool: True once the count grew and settled, False if the upper bound was hit.
+    """
+    state = {"count": previous, "changed": time.monotonic()}
+
+    def check():
+        count = count_nodes(driver, selector)
+        now = time.monotonic()
+        if count != state["count"]:
+            state["count"], state["changed"] = count, now
+            return False
+        return count > previous and now - state["changed"] >= settle
+
+    return poll_until(check, timeout, "count_stable")
+
+
+# ============================
+# 🟡 Function: Wait for a New Page
+# ============================
+def mark_page(driver):
+    """ Tags the current document so `wait_for_new_page` can tell when it has been replaced. """
+    driver.execute_script("window.__scraperPageMark = true;")
+
+
+def wait_for_new_page(driver, timeout=10):
+    """ Waits until the document tagged by `mark_page` is gone and the new one is parsed. """
+    script = "return !window.__scraperPageMark && document.readyState !== 'loading';"
+    return poll_until(lambda: driver.execute_script(script), timeout, "new_page")
@@ -1,76 +1,66 @@
-import time   # Import time module for delays
-import json   # Import JSON module for handling cookies
-import random  # Import random module to select user agents
-import asyncio  # Import asyncio for async execution
-import nest_asyncio  # Import nest_asyncio to allow nested async loops
-from selenium import webdriver  # Import Selenium WebDriver
+import sys    # Import sys to extend the module search path
+import functools  # Import functools to bind setup_driver options for the pool
 from selenium.webdriver.common.by import By  # Import By class for locating elements
-from selenium.webdriver.chrome.service import Service  # Import Service for ChromeDriver
-from selenium.webdriver.chrome.options import Options  # Import Options to configure WebDriver
 from selenium.webdriver.support.ui import WebDriverWait   # Import WebDriverWait for explicit waits
 from selenium.webdriver.support import expected_conditions as EC  # Import expected_conditions for conditions
-import pandas as pd  # Import pandas for handling and saving extracted data
+from pathlib import Path  # Import Path to locate the shared `common` package
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))  # Make the shared `common` package importable
+from common.checkpoint import open_checkpoint  # Import the resumable crawl checkpoint
+from common.cli import build_parser  # Import the shared command-line options
+from common.cookies import read_cookies, restore_session, save_cookies  # Import the shared cookie jar helpers
+from common.identities import cookie_jar, load_identities  # Import the rotating browser identities
+from common.dedup import DedupIndex  # Import the seen-item index
+from common.driver_factory import browser_data_dir, create_driver  # Import the shared WebDriver factory
+from common.driver_pool import DriverPool  # Import the shared WebDriver pool
+from common.frontier import frontier_from_args  # Import the shared multi-node frontier
+from common.jobs import job_path, jobs_from_args  # Import the batch-mode job helpers
+from common.metrics import METRICS, configure_metrics, profile_run  # Import the hot-path instrumentation
+from common.rate_limit import RATE_LIMITER  # Import the shared per-domain rate limiter (and block detection)
+from common.scheduler import Scheduler, worker_resource  # Import the multi-process job scheduler
+from common.search_urls import build_search_url  # Import the search URL builder
+from common.http_client import HttpClient  # Import the pooled HTTP client for the lightweight mode
+from common.selector_registry import SELECTORS  # Import the compiled per-site selector registry
+from common.changes import mark_complete, open_output  # Import the full / incremental (changes only) output
+from common.waits import WAIT_STATS, mark_page, wait_for_dom_quiet, wait_for_new_page, wait_for_selector  # Import the adaptive wait layer
 
 
 # ============================
-# 🟡 Helper Function: Setup WebDriver
+# 🟡 Selectors: Search Results
 # ============================
-def setup_driver():
-    """
-    Initializes and configures Selenium WebDriver with performance optimizations.
-    """
-    user_agents = [  # List of user agents to avoid detection
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
-        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)",
-        "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:94.0)",
-    ]
-    
-    chrome_options = Options()  # Create Chrome options object
-     # Running in headless mode for efficiency (Uncomment if needed)
-    # chrome_options.add_argument('--headless')  # Run browser in headless mode
-    chrome_options.add_argument('--disable-blink-features=AutomationControlled') # Bypass automation detection
-    chrome_options.add_argument(f'--user-agent={random.choice(user_agents)}')  # Randomize user-agent
-    chrome_options.add_argument('--start-maximized') # Open browser in maximized mode
-    chrome_options.add_argument('--disable-gpu')  # Disable GPU acceleration for stability
-    chrome_options.add_argument('--log-level=3')  # Suppress unnecessary logs
-    chrome_options.add_argument('--ignore-certificate-errors')  # Ignore SSL errors
-    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])  # Disable automation flags
-    
-    chrome_service = Service(executable_path="C:/Users/parni/OneDrive/Desktop/ebayScraper/ebay_scraper/chromedriver-win64/chromedriver.exe")
-    driver = webdriver.Chrome(service=chrome_service, options=chrome_options) # Initialize WebDriver with options
-    return driver   # Return the configured WebDriver instance
+PRODUCT_CARDS = SELECTORS["ebay", "search"]  # Product cards: Title, Price, URL (fallbacks in common/selectors.json)
+NEXT_PAGE = SELECTORS["ebay", "next_page"]  # The "next page" link
 
 
+CHROMEDRIVER_PATH = "C:/Users/parni/OneDrive/Desktop/ebayScraper/ebay_scraper/chromedriver-win64/chromedriver.exe"  # Local ChromeDriver executable
+
 
 # ============================
-# 🟡 Function: Save & Load Cookies
+# 🟡 Helper Function: Setup WebDriver
 # ============================
-def save_cookies(driver, filename="cookies.json"):
-    """ Saves cookies to a JSON file. """
-    with open(filename, "w") as file:
-        json.dump(driver.get_cookies(), file)
-    print("✅ Cookies saved.")
+def setup_driver(headless=False, profile="full", warm=False, snapshot=True, identity=None):
+    """
+    Initializes Selenium WebDriver through the shared driver factory.
+    Pass `headless=True` for unattended batch runs, or `profile="lean"` for a small headless
+    browser that uses eager page loads and skips images, fonts, media, ads and analytics.
+    With `warm=True` the session starts from the persistent "ebay" browser profile (a private
+    copy of it unless `snapshot=False`) and attaches to the long-lived chromedriver service.
+    An `identity` (common/identities.py) sets the session's user agent, proxy, window and language.
+    """
+    user_data_dir = browser_data_dir("ebay", snapshot=snapshot) if warm else None
+    return create_driver(profile=profile, headless=headless, driver_path=CHROMEDRIVER_PATH,
+                         user_data_dir=user_data_dir, reuse_service=warm, identity=identity)
 
-def load_cookies(driver, filename="cookies.json"):
-    """ Loads cookies from a JSON file. """
-    try:
-        with open(filename, "r") as file:
-            cookies = json.load(file)
-            for cookie in cookies:
-                driver.add_cookie(cookie)
-        print("✅ Cookies loaded.")
-    except FileNotFoundError:
-        print("⚠️ No cookies found. Proceeding without loading cookies.")
 
 
 # ============================
 # 🟡 Function: Scroll Down Page
 # ============================
 def scroll_down(driver, scroll_times=3, delay=1):
-    """ Scrolls down the page to load more products dynamically. """
+    """ Scrolls down the page to load more products dynamically; `delay` is the maximum wait per scroll. """
     for _ in range(scroll_times):
         driver.execute_script("window.scrollBy(0, 700);")
-        time.sleep(delay)
+        wait_for_dom_quiet(driver, quiet=0.3, timeout=delay)  # Continue as soon as new content settles
 
 
 
@@ -83,63 +73,180 @@ def extract_products_from_page(driver):
     """
     product_data = []  # Initialize an empty list to store product data
     try:
-        # Locate all product items on the page
-        products = driver.find_elements(By.XPATH, '//li[contains(@class, "brwrvr__item-card brwrvr__item-card--gallery")]')
-        for product in products:  # Iterate through each product element
-            try:
-                # Extract product title, price, and URL
-                title_element = product.find_element(By.XPATH, './/h3[contains(@class, "textual-display bsig__title__text")]')
-                price_element = product.find_element(By.XPATH, './/span[contains(@class, "textual-display bsig__price bsig__price--displayprice")]')
-                link_element = product.find_element(By.XPATH, './/a[contains(@class, "bsig__title__wrapper")]')
-
-                
-                title = title_element.text.strip() if title_element else "N/A"   # Get title text
-                price = price_element.text.strip() if price_element else "N/A"   # Get price text
-                url = link_element.get_attribute('href') if link_element else "N/A"   # Get product UR
-                
-                product_data.append({"Title": title, "Price": price, "URL": url})  # Store extracted data
-                print(f"📦 Extracted: {title} | {price}")  # Print extracted product info
-            except Exception as e:
-                print(f"⚠️ Error extracting product data: {e}")  # Handle extraction errors
+        # Extract title, price and URL of every product card in a single in-page script call
+        product_data = PRODUCT_CARDS.extract_js(driver)
+        for product in product_data:
+            print(f"📦 Extracted: {product['Title']} | {product['Price']}")  # Print extracted product info
     except Exception as e:
         print(f"❌ Error extracting products from page: {e}")  # Handle overall extraction errors
     return product_data  # Return extracted product data
 
 
+# ============================
+# 🟡 Function: Extract Products Without a Browser
+# ============================
+def extract_products_lightweight(client, url):
+    """
+    Fetches a search results page over plain HTTP and extracts products from the static markup.
+
+    Returns:
+        tuple | None: (products, next_page_url) or None if the page needs Selenium.
+    """
+    result = PRODUCT_CARDS.fetch(client, url)
+    if result is None:
+        return None
+    products, root = result
+    next_links = NEXT_PAGE.extract(root, base_url=url)
+    next_url = next_links[0]["URL"] if next_links else None
+    return products, next_url
+
+
 # ============================
 # 🟡 Function: Extract All Product Data Across Pages
 # ============================
-def extract_all_products(driver, max_pages=2):
+def extract_all_products(driver, max_pages=2, client=None, sink=None, checkpoint=None, seen=None):
     """
     Extracts product data across multiple pages.
+    When an `HttpClient` is given, each page is first tried in lightweight mode (plain HTTP);
+    the browser is only used for pages whose static HTML lacks the product cards.
+    When a `sink` is given, products are written to it page by page instead of being
+    collected in the returned list.
+    With a `checkpoint`, the next page number and URL are saved after every page, and
+    extraction starts from the saved page if there is one.
+    Item URLs are reduced to `/itm/<item ID>` and repeated items dropped; pass a persistent
+    `DedupIndex` as `seen` to also drop items stored by earlier runs.
+    An incremental `sink` is marked complete (see `mark_complete`) only when the last results
+    page was reached, not when `max_pages` or a block page ended the crawl.
     """
-    all_data = []  # Initialize list to store all product data
+    all_data = []  # Initialize list to store all product data (unused with a sink)
+    total = 0  # Number of products extracted so far
+
+    seen = DedupIndex() if seen is None else seen  # Items already stored (this run, or earlier ones too)
+
+    def store(products):
+        nonlocal total
+        products = seen.unique(products)  # Tracking-free item URLs, sponsored / repeated items dropped
+        total += len(products)
+        if sink is not None:
+            sink.write_many(products)  # Stream the page to disk as soon as it is extracted
+        else:
+            all_data.extend(products)
+
+    def save_progress(next_page, next_url):
+        if checkpoint is not None:
+            if sink is not None:
+                sink.flush()  # Products must be on disk before the cursor moves past their page
+            checkpoint.set_cursor("ebay_page", {"page": next_page, "url": next_url})
+
+    cursor = checkpoint.get_cursor("ebay_page") if checkpoint is not None else None
+    if cursor:
+        start_page, page_url = cursor["page"], cursor["url"]  # Continue where the last run stopped
+        if not page_url:
+            print("✅ Previous crawl already reached the last page.")
+            return all_data
+        print(f"🔁 Resuming from page {start_page}")
+    else:
+        start_page, page_url = 1, driver.current_url  # Search results URL the user landed on
     
-    for page in range(1, max_pages + 1):   # Loop through the specified number of pages
+    for page in range(start_page, max_pages + 1):   # Loop through the specified number of pages
         print(f"📄 Scraping page {page}...")  # Indicate the current page being scraped
 
+        lightweight = extract_products_lightweight(client, page_url) if client and page_url else None
+        if lightweight is not None:
+            products, page_url = lightweight
+            print(f"⚡ Page {page} extracted without the browser")
+            store(products)
+            save_progress(page + 1, page_url)
+            if not page_url:
+                print("❌ No more pages.")
+                mark_complete(sink)
+                break
+            continue
+
+        if page_url and driver.current_url != page_url:
+            RATE_LIMITER.acquire(page_url)  # Wait for eBay's next request slot
+            driver.get(page_url)  # Bring the browser to the page the HTTP path could not handle
+
         products = extract_products_from_page(driver)  # Extract products from the current page
         print(f"🔍 Found {len(products)} products on page {page}")  # Display the number of products found
         
         if products:
-            all_data.extend(products)  # Add extracted products to the main list
+            store(products)  # Add extracted products to the output
         else:
-            print("⚠️ No products found, stopping extraction.")   # Stop extraction if no products found
+            # Past page 1 an empty page is the end of the results, unless it is a known block page
+            verdict = RATE_LIMITER.classify(driver.current_url, text=driver.page_source, title=driver.title, empty=page == 1)
+            if verdict is not None and verdict.blocked:
+                print(f"⚠️ No products found ({verdict.kind}), stopping extraction.")   # Stop extraction on a block
+            else:
+                print("❌ No more pages.")
+                mark_complete(sink)  # A genuine "no results" page
             break
 
+        next_buttons = driver.find_elements(By.XPATH, NEXT_PAGE.xpath)  # Locate the next page button
+        if not next_buttons:
+            print("❌ No more pages.")
+            save_progress(page + 1, None)
+            mark_complete(sink)
+            break
         try:
-            next_button = driver.find_element(By.CSS_SELECTOR, "a.pagination__next")  # Locate the next page button
+            next_button = next_buttons[0]
+            mark_page(driver)  # Tag the current page so we can tell when it is replaced
             driver.execute_script("arguments[0].click();", next_button)  # Click the next page button
-            time.sleep(3)  # Ensure the next page loads
+            wait_for_new_page(driver, timeout=10)  # Wait for the next page to replace this one
+            wait_for_selector(driver, PRODUCT_CARDS.xpath, timeout=3)  # Then for its product cards
+            page_url = driver.current_url
+            save_progress(page + 1, page_url)
         except Exception as e:
-            print(f"❌ No more pages or error: {e}")  # Handle pagination errors
+            print(f"❌ Error loading the next page: {e}")  # Handle pagination errors
+            save_progress(page + 1, None)
             break  # Stop if no more pages are available
     
-    print(f"✅ Extracted {len(all_data)} products in total.")
+    print(f"✅ Extracted {total} products in total.")
     return all_data  # Return all extracted product data
 
 
 
+# ============================
+# 🟡 Function: Page-Level Tasks for the Scheduler
+# ============================
+def page_tasks(job):
+    """ Splits a batch job into one independent task per results page (`_pgn=`). """
+    output = job_path(job, "ebay_products.csv")
+    return [dict(job, site="ebay", page=page, output=output) for page in range(1, (job.get("max_pages") or 2) + 1)]
+
+
+def scrape_page_task(task):
+    """
+    Scheduler handler: extracts one results page in a worker process, over plain HTTP when
+    possible and otherwise with the worker's own headless browser (started with an identity
+    from the task's `identities` file, if any; a blocked session is replaced). Both use the
+    task's `cookies` jar, like the single-process run.
+    """
+    url = build_search_url("ebay", query=task["query"], page=task["page"])
+    client = worker_resource("http", HttpClient)
+    client.add_cookies(read_cookies(task.get("cookies")))  # The saved session / consent (--cookies), if any
+    lightweight = extract_products_lightweight(client, url)
+    if lightweight is not None:
+        return lightweight[0]
+    factory = functools.partial(setup_driver, headless=True, profile=task.get("profile", "lean"), warm=task.get("warm", False))
+    pool = worker_resource("drivers", lambda: DriverPool(factory, size=1, max_pages=0,
+                                                         identities=load_identities(task.get("identities"))))
+    with pool.session() as driver:
+        cookies = cookie_jar(task.get("cookies"))  # The identity's own jar, if it has one
+        if cookies:
+            restore_session(driver, "https://www.ebay.com/", cookies)  # Reuse a saved session / consent
+        RATE_LIMITER.acquire(url)  # Paced per proxy when the session has an identity with one
+        driver.get(url)
+        wait_for_selector(driver, PRODUCT_CARDS.xpath, timeout=10)  # Ends early on a robot check or "no exact matches"
+        products = extract_products_from_page(driver)
+        # Raises PageBlocked on a robot check, so the scheduler retries the page later instead of storing nothing;
+        # an empty page past the first one is the end of the results
+        RATE_LIMITER.check_page(driver.current_url, text=None if products else driver.page_source,
+                                title=None if products else driver.title, empty=not products and task["page"] == 1)
+    return products
+
+
+
 # ============================
 # 🟡 Function: Search on eBay
 # ============================
@@ -164,30 +271,83 @@ def search_ebay(driver):
 # ============================
 # 🟡 Main Function
 # ============================
-def main():
-    """ Main function to scrape eBay data. """
-    driver = setup_driver()  # Initialize WebDriver
-    driver.get("https://www.ebay.com/")  # Open eBay website
-    
-    input("🔹 Perform a search on eBay and press Enter when ready...")   # Wait for user to perform a search
+def main(resume=False, job=None, headless=False, cookies=None, profile="full", warm=False, seen_index=None,
+         incremental=False, identities=None):
+    """
+    Main function to scrape eBay data. With `resume`, continues from the last saved page.
 
-    # Extract product data from current page and possibly multiple pages
-    all_products = extract_all_products(driver, max_pages=2) # Extract products from eBay
-    
-    # Save data to DataFrame and CSV
-    df = pd.DataFrame(all_products)  # Convert extracted data to DataFrame
-    df.to_csv("ebay_products.csv", index=False)  # Save data to CSV file
+    Args:
+        resume (bool): Continue the previous crawl from its checkpoint.
+        job (dict): Batch-mode job ({"query": ..., "max_pages": ...}); None asks the user to search.
+        headless (bool): Run Chrome without a window.
+        profile (str): Browser profile, "full" or "lean" (headless, no images / fonts / media / trackers).
+        warm (bool): Start from the persistent browser profile; interactive runs update it, batch runs use a copy.
+        cookies (str): Cookie jar to restore before searching (and to save after a manual search).
+        seen_index (str): Persistent dedup index file; items stored by earlier runs are skipped.
+        incremental (bool): Only write items that are new, changed or gone since the last crawl.
+        identities (IdentityPool): Identities to start the browser with; the session's own cookie jar wins over `cookies`.
+    """
+    if incremental and seen_index:
+        print("⚠️ --seen-index is ignored with --incremental (skipped items would look removed).")
+        seen_index = None
+    output = job_path(job, "ebay_products.csv")
+    checkpoint = open_checkpoint(job_path(job, "ebay_checkpoint.db"), resume=resume)  # Saved page number and URL
+    max_pages = (job or {}).get("max_pages") or 2
+    factory = functools.partial(setup_driver, headless=headless, profile=profile, warm=warm, snapshot=job is not None)
+    with checkpoint, DriverPool(factory, size=1, identities=identities) as pool, pool.session() as driver:  # Borrow a WebDriver session
+        cookies = cookie_jar(cookies)  # The identity's own jar, if it has one
+        if cookies:
+            restore_session(driver, "https://www.ebay.com/", cookies)  # Reuse a saved session / consent
+        
+        if checkpoint.get_cursor("ebay_page") is not None:
+            pass  # Resuming: the saved page URL is opened by extract_all_products
+        elif job is not None:
+            driver.get(build_search_url("ebay", query=job["query"]))  # Open the results directly
+        else:
+            driver.get("https://www.ebay.com/")  # Open eBay website
+            input("🔹 Perform a search on eBay and press Enter when ready...")   # Wait for user to perform a search
+            if cookies:
+                save_cookies(driver, cookies)
+
+        # Extract product data from current page and possibly multiple pages, writing each page as it is extracted
+        with HttpClient() as client, open_output(output, resume, incremental, fields=PRODUCT_CARDS.fields) as sink, \
+                DedupIndex(seen_index) as seen:
+            client.load_driver_cookies(driver)  # Share the browser's session with the HTTP fast path
+            extract_all_products(driver, max_pages=max_pages, client=client, sink=sink, checkpoint=checkpoint, seen=seen) # Extract products from eBay
     
-    driver.quit()
-    print(all_products)
-    print("✅ Scraping completed. Data saved to ebay_products.csv")  # Indicate completion
+    print(f"⏱️ Wait timings: {WAIT_STATS.summary()}")
+    print(f"🧩 Selector hits: {SELECTORS.summary()}")
+    print(f"✅ Scraping completed. Data saved to {output}")  # Indicate completion
 
 
 # ============================
 # 🚀 Execute Main Function
 # ============================
 
-nest_asyncio.apply()  # Allow nested async loops
-asyncio.run(main())   # Run the main function asynchronously
+if __name__ == "__main__":  # Guard so scheduler worker processes can import this file
+    args = build_parser("Scrape eBay search results.").parse_args()  # Parse command-line options
+    jobs = jobs_from_args(args, "ebay")  # Jobs from --jobs / --query (empty means interactive)
+    configure_metrics(args)  # --metrics-log / --metrics-file / --metrics-port
+    identities = load_identities(args.identities)  # Shared by every job, so a blocked identity stays benched
+    if jobs and (args.workers > 1 or args.frontier):
+        frontier = frontier_from_args(args, "ebay")  # Shared with the other nodes of the crawl, if any
+        scheduler = Scheduler({"ebay": scrape_page_task}, workers=args.workers, incremental=args.incremental,
+                              frontier=frontier, node=args.node, dedup_field="URL")  # Pages of every job run concurrently
+        for job in jobs:
+            scheduler.submit_many(page_tasks(dict(job, cookies=args.cookies, profile=args.profile, warm=args.warm,
+                                                  identities=args.identities)))
+        with profile_run(args.cprofile):  # Profiles the scheduling process; page tasks run in the workers
+            scheduler.run()
+        if frontier is not None:
+            frontier.close()
+    elif jobs:
+        for index, job in enumerate(jobs):  # Run every job unattended, one after another
+            with profile_run(args.cprofile if index == 0 else None), METRICS.span("job", site="ebay"):
+                main(resume=args.resume, job=job, headless=True, cookies=args.cookies, profile=args.profile, warm=args.warm,
+                     seen_index=args.seen_index, incremental=args.incremental, identities=identities)
+    else:
+        with profile_run(args.cprofile), METRICS.span("job", site="ebay"):
+            main(resume=args.resume, headless=args.headless, cookies=args.cookies, warm=args.warm, seen_index=args.seen_index,
+                 incremental=args.incremental, identities=identities)
 
 
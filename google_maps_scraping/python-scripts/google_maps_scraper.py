@@ -1,42 +1,68 @@
 
-import time   # Import time module for delays
+import sys    # Import sys to extend the module search path
+import functools  # Import functools to bind setup_driver options for the pool
+import itertools  # Import itertools to take the first N harvested places
 import json   # Import JSON module for handling cookies
-import random  # Import random module to select user agents
-import asyncio  # Import asyncio for async execution
-import nest_asyncio  # Import nest_asyncio to allow nested async loops
-from selenium import webdriver  # Import Selenium WebDriver
 from selenium.webdriver.common.by import By  # Import By class for locating elements
-from selenium.webdriver.chrome.service import Service  # Import Service for ChromeDriver
-from selenium.webdriver.chrome.options import Options  # Import Options to configure WebDriver
 from selenium.webdriver.support.ui import WebDriverWait   # Import WebDriverWait for explicit waits
 from selenium.webdriver.support import expected_conditions as EC  # Import expected_conditions for conditions
-import pandas as pd  # Import pandas for handling and saving extracted data
+from pathlib import Path  # Import Path to locate the shared `common` package
 
+sys.path.append(str(Path(__file__).resolve().parents[2]))  # Make the shared `common` package importable
+from common.canonical import canonical_key  # Import the place identity helper
+from common.checkpoint import open_checkpoint  # Import the resumable crawl checkpoint
+from common.block_detect import PageBlocked, detect_block  # Import the block / consent page classifier
+from common.cli import build_parser  # Import the shared command-line options
+from common.cookies import restore_session, save_cookies  # Import the shared cookie jar helpers
+from common.identities import cookie_jar, load_identities  # Import the rotating browser identities
+from common.driver_factory import browser_data_dir, create_driver  # Import the shared WebDriver factory
+from common.driver_pool import DriverPool  # Import the shared WebDriver pool
+from common.frontier import frontier_from_args  # Import the shared multi-node frontier
+from common.jobs import job_path, jobs_from_args  # Import the batch-mode job helpers
+from common.metrics import METRICS, configure_metrics, profile_run  # Import the hot-path instrumentation
+from common.rate_limit import RATE_LIMITER  # Import the shared per-domain rate limiter
+from common.scheduler import Scheduler, worker_resource  # Import the multi-process job scheduler
+from common.search_urls import build_search_url  # Import the search URL builder
+from common.changes import mark_complete, open_output  # Import the full / incremental (changes only) output
+from common.waits import WAIT_STATS, wait_for_count_stable, wait_for_network_idle, wait_for_selector  # Import the adaptive wait layer
 
-def setup_driver():
+
+PLACE_XPATH = '//a[@class="hfpxzc"]'  # Result anchors in the search feed
+UNSEEN_PLACE_SELECTOR = 'a.hfpxzc:not([data-scraper-seen])'  # Anchors the harvester has not read yet
+
+# Reads only the anchors attached since the last call (they are tagged once read), then
+# scrolls the results feed itself (not document.body) and reports whether the list ended.
+HARVEST_SCRIPT = """
+const fresh = document.querySelectorAll('a.hfpxzc:not([data-scraper-seen])');
+const places = [];
+for (const anchor of fresh) {
+    anchor.setAttribute('data-scraper-seen', '1');
+    places.push({name: anchor.getAttribute('aria-label'), link: anchor.href});
+}
+const feed = document.querySelector('div[role="feed"]');
+const scroller = feed || document.scrollingElement;
+scroller.scrollTop = scroller.scrollHeight;
+const tail = feed && feed.lastElementChild ? feed.lastElementChild.textContent : '';
+const atEnd = !!document.querySelector('span.HlvSq') || /end of the list/i.test(tail);
+return {places: places, atEnd: atEnd};
+"""
+
+
+CHROMEDRIVER_PATH = "C:/Users/parni/OneDrive/Desktop/GoogleMap/chromedriver-win64/chromedriver.exe"  # Local ChromeDriver executable
+
+
+def setup_driver(headless=False, profile="full", warm=False, snapshot=True, identity=None):
     """
-    Initializes and configures Selenium WebDriver with performance optimizations.
+    Initializes Selenium WebDriver through the shared driver factory.
+    Pass `headless=True` for unattended batch runs, or `profile="lean"` for a small headless
+    browser that uses eager page loads and skips images, fonts, media, ads and analytics.
+    With `warm=True` the session starts from the persistent "google_maps" browser profile (a private
+    copy of it unless `snapshot=False`) and attaches to the long-lived chromedriver service.
+    An `identity` (common/identities.py) sets the session's user agent, proxy, window and language.
     """
-    user_agents = [  # List of user agents to avoid detection
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
-        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)",
-        "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:94.0)",
-    ]
-    
-    chrome_options = Options()  # Create Chrome options object
-     # Running in headless mode for efficiency (Uncomment if needed)
-    # chrome_options.add_argument('--headless')  # Run browser in headless mode
-    chrome_options.add_argument('--disable-blink-features=AutomationControlled') # Bypass automation detection
-    chrome_options.add_argument(f'--user-agent={random.choice(user_agents)}')  # Randomize user-agent
-    chrome_options.add_argument('--start-maximized') # Open browser in maximized mode
-    chrome_options.add_argument('--disable-gpu')  # Disable GPU acceleration for stability
-    chrome_options.add_argument('--log-level=3')  # Suppress unnecessary logs
-    chrome_options.add_argument('--ignore-certificate-errors')  # Ignore SSL errors
-    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])  # Disable automation flags
-    
-    chrome_service = Service(executable_path="C:/Users/parni/OneDrive/Desktop/GoogleMap/chromedriver-win64/chromedriver.exe")
-    driver = webdriver.Chrome(service=chrome_service, options=chrome_options) # Initialize WebDriver with options
-    return driver   # Return the configured WebDriver instance
+    user_data_dir = browser_data_dir("google_maps", snapshot=snapshot) if warm else None
+    return create_driver(profile=profile, headless=headless, driver_path=CHROMEDRIVER_PATH,
+                         user_data_dir=user_data_dir, reuse_service=warm, identity=identity)
 
 
 
@@ -44,7 +70,7 @@ def open_google_maps(driver):
     """Open Google Maps website and wait for user interaction."""
     driver.get("https://www.google.com/maps")
     input("Solve CAPTCHA or accept cookies, then press Enter to continue...")
-    time.sleep(3)
+    wait_for_network_idle(driver, timeout=3)
 
     
 
@@ -63,71 +89,203 @@ def search_location(driver, query):
         # Wait for the user to press Enter
         input("Press Enter to continue...")
 
-        # Allow time for the page to load after the user presses Enter
-        time.sleep(5)
+        # Wait for the results to load after the user presses Enter (at most 5 seconds)
+        wait_for_count_stable(driver, PLACE_XPATH, timeout=5)
     
     except Exception as e:
         print("Error searching location:", e)
 
 
 
+def harvest_places(driver, max_idle_scrolls=3, scroll_timeout=3, seen_links=None):
+    """
+    Streams (name, link) tuples from the results feed as it is scrolled.
+
+    Each round reads only the anchors attached since the previous round, so total work stays
+    linear in the number of places. Places are deduplicated by place ID (`canonical_key`), so
+    the same place reached through different links counts once, and harvesting stops at
+    the end of the list or after `max_idle_scrolls` scrolls that produced nothing new.
+    `seen_links` can be a persistent set of keys (e.g. `Checkpoint.visited`) to skip places a previous
+    run already harvested.
+    Every scroll loads another page of results from Google, so each one waits for the shared
+    per-domain rate limiter; landing on Google's "unusual traffic" or consent page makes it back off.
+    The generator returns True (its StopIteration value) only when the end of the list was reached.
+    """
+    seen_links = set() if seen_links is None else seen_links  # Place keys already yielded
+    idle_scrolls = 0
+
+    while True:
+        url = driver.current_url
+        verdict = detect_block(url, title=driver.title)  # Google's CAPTCHA interstitial or consent page
+        if verdict is not None and verdict.blocked:
+            RATE_LIMITER.report_block(url, f"{verdict.kind} ({verdict.reason})")
+            return
+        RATE_LIMITER.acquire(url)  # Wait for Google's next request slot
+        try:
+            batch = driver.execute_script(HARVEST_SCRIPT)
+        except Exception as e:
+            print("Error extracting data:", e)
+            return
+
+        new_places = 0
+        for place in batch["places"]:
+            link = place["link"]
+            if not link:
+                continue
+            key = canonical_key(link)
+            if key in seen_links:
+                continue
+            seen_links.add(key)
+            new_places += 1
+            yield place["name"], link
+        if new_places:
+            RATE_LIMITER.report_success(url)
+
+        if batch["atEnd"]:
+            print(f"Reached the end of the list after {len(seen_links)} places.")
+            return True
+
+        idle_scrolls = 0 if new_places else idle_scrolls + 1
+        if idle_scrolls >= max_idle_scrolls:
+            print(f"No new places after {idle_scrolls} scrolls, stopping at {len(seen_links)} places.")
+            return
+
+        print(f"Loaded {len(seen_links)} places, continuing to scroll...")
+        wait_for_selector(driver, UNSEEN_PLACE_SELECTOR, timeout=scroll_timeout)  # Wait until more places have loaded
+
+
+
 def extract_places(driver, num_places):
-    """Extract names and addresses of places from search results using XPath."""
-    results = []
-    
-    # Scroll down to load more places until the required number is reached
-    while len(results) < num_places:
-        places = driver.find_elements(By.XPATH, '//a[@class="hfpxzc"]')  # Find all the places using XPath
-        
-        for place in places:
-            try:
-                # Extract name (from aria-label attribute or text inside the <a> tag)
-                name = place.get_attribute("aria-label")  # The name is stored in the aria-label attribute
-                
-                # Extract the link (href) of the place
-                link = place.get_attribute("href")  # The link to the place
-
-                results.append((name, link))  # Add both name and link to results
-
-                if len(results) >= num_places:
-                    break  # Stop if we have enough places
-                
-            except Exception as e:
-                print("Error extracting data:", e)
-        
-        # Scroll to the bottom of the page to load more places
-        driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(3)  # Wait a bit longer for more places to load
-        
-        # Check if new places have been loaded
-        if len(results) < num_places:
-            print(f"Loaded {len(results)} places, continuing to scroll...")
+    """Extract names and links of up to `num_places` places from the search results feed."""
+    return list(itertools.islice(harvest_places(driver), num_places))
 
-    return results
 
 
+def open_search_results(driver, query):
+    """
+    Open the results feed for `query` directly, without typing into the search box.
+    Raises PageBlocked at once on a CAPTCHA or consent page; returns False when the search has no results.
+    """
+    url = build_search_url("google_maps", query=query)
+    RATE_LIMITER.acquire(url)
+    driver.get(url)
+    if not wait_for_selector(driver, PLACE_XPATH, timeout=10):  # Ends early on a CAPTCHA or consent page
+        RATE_LIMITER.check_page(driver.current_url, text=driver.page_source, title=driver.title, empty=True)
+        return False
+    wait_for_count_stable(driver, PLACE_XPATH, timeout=5)
+    return True
 
-def main():
-    """Main function to execute the scraper."""
-    driver = setup_driver()
-    open_google_maps(driver)
-    input("Press Enter after Google Maps is fully loaded...")
-    search_location(driver, "Restaurants in New York")
-    
-    # Ask the user how many places they want to extract
-    num_places = int(input("How many places would you like to extract? "))
-    
-    # Extract the places
-    results = extract_places(driver, num_places)
-    
-    # Display the extracted places
-    for name, address in results:
-        print(f"Name: {name}, Address: {address}")
+
+
+def scrape_job_task(task):
+    """
+    Scheduler handler: harvests one search in a worker process with the worker's own
+    headless browser (started with an identity from the task's `identities` file, if any; a
+    blocked session is replaced). The feed is a single infinite scroll, so a job is not split further.
+    """
+    factory = functools.partial(setup_driver, headless=True, profile=task.get("profile", "lean"), warm=task.get("warm", False))
+    pool = worker_resource("drivers", lambda: DriverPool(factory, size=1, max_pages=0,
+                                                         identities=load_identities(task.get("identities"))))
+    with pool.session() as driver:
+        cookies = cookie_jar(task.get("cookies"))  # The identity's own jar, if it has one
+        if cookies:
+            restore_session(driver, "https://www.google.com/maps", cookies)
+        if not open_search_results(driver, task["query"]):
+            return []
+        places = itertools.islice(harvest_places(driver), task.get("limit") or 20)
+        return [{"Name": name, "Link": link} for name, link in places]
+
+
+
+def main(resume=False, job=None, headless=False, cookies=None, profile="full", warm=False, incremental=False,
+         identities=None):
+    """
+    Main function to execute the scraper. With `resume`, places saved by the last run are skipped.
+    With a batch-mode `job` ({"query": ..., "limit": ...}) no input is asked for; `cookies`
+    is a cookie jar (e.g. with the consent choice) restored before searching, and `profile`
+    the browser profile ("full" or "lean"). With `warm`, the persistent Google Maps browser
+    profile is reused (interactive runs update it, batch runs start from a copy). With
+    `incremental`, only places that are new or gone since the last crawl are written.
+    With `identities` (an IdentityPool), the browser starts with a healthy identity, whose own
+    cookie jar wins over `cookies`.
+    """
+    output = job_path(job, "google_maps_places.csv")
+    checkpoint = open_checkpoint(job_path(job, "google_maps_checkpoint.db"), resume=resume)  # Harvested place URLs and count
+    factory = functools.partial(setup_driver, headless=headless, profile=profile, warm=warm, snapshot=job is not None)
+    with checkpoint, DriverPool(factory, size=1, identities=identities) as pool, pool.session() as driver:  # Borrow a WebDriver session
+        cookies = cookie_jar(cookies)  # The identity's own jar, if it has one
+        if cookies:
+            restore_session(driver, "https://www.google.com/maps", cookies)
+        
+        if job is not None:
+            try:
+                found = open_search_results(driver, job["query"])
+            except PageBlocked as e:  # Nothing to harvest; the limiter has already backed off
+                print(f"⛔ Skipping '{job['query']}': {e}")
+                return
+            if not found:
+                print(f"⚠️ No places found for '{job['query']}'.")
+                return
+            num_places = job.get("limit") or 20
+        else:
+            open_google_maps(driver)
+            input("Press Enter after Google Maps is fully loaded...")
+            if cookies:
+                save_cookies(driver, cookies)  # Keep the consent / CAPTCHA outcome for batch runs
+            search_location(driver, "Restaurants in New York")
+            
+            # Ask the user how many places they want to extract
+            num_places = int(input("How many places would you like to extract? "))
+        
+        harvested = checkpoint.get_cursor("maps_harvested", 0)
+        if harvested:
+            print(f"Resuming: {harvested} places already saved.")
+        
+        # Extract the places, writing each one to the CSV as soon as it is harvested
+        with open_output(output, resume, incremental, fields=["Name", "Link"], batch_size=1) as sink:
+            places = harvest_places(driver, seen_links=checkpoint.visited)
+            while harvested < num_places:
+                try:
+                    name, link = next(places)
+                except StopIteration as end:
+                    if end.value:
+                        mark_complete(sink)  # The whole list was harvested: unseen places are gone
+                    break
+                print(f"Name: {name}, Link: {link}")
+                sink.write({"Name": name, "Link": link})
+                harvested += 1
+                checkpoint.set_cursor("maps_harvested", harvested)
     
-    driver.quit()
+    print(f"Saved {sink.count} places to {output}")
+    print(f"Wait timings: {WAIT_STATS.summary()}")
 
 
 if __name__ == "__main__":
-    main()
+    parser = build_parser("Scrape places from a Google Maps search.")
+    parser.add_argument("--limit", type=int, help="number of places to extract per job (default 20)")
+    args = parser.parse_args()
+    jobs = jobs_from_args(args, "google_maps")  # Jobs from --jobs / --query (empty means interactive)
+    configure_metrics(args)  # --metrics-log / --metrics-file / --metrics-port
+    identities = load_identities(args.identities)  # Shared by every job, so a blocked identity stays benched
+    if jobs and (args.workers > 1 or args.frontier):
+        frontier = frontier_from_args(args, "google_maps")  # Shared with the other nodes of the crawl, if any
+        scheduler = Scheduler({"google_maps": scrape_job_task}, workers=args.workers, incremental=args.incremental,
+                              frontier=frontier, node=args.node)  # Searches run concurrently
+        for job in jobs:
+            scheduler.submit(dict(job, site="google_maps", cookies=args.cookies, profile=args.profile, warm=args.warm,
+                                  identities=args.identities, output=job_path(job, "google_maps_places.csv")))
+        with profile_run(args.cprofile):  # Profiles the scheduling process; searches run in the workers
+            scheduler.run()
+        if frontier is not None:
+            frontier.close()
+    elif jobs:
+        for index, job in enumerate(jobs):  # Run every job unattended, one after another
+            with profile_run(args.cprofile if index == 0 else None), METRICS.span("job", site="google_maps"):
+                main(resume=args.resume, job=job, headless=True, cookies=args.cookies, profile=args.profile, warm=args.warm,
+                     incremental=args.incremental, identities=identities)
+    else:
+        with profile_run(args.cprofile), METRICS.span("job", site="google_maps"):
+            main(resume=args.resume, headless=args.headless, cookies=args.cookies, warm=args.warm, incremental=args.incremental,
+                 identities=identities)
 
 
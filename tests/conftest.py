@@ -0,0 +1,14 @@
+import sys  # Import sys to extend the module search path
+from pathlib import Path  # Import Path to locate the repository root
+
+import pytest  # Import pytest for the shared fixtures
+
+sys.path.append(str(Path(__file__).resolve().parents[1]))  # Make `common` and `benchmarks` importable
+from benchmarks.fixture_server import FixtureServer  # Import the local mock site server
+
+
+@pytest.fixture
+def server():
+    """ The mock site on a free local port, with 3 results pages per paginated fixture. """
+    with FixtureServer(pages=3) as server:
+        yield server
@@ -0,0 +1,121 @@
+import pytest  # Import pytest to run every test against both backends
+
+from common.frontier import MemoryFrontier, SqliteFrontier  # Import the backends that must behave the same
+
+
+class FakeClock:
+    """ A clock the test moves forward by hand, so lease and delay deadlines need no sleeping. """
+
+    def __init__(self, now=1000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+def open_backend(backend, path, clock, **kwargs):
+    if backend == "memory":
+        return MemoryFrontier(clock=clock, **kwargs)
+    return SqliteFrontier(str(path / "frontier.db"), clock=clock, **kwargs)
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def frontier(request, tmp_path):
+    """ (frontier, clock): a backend with a 10 s visibility timeout and 2 attempts per item. """
+    clock = FakeClock()
+    with open_backend(request.param, tmp_path, clock, visibility_timeout=10, max_attempts=2) as frontier:
+        yield frontier, clock
+
+
+def test_put_ignores_items_seen_before(frontier):
+    frontier, _ = frontier
+    assert frontier.put([{"page": 1}, {"page": 2}]) == 2
+    assert frontier.put([{"page": 2}, {"page": 3}]) == 1
+    frontier.ack(frontier.lease()[0])
+    assert frontier.put([{"page": 1}]) == 0  # Done items stay known
+    assert frontier.counts() == {"queued": 2, "leased": 0, "done": 1, "failed": 0}
+
+
+def test_lease_hands_out_the_lowest_priority_first(frontier):
+    frontier, _ = frontier
+    frontier.put([{"page": 1}, {"page": 2}], priority=1)
+    frontier.put([{"product": "a"}], priority=0)
+    assert [lease.item for lease in frontier.lease(3)] == [{"product": "a"}, {"page": 1}, {"page": 2}]
+    assert frontier.lease() == []
+
+
+def test_expired_lease_is_handed_out_again(frontier):
+    frontier, clock = frontier
+    frontier.put([{"page": 1}])
+    first = frontier.lease()[0]
+    clock.advance(9)
+    assert frontier.lease() == []  # Still invisible to other workers
+    clock.advance(1)
+    second = frontier.lease()[0]
+    assert (second.item, second.attempts) == ({"page": 1}, 2)
+    assert not frontier.ack(first)  # The first lease was lost
+    assert frontier.ack(second)
+
+
+def test_extend_keeps_the_lease(frontier):
+    frontier, clock = frontier
+    frontier.put([{"page": 1}])
+    lease = frontier.lease()[0]
+    clock.advance(8)
+    assert frontier.extend(lease)
+    clock.advance(8)
+    assert frontier.lease() == []
+    assert frontier.ack(lease)
+
+
+def test_nack_delays_the_item(frontier):
+    frontier, clock = frontier
+    frontier.put([{"page": 1}])
+    assert frontier.nack(frontier.lease()[0], delay=5)
+    assert frontier.lease() == []
+    clock.advance(5)
+    assert frontier.lease()[0].item == {"page": 1}
+
+
+def test_item_fails_after_max_attempts(frontier):
+    frontier, clock = frontier
+    frontier.put([{"page": 1}, {"page": 2}])
+    first, second = frontier.lease(2)
+    assert frontier.nack(first)
+    assert not frontier.nack(frontier.lease()[0])  # Second attempt used up
+    clock.advance(10)  # The other lease expires on its second attempt...
+    frontier.nack(frontier.lease()[0])  # ...and fails like a nacked one
+    assert frontier.counts() == {"queued": 0, "leased": 0, "done": 0, "failed": 2}
+    assert frontier.drained()
+
+
+def scenario(frontier, clock):
+    """ Runs one mixed sequence of operations and returns everything the frontier answered. """
+    trace = [frontier.put([{"page": page} for page in range(1, 6)], priority=1), frontier.put(["https://www.ebay.com/itm/1"])]
+    leases = frontier.lease(3)
+    trace.append([(lease.item, lease.attempts) for lease in leases])
+    trace.append(frontier.ack(leases[0]))
+    trace.append(frontier.nack(leases[1], delay=3))
+    clock.advance(2)
+    trace.append([(lease.item, lease.attempts) for lease in frontier.lease(10)])
+    clock.advance(10)  # Every lease taken so far expires
+    trace.append([(lease.item, lease.attempts) for lease in frontier.lease(10)])
+    trace.append(frontier.nack(leases[2]))
+    trace.append(frontier.counts())
+    clock.advance(10)
+    trace.append([(lease.item, lease.attempts) for lease in frontier.lease(10)])
+    trace.append(frontier.counts())
+    trace.append(frontier.drained())
+    return trace
+
+
+def test_memory_and_sqlite_backends_agree(tmp_path):
+    traces = []
+    for backend in ("memory", "sqlite"):
+        clock = FakeClock()
+        with open_backend(backend, tmp_path, clock, visibility_timeout=10, max_attempts=2) as frontier:
+            traces.append(scenario(frontier, clock))
+    assert traces[0] == traces[1]
@@ -0,0 +1,53 @@
+from benchmarks.fixture_server import FixtureServer  # Import the mock site server (a banned one here)
+from common.http_client import HttpClient  # Import the pooled HTTP client under test
+from common.page_cache import PageCache  # Import the on-disk page cache
+from common.rate_limit import DomainRateLimiter  # Import the limiter that should back off on a block
+from common.selector_registry import SELECTORS  # Import the compiled per-site selector registry
+
+
+def test_get_text_returns_the_page(server):
+    with HttpClient(rate_limiter=None) as client:
+        text = client.get_text(server.url("ebay_search.html?_nkw=camera"))
+    assert "<html" in text.lower()
+    assert server.requests == 1
+
+
+def test_get_text_returns_none_on_a_missing_page(server):
+    with HttpClient(rate_limiter=None) as client:
+        assert client.get_text(server.url("no_such_page.html")) is None
+
+
+def test_selector_fetch_extracts_records_and_the_next_page(server):
+    with HttpClient(rate_limiter=None) as client:
+        records, root = SELECTORS["ebay", "search"].fetch(client, server.url("ebay_search.html?_nkw=camera&_pgn=1"))
+        next_links = SELECTORS["ebay", "next_page"].extract(root, base_url=server.url("ebay_search.html"))
+    assert records
+    assert all(record["Title"] and record["Price"] for record in records)
+    assert all(record["URL"].startswith("http") for record in records)
+    assert "_pgn=2" in next_links[0]["URL"]
+
+
+def test_selector_fetch_returns_none_past_the_last_page(server):
+    with HttpClient(rate_limiter=None) as client:
+        assert SELECTORS["yelp", "search"].fetch(client, server.url("yelp_search.html?start=31")) is None  # Page 4 of 3
+
+
+def test_blocked_page_is_not_returned_and_backs_the_domain_off():
+    limiter = DomainRateLimiter(rate=100, burst=10, base_backoff=0.01, max_backoff=0.01, jitter=0)
+    with FixtureServer(ban_after=0) as banned, HttpClient(rate_limiter=limiter) as client:
+        url = banned.url("amazon_search.html")
+        assert client.get_text(url) is None
+    assert limiter.current_rate(url) == 50
+
+
+def test_page_cache_serves_a_fresh_copy_without_a_request(server, tmp_path):
+    cache = PageCache(str(tmp_path / "cache.db"))
+    try:
+        with HttpClient(rate_limiter=None, cache=cache) as client:
+            url = server.url("amazon_product.html")
+            first = client.get_text(url)
+            second = client.get_text(url)
+    finally:
+        cache.close()
+    assert first == second
+    assert server.requests == 1
@@ -0,0 +1,67 @@
+import time  # Import time to wait out the short cool-downs
+
+import pytest  # Import pytest for the expected errors
+
+from benchmarks.fixture_server import FixtureServer  # Import the mock site server (proxy stand-ins here)
+from common.http_client import HttpClient  # Import the client that fetches as an identity
+from common.identities import IdentityPool  # Import the identity pool under test
+from common.rate_limit import DomainRateLimiter  # Import the limiter that credits outcomes to identities
+
+SITE_URL = "http://shop.test/amazon_search.html?k=headphones"  # Never resolved: requests go through the proxy stand-in
+
+
+def fetch(identity):
+    """ Fetches SITE_URL through `identity`'s proxy; True for a healthy page. """
+    limiter = DomainRateLimiter(rate=1000, burst=100, base_backoff=0.01, max_backoff=0.01, jitter=0)
+    with HttpClient(identity=identity, rate_limiter=limiter, timeout=5) as client:
+        return client.get_text(SITE_URL) is not None
+
+
+def test_healthy_identity_keeps_working():
+    with FixtureServer() as proxy:
+        pool = IdentityPool.generate([proxy.url()])
+        identity = pool.identities[0]
+        assert all(fetch(identity) for _ in range(5))
+    assert (identity.successes, identity.blocks, identity.cooldowns) == (5, 0, 0)
+    assert pool.usable(identity)
+
+
+def test_banned_identity_cools_down_then_returns_on_probation():
+    with FixtureServer(ban_after=2) as proxy:
+        pool = IdentityPool.generate([proxy.url()], cooldown=0.3)
+        identity = pool.identities[0]
+        outcomes = [fetch(identity) for _ in range(4)]
+        assert not pool.usable(identity)  # Checked before the server's shutdown outlasts the cool-down
+        with pytest.raises(TimeoutError):
+            pool.acquire(timeout=0.05)
+    assert outcomes[:2] == [True, True]
+    assert not any(outcomes[2:])
+    assert identity.cooldowns == 1
+    time.sleep(0.3)
+    assert pool.acquire(timeout=1) is identity
+    assert pool.min_score <= identity.score < 1.0  # On probation
+
+
+def test_pool_rotates_away_from_a_banned_identity():
+    with FixtureServer(ban_after=0) as banned, FixtureServer() as healthy:
+        pool = IdentityPool.generate([banned.url(), healthy.url()], cooldown=60)
+        bad, good = pool.identities
+        while pool.usable(bad):
+            fetch(bad)
+        assert fetch(good)
+    taken = [pool.acquire(timeout=0.05) for _ in range(3)]
+    assert taken == [good, good, good]
+
+
+def test_identity_is_retired_after_max_cooldowns():
+    with FixtureServer(ban_after=0) as proxy:
+        pool = IdentityPool.generate([proxy.url()], cooldown=0.05, max_cooldowns=1)
+        identity = pool.identities[0]
+        while pool.usable(identity):
+            fetch(identity)
+        time.sleep(0.1)
+        fetch(identity)  # One more block on probation
+    assert identity.retired
+    assert pool.summary()[0]["retired"]
+    with pytest.raises(RuntimeError):
+        pool.acquire(timeout=0.05)
@@ -1,79 +1,66 @@
 
-import time   # Import time module for delays
-import json   # Import JSON module for handling cookies
-import random  # Import random module to select user agents
-import asyncio  # Import asyncio for async execution
-import nest_asyncio  # Import nest_asyncio to allow nested async loops
-from selenium import webdriver  # Import Selenium WebDriver
-from selenium.webdriver.common.by import By  # Import By class for locating elements
-from selenium.webdriver.chrome.service import Service  # Import Service for ChromeDriver
-from selenium.webdriver.chrome.options import Options  # Import Options to configure WebDriver
+import sys    # Import sys to extend the module search path
+import functools  # Import functools to bind setup_driver options for the pool
 from selenium.webdriver.support.ui import WebDriverWait   # Import WebDriverWait for explicit waits
 from selenium.webdriver.support import expected_conditions as EC  # Import expected_conditions for conditions
-import pandas as pd  # Import pandas for handling and saving extracted data
-# Importing urlparse and parse_qs from urllib.parse to parse URLs and extract query parameters
-from urllib.parse import urlparse, parse_qs
+from pathlib import Path  # Import Path to locate the shared `common` package
+
+sys.path.append(str(Path(__file__).resolve().parents[2]))  # Make the shared `common` package importable
+from common.checkpoint import open_checkpoint  # Import the resumable crawl checkpoint
+from common.cli import build_parser  # Import the shared command-line options
+from common.cookies import read_cookies, restore_session, save_cookies  # Import the shared cookie jar helpers
+from common.identities import cookie_jar, load_identities  # Import the rotating browser identities
+from common.dedup import DedupIndex  # Import the seen-item index
+from common.driver_factory import browser_data_dir, create_driver  # Import the shared WebDriver factory
+from common.driver_pool import DriverPool  # Import the shared WebDriver pool
+from common.frontier import frontier_from_args  # Import the shared multi-node frontier
+from common.jobs import job_path, jobs_from_args  # Import the batch-mode job helpers
+from common.metrics import METRICS, configure_metrics, profile_run  # Import the hot-path instrumentation
+from common.page_cache import PageCache  # Import the on-disk page cache
+from common.scheduler import Scheduler, worker_resource  # Import the multi-process job scheduler
+from common.search_urls import build_search_url, get_query_param  # Import the search URL builder and parser
+from common.http_client import HttpClient  # Import the pooled HTTP client for the lightweight mode
+from common.rate_limit import RATE_LIMITER  # Import the shared per-domain rate limiter
+from common.selector_registry import SELECTORS  # Import the compiled per-site selector registry
+from common.changes import mark_complete, open_output  # Import the full / incremental (changes only) output
+from common.waits import WAIT_STATS, wait_for_dom_quiet, wait_for_selector  # Import the adaptive wait layer
 
 
 # ============================
-# 🟡 Helper Function: Setup WebDriver
+# 🟡 Selectors: Search Results
 # ============================
-def setup_driver():
-    """
-    Initializes and configures Selenium WebDriver with performance optimizations.
-    """
-    user_agents = [  # List of user agents to avoid detection
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64)",
-        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7)",
-        "Mozilla/5.0 (X11; Ubuntu; Linux x86_64; rv:94.0)",
-    ]
-    
-    chrome_options = Options()  # Create Chrome options object
-     # Running in headless mode for efficiency (Uncomment if needed)
-    # chrome_options.add_argument('--headless')  # Run browser in headless mode
-    chrome_options.add_argument('--disable-blink-features=AutomationControlled') # Bypass automation detection
-    chrome_options.add_argument(f'--user-agent={random.choice(user_agents)}')  # Randomize user-agent
-    chrome_options.add_argument('--start-maximized') # Open browser in maximized mode
-    chrome_options.add_argument('--disable-gpu')  # Disable GPU acceleration for stability
-    chrome_options.add_argument('--log-level=3')  # Suppress unnecessary logs
-    chrome_options.add_argument('--ignore-certificate-errors')  # Ignore SSL errors
-    chrome_options.add_experimental_option("excludeSwitches", ["enable-automation"])  # Disable automation flags
-    
-    chrome_service = Service(executable_path="C:/Users/parni/OneDrive/Desktop/web_scraping_projects/yelp_scraping/drivers/chromedriver.exe")
-    driver = webdriver.Chrome(service=chrome_service, options=chrome_options) # Initialize WebDriver with options
-    return driver   # Return the configured WebDriver instance
+BUSINESS_CARDS = SELECTORS["yelp", "search"]  # Business cards: Name, Rating, URL (fallbacks in common/selectors.json)
 
 
+CHROMEDRIVER_PATH = "C:/Users/parni/OneDrive/Desktop/web_scraping_projects/yelp_scraping/drivers/chromedriver.exe"  # Local ChromeDriver executable
+
 
 # ============================
-# 🟡 Function: Save & Load Cookies
+# 🟡 Helper Function: Setup WebDriver
 # ============================
-def save_cookies(driver, filename="cookies.json"):
-    """ Saves cookies to a JSON file. """
-    with open(filename, "w") as file:
-        json.dump(driver.get_cookies(), file)
-    print("✅ Cookies saved.")
+def setup_driver(headless=False, profile="full", warm=False, snapshot=True, identity=None):
+    """
+    Initializes Selenium WebDriver through the shared driver factory.
+    Pass `headless=True` for unattended batch runs, or `profile="lean"` for a small headless
+    browser that uses eager page loads and skips images, fonts, media, ads and analytics.
+    With `warm=True` the session starts from the persistent "yelp" browser profile (a private
+    copy of it unless `snapshot=False`) and attaches to the long-lived chromedriver service.
+    An `identity` (common/identities.py) sets the session's user agent, proxy, window and language.
+    """
+    user_data_dir = browser_data_dir("yelp", snapshot=snapshot) if warm else None
+    return create_driver(profile=profile, headless=headless, driver_path=CHROMEDRIVER_PATH,
+                         user_data_dir=user_data_dir, reuse_service=warm, identity=identity)
 
-def load_cookies(driver, filename="cookies.json"):
-    """ Loads cookies from a JSON file. """
-    try:
-        with open(filename, "r") as file:
-            cookies = json.load(file)
-            for cookie in cookies:
-                driver.add_cookie(cookie)
-        print("✅ Cookies loaded.")
-    except FileNotFoundError:
-        print("⚠️ No cookies found. Proceeding without loading cookies.")
 
 
 # ============================
 # 🟡 Function: Scroll Down Page
 # ============================
 def scroll_down(driver, scroll_times=3, delay=1):
-    """ Scrolls down dynamically based on page height. """
+    """ Scrolls down dynamically based on page height; `delay` is the maximum wait per scroll. """
     for _ in range(scroll_times):
         driver.execute_script("window.scrollTo(0, document.body.scrollHeight);")
-        time.sleep(delay)
+        wait_for_dom_quiet(driver, quiet=0.3, timeout=delay)  # Continue as soon as new content settles
 
 
 
@@ -86,23 +73,10 @@ def extract_businesses_from_page(driver):
     """
     business_data = []  # Initialize an empty list to store business data
     try:
-        # Locate all business items on the page
-        businesses = driver.find_elements(By.XPATH, '//div[contains(@class, "container__09f24__FeTO6 y-css-1txhg36")]')
-        for business in businesses:  # Iterate through each business element
-            try:
-                # Extract business name, rating, and URL
-                name_element = business.find_element(By.XPATH, './/h3')
-                rating_element = business.find_element(By.XPATH, './/div[@class="y-css-dnttlc" and @aria-label]')
-                link_element = business.find_element(By.XPATH, './/a[contains(@class, "y-css-1x1e1r2")]')
-                
-                name = name_element.text.strip() if name_element else "N/A"   # Get business name text
-                rating = rating_element.get_attribute("aria-label") if rating_element else "N/A"   # Get rating text
-                url = link_element.get_attribute('href') if link_element else "N/A"   # Get business URL
-                
-                business_data.append({"Name": name, "Rating": rating, "URL": url})  # Store extracted data
-                print(f"🏢 Extracted: {name} | {rating}")  # Print extracted business info
-            except Exception as e:
-                print(f"⚠️ Error extracting business data: {e}")  # Handle extraction errors
+        # Extract name, rating and URL of every business card in a single in-page script call
+        business_data = BUSINESS_CARDS.extract_js(driver)
+        for business in business_data:
+            print(f"🏢 Extracted: {business['Name']} | {business['Rating']}")  # Print extracted business info
     except Exception as e:
         print(f"❌ Error extracting businesses from page: {e}")  # Handle overall extraction errors
     return business_data  # Return extracted business data
@@ -111,34 +85,133 @@ def extract_businesses_from_page(driver):
 # ============================
 # 🟡 Function: Extract All Businesses Dynamically from Multiple Pages
 # ============================
-def extract_all_businesses(driver, search_term, location, max_pages=3):
+def extract_all_businesses(driver, search_term, location, max_pages=3, client=None, sink=None, checkpoint=None, seen=None):
     """
     Extracts business data across multiple pages with dynamic pagination.
+    When an `HttpClient` is given, each page is first fetched in lightweight mode (plain HTTP);
+    the browser is only used when the static HTML lacks the business cards.
+    When a `sink` is given, businesses are written to it page by page instead of being
+    collected in the returned list.
+    With a `checkpoint`, the next `start=` offset is saved after every page and
+    extraction starts from the saved offset if there is one.
+    Every fetch goes through the shared per-domain rate limiter; an empty results page
+    is reported to it as a likely soft block so later requests back off.
+    Business URLs are reduced to `/biz/<slug>` and repeated (e.g. sponsored) businesses dropped;
+    pass a persistent `DedupIndex` as `seen` to also drop businesses stored by earlier runs.
+    An incremental `sink` is marked complete (see `mark_complete`) only when a results page
+    past the last one was reached, not when `max_pages` or a block page ended the crawl.
     """
-    all_data = []
+    all_data = []  # Businesses kept in memory (unused with a sink)
+    total = 0
+
+    seen = DedupIndex() if seen is None else seen  # Items already stored (this run, or earlier ones too)
+
+    def store(businesses):
+        nonlocal total
+        businesses = seen.unique(businesses)  # Tracking-free item URLs, sponsored / repeated items dropped
+        total += len(businesses)
+        if sink is not None:
+            sink.write_many(businesses)  # Stream the page to disk as soon as it is extracted
+        else:
+            all_data.extend(businesses)
+
+    def save_progress(next_start):
+        if checkpoint is not None:
+            if sink is not None:
+                sink.flush()  # Businesses must be on disk before the cursor moves past their page
+            checkpoint.set_cursor("yelp_start", next_start)
+
+    first_page = 1
+    if checkpoint is not None:
+        saved_start = checkpoint.get_cursor("yelp_start")
+        if saved_start:
+            first_page = (saved_start - 1) // 10 + 1  # Continue where the last run stopped
+            print(f"🔁 Resuming from start={saved_start}")
     
-    for page in range(1, max_pages + 1):
+    for page in range(first_page, max_pages + 1):
         start_value = (page - 1) * 10 + 1
-        url = f"https://www.yelp.co.uk/search?find_desc={search_term}&find_loc={location}&start={start_value}"
+        url = build_search_url("yelp", query=search_term, location=location, start=start_value)
         
         print(f"📄 Scraping page {page} with start={start_value}...")  
+
+        result = BUSINESS_CARDS.fetch(client, url) if client else None
+        if result is not None:
+            businesses = result[0]
+            print(f"⚡ Found {len(businesses)} businesses on page {page} without the browser")
+            store(businesses)
+            save_progress(start_value + 10)
+            continue
+
+        RATE_LIMITER.acquire(url)  # Wait for Yelp's next request slot
         driver.get(url)
+        wait_for_selector(driver, BUSINESS_CARDS.xpath, timeout=5)  # Continue as soon as the cards are present
         
         businesses = extract_businesses_from_page(driver)
         print(f"🔍 Found {len(businesses)} businesses on page {page}")
         
         if not businesses:
-            print("⚠️ No businesses found, stopping extraction.")
+            # Backs off on a robot check (or an unexplained empty first page), not on a genuine "no results" page;
+            # past page 1 an empty page is the end of the results
+            verdict = RATE_LIMITER.classify(driver.current_url, text=driver.page_source, title=driver.title, empty=page == 1)
+            if verdict is not None and verdict.blocked:
+                print(f"⚠️ No businesses found ({verdict.kind}), stopping extraction.")
+            else:
+                print("⏹️ No more results pages.")
+                mark_complete(sink)  # Past the last results page
             break
         
-        all_data.extend(businesses)
+        RATE_LIMITER.report_success(url)
+        store(businesses)
+        save_progress(start_value + 10)
         scroll_down(driver, scroll_times=3, delay=2)
 
-    print(f"✅ Extracted {len(all_data)} businesses in total.")
+    print(f"✅ Extracted {total} businesses in total.")
     return all_data
 
 
 
+# ============================
+# 🟡 Function: Page-Level Tasks for the Scheduler
+# ============================
+def page_tasks(job):
+    """ Splits a batch job into one independent task per `start=` offset. """
+    output = job_path(job, "yelp_businesses.csv")
+    max_pages = job.get("max_pages") or 3
+    return [dict(job, site="yelp", start=(page - 1) * 10 + 1, output=output) for page in range(1, max_pages + 1)]
+
+
+def scrape_page_task(task):
+    """
+    Scheduler handler: extracts one results page in a worker process, over plain HTTP when
+    possible and otherwise with the worker's own headless browser (started with an identity
+    from the task's `identities` file, if any; a blocked session is replaced). Both use the
+    task's `cookies` jar, like the single-process run.
+    """
+    url = build_search_url("yelp", query=task["query"], location=task["location"], start=task["start"])
+    client = worker_resource("http", HttpClient)
+    client.add_cookies(read_cookies(task.get("cookies")))  # The saved session / consent (--cookies), if any
+    result = BUSINESS_CARDS.fetch(client, url)
+    if result is not None:
+        return result[0]
+    factory = functools.partial(setup_driver, headless=True, profile=task.get("profile", "lean"), warm=task.get("warm", False))
+    pool = worker_resource("drivers", lambda: DriverPool(factory, size=1, max_pages=0,
+                                                         identities=load_identities(task.get("identities"))))
+    with pool.session() as driver:
+        cookies = cookie_jar(task.get("cookies"))  # The identity's own jar, if it has one
+        if cookies:
+            restore_session(driver, "https://www.yelp.co.uk/", cookies)  # Reuse a saved session / consent
+        RATE_LIMITER.acquire(url)  # Paced per proxy when the session has an identity with one
+        driver.get(url)
+        wait_for_selector(driver, BUSINESS_CARDS.xpath, timeout=10)  # Ends early on a robot check or "no results"
+        businesses = extract_businesses_from_page(driver)
+        # Raises PageBlocked on a robot check, so the scheduler retries the page later instead of storing nothing;
+        # an empty page past the first one is the end of the results
+        RATE_LIMITER.check_page(driver.current_url, text=None if businesses else driver.page_source,
+                                title=None if businesses else driver.title, empty=not businesses and task["start"] == 1)
+    return businesses
+
+
+
 # ============================
 # 🟡 Function: Get Search Term from URL
 # ============================
@@ -147,10 +220,7 @@ def get_search_term_from_url(url):
     """
     Extracts the search term from the Yelp search URL.
     """
-    parsed_url = urlparse(url)
-    query_params = parse_qs(parsed_url.query)
-    search_term = query_params.get('find_desc', [''])[0]  # Extract 'find_desc' parameter
-    return search_term
+    return get_query_param(url, 'find_desc')  # Extract 'find_desc' parameter
 
 
 
@@ -161,43 +231,78 @@ def get_location_from_url(url):
     """
     Extracts the location from the Yelp search URL.
     """
-    parsed_url = urlparse(url)
-    query_params = parse_qs(parsed_url.query)
-    location = query_params.get('find_loc', [''])[0]  # Extract 'find_loc' parameter
-    return location
+    return get_query_param(url, 'find_loc')  # Extract 'find_loc' parameter
 
 
 
 # ============================
 # 🟡 Main Function
 # ============================
-def main():
-    """ Main function to scrape Yelp data. """
-    driver = setup_driver()
-    driver.get("https://www.yelp.com/")
-    
-    input("🔹 Perform a search on Yelp and press Enter when ready...")
-    
-    current_url = driver.current_url
-    search_term = get_search_term_from_url(current_url)
-    location = get_location_from_url(current_url)  # Automatically extract location from the URL
-    
-    print(f"🔍 Extracted search term: {search_term} | Location: {location}")
-    
-    if not search_term or not location:
-        print("⚠️ Missing search term or location. Exiting.")
-        driver.quit()
-        return
-    
-    all_businesses = extract_all_businesses(driver, search_term, location, max_pages=3)
-    
-    # Save data to DataFrame and CSV
-    df = pd.DataFrame(all_businesses)
-    df.to_csv("yelp_businesses.csv", index=False)
+def main(resume=False, job=None, headless=False, cookies=None, profile="full", warm=False, use_cache=True,
+         seen_index=None, incremental=False, identities=None):
+    """
+    Main function to scrape Yelp data. With `resume`, continues the last search from its saved offset.
+
+    Args:
+        resume (bool): Continue the previous crawl from its checkpoint.
+        job (dict): Batch-mode job ({"query": ..., "location": ..., "max_pages": ...}); None asks the user to search.
+        headless (bool): Run Chrome without a window.
+        profile (str): Browser profile, "full" or "lean" (headless, no images / fonts / media / trackers).
+        warm (bool): Start from the persistent browser profile; interactive runs update it, batch runs use a copy.
+        cookies (str): Cookie jar to restore before searching (and to save after a manual search).
+        use_cache (bool): Serve result pages fetched within Yelp's cache TTL from the on-disk page cache.
+        seen_index (str): Persistent dedup index file; businesses stored by earlier runs are skipped.
+        incremental (bool): Only write businesses that are new, changed or gone since the last crawl.
+        identities (IdentityPool): Identities to start the browser with; the session's own cookie jar wins over `cookies`.
+    """
+    if incremental and seen_index:
+        print("⚠️ --seen-index is ignored with --incremental (skipped businesses would look removed).")
+        seen_index = None
+    output = job_path(job, "yelp_businesses.csv")
+    checkpoint = open_checkpoint(job_path(job, "yelp_checkpoint.db"), resume=resume)  # Saved search and `start=` offset
+    max_pages = (job or {}).get("max_pages") or 3
+    factory = functools.partial(setup_driver, headless=headless, profile=profile, warm=warm, snapshot=job is not None)
+    with checkpoint, DriverPool(factory, size=1, identities=identities) as pool, pool.session() as driver:  # Borrow a WebDriver session
+        cookies = cookie_jar(cookies)  # The identity's own jar, if it has one
+        if cookies:
+            restore_session(driver, "https://www.yelp.co.uk/", cookies)  # Reuse a saved session / consent
+        
+        saved_search = checkpoint.get_cursor("yelp_search")
+        if saved_search:
+            search_term, location = saved_search["search_term"], saved_search["location"]
+        elif job is not None:
+            search_term, location = job.get("query"), job.get("location")  # No browser search needed
+        else:
+            driver.get("https://www.yelp.com/")
+            input("🔹 Perform a search on Yelp and press Enter when ready...")
+            if cookies:
+                save_cookies(driver, cookies)
+            
+            current_url = driver.current_url
+            search_term = get_search_term_from_url(current_url)
+            location = get_location_from_url(current_url)  # Automatically extract location from the URL
+        
+        print(f"🔍 Extracted search term: {search_term} | Location: {location}")
+        
+        if not search_term or not location:
+            print("⚠️ Missing search term or location. Exiting.")
+            return
+        checkpoint.set_cursor("yelp_search", {"search_term": search_term, "location": location})
+        
+        # Businesses are written to the CSV page by page as they are extracted
+        cache = PageCache("yelp_page_cache.db") if use_cache else None  # Result pages of earlier runs
+        with HttpClient(cache=cache) as client, open_output(output, resume, incremental, fields=BUSINESS_CARDS.fields) as sink, \
+                DedupIndex(seen_index) as seen:
+            client.load_driver_cookies(driver)  # Share the browser's session with the HTTP fast path
+            extract_all_businesses(driver, search_term, location, max_pages=max_pages, client=client, sink=sink,
+                                   checkpoint=checkpoint, seen=seen)
+        if cache is not None:
+            print(f"💾 Page cache: {cache.summary()}")
+            cache.close()
     
-    driver.quit()
-    print(all_businesses)
-    print("✅ Scraping completed. Data saved to yelp_businesses.csv")
+    print(f"⏱️ Wait timings: {WAIT_STATS.summary()}")
+    print(f"🧩 Selector hits: {SELECTORS.summary()}")
+    print(f"✅ Scraping completed. Data saved to {output}")
 
 
 
@@ -206,11 +311,36 @@ def main():
 # 🚀 Execute Main Function
 # ============================
 
-nest_asyncio.apply()  # Allow nested async loops
 # Run the main function 
 
 if __name__ == "__main__":
-    main()  
+    parser = build_parser("Scrape Yelp search results.")
+    parser.add_argument("--location", help="search location (used with --query)")
+    args = parser.parse_args()
+    jobs = jobs_from_args(args, "yelp")  # Jobs from --jobs / --query (empty means interactive)
+    configure_metrics(args)  # --metrics-log / --metrics-file / --metrics-port
+    identities = load_identities(args.identities)  # Shared by every job, so a blocked identity stays benched
+    if jobs and (args.workers > 1 or args.frontier):
+        frontier = frontier_from_args(args, "yelp")  # Shared with the other nodes of the crawl, if any
+        scheduler = Scheduler({"yelp": scrape_page_task}, workers=args.workers, incremental=args.incremental,
+                              frontier=frontier, node=args.node, dedup_field="URL")  # Pages of every job run concurrently
+        for job in jobs:
+            scheduler.submit_many(page_tasks(dict(job, cookies=args.cookies, profile=args.profile, warm=args.warm,
+                                                  identities=args.identities)))
+        with profile_run(args.cprofile):  # Profiles the scheduling process; page tasks run in the workers
+            scheduler.run()
+        if frontier is not None:
+            frontier.close()
+    elif jobs:
+        for index, job in enumerate(jobs):  # Run every job unattended, one after another
+            with profile_run(args.cprofile if index == 0 else None), METRICS.span("job", site="yelp"):
+                main(resume=args.resume, job=job, headless=True, cookies=args.cookies, profile=args.profile, warm=args.warm,
+                     use_cache=not args.no_cache, seen_index=args.seen_index, incremental=args.incremental,
+                     identities=identities)
+    else:
+        with profile_run(args.cprofile), METRICS.span("job", site="yelp"):
+            main(resume=args.resume, headless=args.headless, cookies=args.cookies, warm=args.warm, use_cache=not args.no_cache,
+                 seen_index=args.seen_index, incremental=args.incremental, identities=identities)
 
 
 